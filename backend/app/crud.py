@@ -1,34 +1,324 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Type, List, Optional
+import os
+from functools import lru_cache
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter, create_model
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import delete as sql_delete, func, insert, select, update as sql_update
+from typing import Any, Literal, Type, List, Optional
 
-from . import models, deps, crypto
+from . import models, schemas, deps, crypto, generations, hashing, permissions, ratelimit, streaming
+from . import database, responsecache, writes
+from .pagination import PageParams, page_params, page_select, paginate
 
 
 logger = logging.getLogger(__name__)
 
+# Largest number of items accepted by one bulk request.
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "1000"))
+MAX_DAILY_DEDICATION = 9
 
-def create_crud_router(prefix: str, model: Type[models.Base], schema: Type):
-    router = APIRouter(prefix=f"/{prefix}", tags=[prefix])
+BulkMode = Literal["atomic", "best_effort"]
+
+
+@lru_cache(maxsize=None)
+def partial_schema(schema: Type, require_id: bool = True) -> Type:
+    """Variant of ``schema`` where every field but ``id`` is optional.
+
+    With ``require_id=False`` (single-row PATCH, id in the path) ``id`` is
+    optional too and ignored.
+    """
+    fields = {
+        name: (Optional[info.annotation], None)
+        for name, info in schema.model_fields.items()
+        if name != "id"
+    }
+    if require_id:
+        return create_model(f"{schema.__name__}Patch", id=(int, ...), **fields)
+    return create_model(f"{schema.__name__}PatchOne", id=(Optional[int], None), **fields)
+
+
+def _bulk_result(count: int, ids: dict[int, int], errors: dict[int, str]) -> schemas.BulkResult:
+    results = [
+        schemas.BulkItemResult(index=i, ok=False, error=errors[i])
+        if i in errors
+        else schemas.BulkItemResult(index=i, ok=True, id=ids.get(i))
+        for i in range(count)
+    ]
+    return schemas.BulkResult(results=results, succeeded=count - len(errors), failed=len(errors))
+
+
+def _check_bulk_size(count: int) -> None:
+    if count > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request")
+
+
+def _db_error(exc: DBAPIError) -> str:
+    return str(exc.orig).splitlines()[0] if exc.orig is not None else "Database error"
+
+
+def _dedication_errors(
+    db: Session, rows: dict[int, dict], exclude_ids: Optional[list[int]] = None
+) -> dict[int, str]:
+    """Check the daily dedication limit for a batch with one grouped query.
+
+    Rows are applied in order, so later items see the hours of earlier ones.
+    """
+    user_ids = {r.get("userId") for r in rows.values() if r.get("userId") is not None}
+    if not user_ids:
+        return {}
+    q = (
+        db.query(models.ProjectEmployee.userId, func.sum(models.ProjectEmployee.dedicationHours))
+        .filter(models.ProjectEmployee.userId.in_(user_ids))
+    )
+    if exclude_ids:
+        q = q.filter(models.ProjectEmployee.id.notin_(exclude_ids))
+    totals = {user_id: total or 0 for user_id, total in q.group_by(models.ProjectEmployee.userId)}
+    errors = {}
+    for index, row in rows.items():
+        user_id = row.get("userId")
+        if user_id is None:
+            continue
+        total = totals.get(user_id, 0) + (row.get("dedicationHours") or 0)
+        if total > MAX_DAILY_DEDICATION:
+            errors[index] = f"dedication hours exceed daily limit of {MAX_DAILY_DEDICATION}"
+        else:
+            totals[user_id] = total
+    return errors
+
+
+def create_crud_router(prefix: str, model: Type[models.Base], schema: Type, cache: bool = False):
+    """Build list/detail/create/update/delete routes for ``model``.
+
+    With ``cache=True`` list bodies are kept in the in-process response cache.
+    """
+    router = APIRouter(prefix=f"/{prefix}", tags=[prefix], route_class=deps.SessionRoute)
+    list_adapter = TypeAdapter(List[schema])
+
+    # Opt-in: keyed on the client IP, so behind a proxy every user shares one key.
+    list_limiter = ratelimit.from_env("crud_list", "0/60", name=f"list/{prefix}")
+    write_limiter = ratelimit.from_env("crud_write", "0/60", name=f"write/{prefix}")
+
+    # Schemas made only of plain columns are listed straight from Core rows.
+    fast_columns = None if model is models.RawData else streaming.direct_columns(model, schema)
+
+    # Tables whose generations make up the ETag of this router's responses.
+    etag_tables = [model.__tablename__]
+    if model is models.Client:
+        etag_tables += [models.ClientAnalyst.__tablename__, models.User.__tablename__]
+    if model is models.Project:
+        etag_tables += [models.ProjectEmployee.__tablename__, models.User.__tablename__]
 
     def perm(method: str):
         return Depends(deps.require_api_permission(f"/{prefix}", method))
 
+    def limited(limiter: ratelimit.RateLimiter):
+        return Depends(ratelimit.limit_requests(limiter))
+
+    def _after_write(db: Session, item_ids=()) -> None:
+        if model in (models.ApiPermission, models.PagePermission):
+            permissions.invalidate()
+        if item_ids and model is models.User:
+            deps.invalidate_user_principals(db, *item_ids)
+        if item_ids and model is models.Role:
+            deps.invalidate_role_principals(db, *item_ids)
+
     def _validate_dedication(user_id: int, hours: int, db: Session, exclude_id: Optional[int] = None) -> None:
-        """Ensure a user is not assigned more than 9 hours across projects."""
+        """Ensure a user is not assigned more than MAX_DAILY_DEDICATION hours across projects."""
         if user_id is None or hours is None:
             return
         q = db.query(func.sum(models.ProjectEmployee.dedicationHours)).filter(models.ProjectEmployee.userId == user_id)
         if exclude_id is not None:
             q = q.filter(models.ProjectEmployee.id != exclude_id)
         total = q.scalar() or 0
-        if total + hours > 9:
-            raise HTTPException(status_code=400, detail="dedication hours exceed daily limit of 9")
+        if total + hours > MAX_DAILY_DEDICATION:
+            raise HTTPException(
+                status_code=400, detail=f"dedication hours exceed daily limit of {MAX_DAILY_DEDICATION}"
+            )
+
+    async def _hash_passwords(rows: dict[int, dict]) -> None:
+        if model is models.User:
+            pending = [i for i, r in rows.items() if r.get("password") is not None]
+            hashed = await hashing.hash_passwords_async([rows[i]["password"] for i in pending])
+            for i, value in zip(pending, hashed):
+                rows[i]["password"] = value
+
+    def _encrypt_values(rows: dict[int, dict]) -> None:
+        if model is models.RawData:
+            for row in rows.values():
+                if row.get("fieldValue") is not None:
+                    row["fieldValue"] = crypto.encrypt(row["fieldValue"])
+
+    def _require_bulk_admin(current_user) -> None:
+        if model in (models.Role, models.User) and current_user.role.name != "Administrador":
+            raise HTTPException(status_code=403, detail="Admin only")
+
+    def _run_batch(db: Session, mode: str, rows: dict[int, Any], execute, errors: dict[int, str]) -> dict[int, Any]:
+        """Run ``execute`` for every row at once, isolating failures if needed.
 
-    @router.post("/", response_model=schema, dependencies=[perm("POST")])
-    def create(
+        ``execute(list_of_rows)`` returns one result per row. In best-effort
+        mode a failing batch is retried row by row inside savepoints.
+        """
+        if not rows:
+            return {}
+        indexes = list(rows)
+        if mode == "atomic":
+            try:
+                return dict(zip(indexes, execute([rows[i] for i in indexes])))
+            except DBAPIError as exc:
+                db.rollback()
+                raise HTTPException(status_code=409, detail=_db_error(exc))
+        try:
+            with db.begin_nested():
+                return dict(zip(indexes, execute([rows[i] for i in indexes])))
+        except DBAPIError:
+            pass
+        results = {}
+        for i in indexes:
+            try:
+                with db.begin_nested():
+                    results[i] = execute([rows[i]])[0]
+            except DBAPIError as exc:
+                errors[i] = _db_error(exc)
+        return results
+
+    def _finish(db: Session, mode: str, count: int, ids: dict[int, int], errors: dict[int, str]) -> schemas.BulkResult:
+        if errors and mode == "atomic":
+            db.rollback()
+            raise HTTPException(status_code=400, detail=_bulk_result(count, {}, errors).model_dump()["results"])
+        db.commit()
+        return _bulk_result(count, ids, errors)
+
+    patch_schema = partial_schema(schema)
+    single_patch_schema = partial_schema(schema, require_id=False)
+
+    @router.post("/bulk", response_model=schemas.BulkResult, dependencies=[limited(write_limiter), perm("POST")])
+    async def bulk_create(
+        items: List[schema],
+        mode: BulkMode = Query("atomic"),
+        db: Session = Depends(deps.get_db),
+        current_user: models.User = Depends(deps.get_current_user),
+    ):
+        """Insert many rows with one multi-row INSERT ... RETURNING."""
+        _require_bulk_admin(current_user)
+        _check_bulk_size(len(items))
+        rows = {}
+        for i, item in enumerate(items):
+            data = item.model_dump()
+            if not data.get("id"):
+                data.pop("id", None)
+            rows[i] = data
+        await _hash_passwords(rows)
+        return await run_in_threadpool(_bulk_insert, rows, mode, db)
+
+    def _bulk_insert(rows: dict[int, dict], mode: str, db: Session) -> schemas.BulkResult:
+        _encrypt_values(rows)
+        errors = _dedication_errors(db, rows) if model is models.ProjectEmployee else {}
+        valid = {i: r for i, r in rows.items() if i not in errors}
+        if errors and mode == "atomic":
+            return _finish(db, mode, len(rows), {}, errors)
+
+        def _insert(batch):
+            # Ids come back in the order of ``batch``, whether sent or generated.
+            stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+            return db.scalars(stmt, batch).all()
+
+        ids = _run_batch(db, mode, valid, _insert, errors)
+        result = _finish(db, mode, len(rows), ids, errors)
+        _after_write(db)
+        return result
+
+    @router.patch("/bulk", response_model=schemas.BulkResult, dependencies=[limited(write_limiter), perm("PUT")])
+    async def bulk_update(
+        items: List[patch_schema],
+        mode: BulkMode = Query("atomic"),
+        db: Session = Depends(deps.get_db),
+        current_user: models.User = Depends(deps.get_current_user),
+    ):
+        """Apply partial updates (only the fields sent) to many rows."""
+        _require_bulk_admin(current_user)
+        _check_bulk_size(len(items))
+        patches = {i: item.model_dump(exclude_unset=True) for i, item in enumerate(items)}
+        await _hash_passwords(patches)
+        return await run_in_threadpool(_bulk_write, patches, mode, db)
+
+    def _bulk_write(patches: dict[int, dict], mode: str, db: Session) -> schemas.BulkResult:
+        ids = [patch["id"] for patch in patches.values()]
+        columns = [model.id]
+        if model is models.ProjectEmployee:
+            columns += [models.ProjectEmployee.userId, models.ProjectEmployee.dedicationHours]
+        existing = {
+            row.id: row._asdict()
+            for row in db.execute(select(*columns).where(model.id.in_(ids)))
+        }
+        errors, rows, seen = {}, {}, set()
+        for i, patch in patches.items():
+            if patch["id"] not in existing:
+                errors[i] = "Not found"
+            elif patch["id"] in seen:
+                errors[i] = "Duplicate id"
+            else:
+                seen.add(patch["id"])
+                rows[i] = patch
+        _encrypt_values(rows)
+        if model is models.ProjectEmployee:
+            merged = {i: {**existing[r["id"]], **r} for i, r in rows.items()}
+            errors.update(_dedication_errors(db, merged, exclude_ids=list(seen)))
+        valid = {i: r for i, r in rows.items() if i not in errors}
+        if errors and mode == "atomic":
+            return _finish(db, mode, len(patches), {}, errors)
+
+        def _update(batch):
+            db.execute(sql_update(model), batch)
+            return [row["id"] for row in batch]
+
+        updated = _run_batch(db, mode, valid, _update, errors)
+        result = _finish(db, mode, len(patches), updated, errors)
+        _after_write(db, list(updated.values()))
+        return result
+
+    @router.delete("/bulk", response_model=schemas.BulkResult, dependencies=[limited(write_limiter), perm("DELETE")])
+    def bulk_delete(
+        ids: List[int] = Body(...),
+        mode: BulkMode = Query("atomic"),
+        db: Session = Depends(deps.get_db),
+        current_user: models.User = Depends(deps.get_current_user),
+    ):
+        """Delete many rows by id with a single DELETE ... WHERE id IN."""
+        _require_bulk_admin(current_user)
+        _check_bulk_size(len(ids))
+        found = set(db.scalars(select(model.id).where(model.id.in_(ids))))
+        errors, rows, seen = {}, {}, set()
+        for i, item_id in enumerate(ids):
+            if item_id not in found:
+                errors[i] = "Not found"
+            elif item_id in seen:
+                errors[i] = "Duplicate id"
+            else:
+                seen.add(item_id)
+                rows[i] = item_id
+        if errors and mode == "atomic":
+            return _finish(db, mode, len(ids), {}, errors)
+
+        def _delete(batch):
+            db.execute(sql_delete(model).where(model.id.in_(batch)))
+            return batch
+
+        deleted = _run_batch(db, mode, rows, _delete, errors)
+        result = _finish(db, mode, len(ids), deleted, errors)
+        _after_write(db, list(deleted.values()))
+        return result
+
+    async def _hash_password(data: dict) -> None:
+        # Awaited in the hashing pool so no threadpool thread waits on bcrypt.
+        if model is models.User and data.get("password") is not None:
+            data["password"] = await hashing.hash_password_async(data["password"])
+
+    @router.post("/", response_model=schema, dependencies=[limited(write_limiter), perm("POST")])
+    async def create(
         item: schema,
         db: Session = Depends(deps.get_db),
         current_user: models.User = Depends(deps.get_current_user),
@@ -37,8 +327,12 @@ def create_crud_router(prefix: str, model: Type[models.Base], schema: Type):
         if model in (models.Role, models.User) and current_user.role.name != "Administrador":
             raise HTTPException(status_code=403, detail="Admin only")
         data = item.dict()
-        if model is models.User:
-            data["password"] = deps.get_password_hash(data["password"])
+        if not data.get("id"):
+            data.pop("id", None)
+        await _hash_password(data)
+        return await run_in_threadpool(_create, data, db)
+
+    def _create(data: dict, db: Session):
         if model is models.RawData and data.get("fieldValue") is not None:
             data["fieldValue"] = crypto.encrypt(data["fieldValue"])
         if model is models.ProjectEmployee:
@@ -48,51 +342,66 @@ def create_crud_router(prefix: str, model: Type[models.Base], schema: Type):
                 db,
             )
         logger.debug("Creating %s with data: %s", model.__name__, data)
-        db_obj = model(**data)
-        db.add(db_obj)
+        try:
+            row = writes.insert_row(db, model, data)
+        except IntegrityError as exc:
+            db.rollback()
+            raise HTTPException(status_code=409, detail=_db_error(exc))
         db.commit()
-        db.refresh(db_obj)
-        if model is models.RawData and db_obj.fieldValue is not None:
-            db_obj.fieldValue = crypto.decrypt(db_obj.fieldValue)
-        return db_obj
+        _after_write(db)
+        return _respond(row)
 
-    @router.get("/", response_model=List[schema], dependencies=[perm("GET")])
-    def read_all(
-        db: Session = Depends(deps.get_db),
-        current_user: models.User = Depends(deps.get_current_user),
-    ):
+    # Listings sent straight from the cursor instead of through the ORM.
+    streamed = fast_columns is not None and not cache
+
+    def _check_list_access(current_user) -> None:
         # Listing users or roles is restricted to administrators
         if model in (models.Role, models.User) and current_user.role.name != "Administrador":
             raise HTTPException(status_code=403, detail="Admin only")
-        objs = db.query(model).all()
+
+    def _read_all(db: Session, page: PageParams, response: Response, current_user):
+        _check_list_access(current_user)
+        if streamed:
+            return streaming.stream_rows(
+                db, lambda session: _stream_page(session, page, response), list(schema.model_fields)
+            )
+        etag = generations.check(db, page.request, response, etag_tables)
+        if cache:
+            return responsecache.serve(
+                db,
+                page.request,
+                etag_tables,
+                lambda holder: _render_list(db, page, holder),
+                headers={"ETag": etag} if etag else None,
+            )
+        return _list_objects(db, page, response)
+
+    def _stream_page(db: Session, page: PageParams, response: Response):
+        """ETag, cursor headers and statement of a streamed listing."""
+        etag = generations.check(db, page.request, response, etag_tables)
+        stmt, headers = page_select(db, model, fast_columns, page)
+        if etag:
+            headers["ETag"] = etag
+        return stmt, headers
+
+    def _list_objects(db: Session, page: PageParams, response: Response) -> list:
+        query = db.query(model)
+        if model in (models.Client, models.Project):
+            query = query.options(selectinload(model.analysts))
+        objs = paginate(db, query, model, page, response)
         if model is models.RawData:
-            for o in objs:
-                if o.fieldValue is not None:
-                    o.fieldValue = crypto.decrypt(o.fieldValue)
-        if model is models.Client:
-            for c in objs:
-                c.analysts = (
-                    db.query(models.User)
-                    .join(models.ClientAnalyst, models.ClientAnalyst.userId == models.User.id)
-                    .filter(models.ClientAnalyst.clientId == c.id)
-                    .all()
-                )
-        if model is models.Project:
-            for p in objs:
-                p.analysts = (
-                    db.query(models.User)
-                    .join(models.ProjectEmployee, models.ProjectEmployee.userId == models.User.id)
-                    .filter(models.ProjectEmployee.projectId == p.id)
-                    .all()
-                )
+            return crypto.decrypt_into(objs, schema)
         return objs
 
-    @router.get("/{item_id}", response_model=schema, dependencies=[perm("GET")])
-    def read_one(
-        item_id: int,
-        db: Session = Depends(deps.get_db),
-        current_user: models.User = Depends(deps.get_current_user),
-    ):
+    def _render_list(db: Session, page: PageParams, response: Response) -> bytes:
+        if fast_columns is not None:
+            stmt, headers = page_select(db, model, fast_columns, page)
+            response.headers.update(headers)
+            return streaming.render_rows(db, stmt, list(schema.model_fields))
+        objs = _list_objects(db, page, response)
+        return list_adapter.dump_json(list_adapter.validate_python(objs, from_attributes=True))
+
+    def _read_one(db: Session, item_id: int, request: Request, response: Response, current_user):
         db_obj = db.query(model).filter(model.id == item_id).first()
         if not db_obj:
             raise HTTPException(status_code=404, detail="Not found")
@@ -101,61 +410,131 @@ def create_crud_router(prefix: str, model: Type[models.Base], schema: Type):
             raise HTTPException(status_code=403, detail="Admin only")
         if model is models.User and current_user.role.name != "Administrador" and current_user.id != item_id:
             raise HTTPException(status_code=403, detail="Forbidden")
-        if model is models.RawData and db_obj.fieldValue is not None:
-            db_obj.fieldValue = crypto.decrypt(db_obj.fieldValue)
-        if model is models.Client:
-            db_obj.analysts = (
-                db.query(models.User)
-                .join(models.ClientAnalyst, models.ClientAnalyst.userId == models.User.id)
-                .filter(models.ClientAnalyst.clientId == db_obj.id)
-                .all()
-            )
-        if model is models.Project:
-            db_obj.analysts = (
-                db.query(models.User)
-                .join(models.ProjectEmployee, models.ProjectEmployee.userId == models.User.id)
-                .filter(models.ProjectEmployee.projectId == db_obj.id)
-                .all()
-            )
+        generations.check(db, request, response, etag_tables)
+        if model is models.RawData:
+            return crypto.decrypt_into([db_obj], schema)[0]
         return db_obj
 
-    @router.put("/{item_id}", response_model=schema, dependencies=[perm("PUT")])
-    def update(
-        item_id: int,
-        item: schema,
-        db: Session = Depends(deps.get_db),
-        current_user: models.User = Depends(deps.get_current_user),
-    ):
-        db_obj = db.query(model).filter(model.id == item_id).first()
-        if not db_obj:
-            raise HTTPException(status_code=404, detail="Not found")
+    if database.AsyncSessionLocal is None:
+
+        @router.get("/", response_model=List[schema], dependencies=[limited(list_limiter), perm("GET")])
+        def read_all(
+            response: Response,
+            page: PageParams = Depends(page_params),
+            db: Session = Depends(deps.get_db),
+            current_user: models.User = Depends(deps.get_current_user),
+        ):
+            return _read_all(db, page, response, current_user)
+
+        @router.get("/{item_id}", response_model=schema, dependencies=[perm("GET")])
+        def read_one(
+            item_id: int,
+            request: Request,
+            response: Response,
+            db: Session = Depends(deps.get_db),
+            current_user: models.User = Depends(deps.get_current_user),
+        ):
+            return _read_one(db, item_id, request, response, current_user)
+
+    else:
+        # Same handlers on an AsyncSession: the event loop waits on the
+        # database instead of a threadpool thread.
+        def async_perm(method: str):
+            return Depends(deps.require_api_permission_async(f"/{prefix}", method))
+
+        @router.get("/", response_model=List[schema], dependencies=[limited(list_limiter), async_perm("GET")])
+        async def read_all(
+            response: Response,
+            page: PageParams = Depends(page_params),
+            db: AsyncSession = Depends(deps.get_async_db),
+            current_user: models.User = Depends(deps.get_current_user_async),
+        ):
+            if streamed:
+                _check_list_access(current_user)
+                return await streaming.stream_rows_async(
+                    db, lambda session: _stream_page(session, page, response), list(schema.model_fields)
+                )
+            return await db.run_sync(_read_all, page, response, current_user)
+
+        @router.get("/{item_id}", response_model=schema, dependencies=[async_perm("GET")])
+        async def read_one(
+            item_id: int,
+            request: Request,
+            response: Response,
+            db: AsyncSession = Depends(deps.get_async_db),
+            current_user: models.User = Depends(deps.get_current_user_async),
+        ):
+            return await db.run_sync(_read_one, item_id, request, response, current_user)
+
+    def _check_write_access(item_id: int, current_user) -> None:
         # Non admin users can only update themselves
         if model is models.Role and current_user.role.name != "Administrador":
             raise HTTPException(status_code=403, detail="Admin only")
         if model is models.User and current_user.role.name != "Administrador" and current_user.id != item_id:
             raise HTTPException(status_code=403, detail="Forbidden")
-        data = item.dict()
-        if model is models.User and "password" in data:
-            data["password"] = deps.get_password_hash(data["password"])
-        if model is models.RawData and "fieldValue" in data and data["fieldValue"] is not None:
+
+    def _write(item_id: int, data: dict, db: Session):
+        """Encrypt and validate ``data``, then UPDATE ... RETURNING."""
+        if model is models.RawData and data.get("fieldValue") is not None:
             data["fieldValue"] = crypto.encrypt(data["fieldValue"])
-        if model is models.ProjectEmployee:
+        if model is models.ProjectEmployee and data.keys() & {"userId", "dedicationHours"}:
+            current = db.execute(
+                select(models.ProjectEmployee.userId, models.ProjectEmployee.dedicationHours)
+                .where(models.ProjectEmployee.id == item_id)
+            ).one_or_none()
+            if current is None:
+                raise HTTPException(status_code=404, detail="Not found")
             _validate_dedication(
-                data.get("userId", db_obj.userId),
-                data.get("dedicationHours", db_obj.dedicationHours) or 0,
+                data.get("userId", current.userId),
+                data.get("dedicationHours", current.dedicationHours) or 0,
                 db,
                 exclude_id=item_id,
             )
-        for field, value in data.items():
-            setattr(db_obj, field, value)
         logger.debug("Updating %s %s with data: %s", model.__name__, item_id, data)
+        try:
+            row = writes.update_row(db, model, item_id, data)
+        except IntegrityError as exc:
+            db.rollback()
+            raise HTTPException(status_code=409, detail=_db_error(exc))
+        if row is None:
+            raise HTTPException(status_code=404, detail="Not found")
         db.commit()
-        db.refresh(db_obj)
-        if model is models.RawData and db_obj.fieldValue is not None:
-            db_obj.fieldValue = crypto.decrypt(db_obj.fieldValue)
-        return db_obj
+        _after_write(db, [item_id])
+        return _respond(row)
+
+    def _respond(row):
+        if model is models.RawData:
+            return crypto.decrypt_into([row], schema)[0]
+        return row
+
+    @router.put("/{item_id}", response_model=schema, dependencies=[limited(write_limiter), perm("PUT")])
+    async def update(
+        item_id: int,
+        item: schema,
+        db: Session = Depends(deps.get_db),
+        current_user: models.User = Depends(deps.get_current_user),
+    ):
+        _check_write_access(item_id, current_user)
+        data = item.model_dump()
+        data.pop("id", None)
+        await _hash_password(data)
+        return await run_in_threadpool(_write, item_id, data, db)
+
+    @router.patch("/{item_id}", response_model=schema, dependencies=[limited(write_limiter), perm("PUT")])
+    async def patch(
+        item_id: int,
+        item: single_patch_schema,
+        db: Session = Depends(deps.get_db),
+        current_user: models.User = Depends(deps.get_current_user),
+    ):
+        """Write only the fields present in the body."""
+        _check_write_access(item_id, current_user)
+        data = item.model_dump(exclude_unset=True)
+        data.pop("id", None)
+        await _hash_password(data)
+        return await run_in_threadpool(_write, item_id, data, db)
 
-    @router.delete("/{item_id}", dependencies=[perm("DELETE")])
+    @router.delete("/{item_id}", dependencies=[limited(write_limiter), perm("DELETE")])
     def delete(
         item_id: int,
         db: Session = Depends(deps.get_db),
@@ -169,6 +548,7 @@ def create_crud_router(prefix: str, model: Type[models.Base], schema: Type):
             raise HTTPException(status_code=404, detail="Not found")
         db.delete(db_obj)
         db.commit()
+        _after_write(db, [item_id])
         logger.debug("Deleted %s %s", model.__name__, item_id)
         return {"ok": True}
 
@@ -1,19 +1,142 @@
 import os
 import base64
 import hashlib
-from cryptography.fernet import Fernet, InvalidToken
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+
+from .cache import LRUCache
 
 _SECRET = os.getenv("DATA_ENCRYPTION_KEY", "raw_data_secret")
-_KEY = base64.urlsafe_b64encode(hashlib.sha256(_SECRET.encode()).digest())
+# Previous secrets, newest first, still accepted for reading during a rotation.
+_OLD_SECRETS = [
+    s.strip() for s in os.getenv("DATA_ENCRYPTION_OLD_KEYS", "").split(",") if s.strip()
+]
+
+
+def _derive(secret: str) -> bytes:
+    return base64.urlsafe_b64encode(hashlib.sha256(secret.encode()).digest())
+
+
+_KEY = _derive(_SECRET)
 _FERNET = Fernet(_KEY)
+_MULTI = MultiFernet([_FERNET] + [Fernet(_derive(s)) for s in _OLD_SECRETS])
+# Identifies the current key without revealing it (used by the rotation job).
+KEY_ID = hashlib.sha256(_KEY).hexdigest()[:16]
+
+# Decrypted values kept in memory, keyed by the digest of the ciphertext.
+DECRYPT_CACHE_SIZE = int(os.getenv("DECRYPT_CACHE_SIZE", "10000"))
+# Batches with more cache misses than this are split across threads.
+DECRYPT_PARALLEL_THRESHOLD = int(os.getenv("DECRYPT_PARALLEL_THRESHOLD", "512"))
+DECRYPT_WORKERS = int(os.getenv("DECRYPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_cache = LRUCache(DECRYPT_CACHE_SIZE)
+_executor: ThreadPoolExecutor | None = None
 
 
 def encrypt(value: str) -> str:
     return _FERNET.encrypt(value.encode()).decode()
 
 
-def decrypt(value: str) -> str:
+def _decrypt(value: str) -> str:
     try:
-        return _FERNET.decrypt(value.encode()).decode()
+        return _MULTI.decrypt(value.encode()).decode()
     except InvalidToken:
         return value
+
+
+def reencrypt(value: str) -> Optional[str]:
+    """Return ``value`` encrypted with the current key, or ``None`` if it
+    already is (or is not a token any known key can read)."""
+    token = value.encode()
+    try:
+        _FERNET.decrypt(token)
+        return None
+    except InvalidToken:
+        pass
+    try:
+        return _MULTI.rotate(token).decode()
+    except InvalidToken:
+        return None
+
+
+def _digest(value: str) -> bytes:
+    return hashlib.sha256(value.encode()).digest()
+
+
+def decrypt(value: str) -> str:
+    key = _digest(value)
+    plain = _cache.get(key)
+    if plain is None:
+        plain = _decrypt(value)
+        _cache.set(key, plain)
+    return plain
+
+
+def _decrypt_chunk(values: list[str]) -> list[str]:
+    return [_decrypt(v) for v in values]
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=DECRYPT_WORKERS, thread_name_prefix="decrypt"
+        )
+    return _executor
+
+
+def decrypt_many(values: Iterable[Optional[str]]) -> list[Optional[str]]:
+    """Decrypt a batch, reusing cached plaintexts and sharing the rest out.
+
+    ``None`` entries are passed through unchanged.
+    """
+    values = list(values)
+    result: list[Optional[str]] = [None] * len(values)
+    pending: dict[bytes, list[int]] = {}
+    for i, value in enumerate(values):
+        if value is None:
+            continue
+        key = _digest(value)
+        plain = _cache.get(key)
+        if plain is None:
+            pending.setdefault(key, []).append(i)
+        else:
+            result[i] = plain
+    if not pending:
+        return result
+
+    keys = list(pending)
+    ciphertexts = [values[pending[k][0]] for k in keys]
+    if DECRYPT_WORKERS > 1 and len(ciphertexts) > DECRYPT_PARALLEL_THRESHOLD:
+        size = -(-len(ciphertexts) // DECRYPT_WORKERS)
+        chunks = [ciphertexts[i:i + size] for i in range(0, len(ciphertexts), size)]
+        plains = [p for part in _get_executor().map(_decrypt_chunk, chunks) for p in part]
+    else:
+        plains = _decrypt_chunk(ciphertexts)
+
+    for key, plain in zip(keys, plains):
+        _cache.set(key, plain)
+        for i in pending[key]:
+            result[i] = plain
+    return result
+
+
+def decrypt_into(objs: list, schema, field: str = "fieldValue") -> list:
+    """Build ``schema`` DTOs from ORM ``objs`` with ``field`` decrypted.
+
+    The ORM instances are left untouched so the session never sees them as
+    modified.
+    """
+    plains = decrypt_many(getattr(o, field) for o in objs)
+    items = []
+    for obj, plain in zip(objs, plains):
+        item = schema.model_validate(obj, from_attributes=True)
+        setattr(item, field, plain)
+        items.append(item)
+    return items
+
+
+def stats() -> dict:
+    return _cache.stats()
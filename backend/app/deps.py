@@ -1,62 +1,188 @@
+import asyncio
+import functools
 import os
 import types
+import time
+import uuid
+import hmac
+import hashlib
 import logging
-
-import bcrypt
-from fastapi import Depends, HTTPException, status
+import secrets
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
-from .database import SessionLocal
+from .database import AsyncSessionLocal, SessionLocal
 
 logger = logging.getLogger(__name__)
-from . import models
+from . import models, permissions, revocation, hashing
+from .hashing import pwd_context  # noqa: F401
+from .cache import LRUCache
 
 SECRET_KEY = os.getenv("SECRET_KEY", "secret")
 ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+# Refresh tokens are random, so a keyed SHA-256 is enough to store them safely.
+REFRESH_TOKEN_SECRET = os.getenv("REFRESH_TOKEN_SECRET", SECRET_KEY).encode()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-# store revoked JWT tokens
-revoked_tokens: set[str] = set()
+# Sessions opened by get_db during the current request (set by SessionRoute).
+_request_sessions: ContextVar[Optional[list]] = ContextVar("request_sessions", default=None)
+# Sampler of the request being profiled (set by profiling.ProfilingMiddleware);
+# sync endpoints register their threadpool thread with it while they run.
+request_profiler: ContextVar = ContextVar("request_profiler", default=None)
 
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "300"))
 
-def revoke_token(token: str) -> None:
-    """Mark a token as revoked so it can no longer be used."""
-    revoked_tokens.add(token)
+# token digest -> (claims, detached user snapshot, principals generation)
+principal_cache = LRUCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
+# Row of ``table_generations`` advanced whenever a user or role changes, so
+# other workers drop principals they cached before the change.
+PRINCIPALS_GENERATION = "principals"
+_principals_generation = 0
+_principals_generation_read = 0.0
 
 
-def is_token_revoked(token: str) -> bool:
-    return token in revoked_tokens
+def revoke_token(db: Session, token: str) -> None:
+    """Mark a token as revoked so it can no longer be used."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return
+    if payload.get("jti") and payload.get("exp"):
+        revocation.revoke(db, payload["jti"], payload["exp"])
 
-# passlib<=1.7.4 expects `bcrypt.__about__.__version__`, which is no longer
-# available starting with bcrypt 4.0. To remain compatible with newer bcrypt
-# releases while keeping passlib untouched, emulate the old attribute if it is
-# missing.
-if not hasattr(bcrypt, "__about__"):
-    bcrypt.__about__ = types.SimpleNamespace(__version__=bcrypt.__version__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def is_token_revoked(db: Session, payload: dict) -> bool:
+    return revocation.is_revoked(db, payload["jti"])
 
 
 def get_db():
+    # FastAPI caches this dependency per request, so the handler and every
+    # auth/permission dependency share one session. It connects lazily on
+    # the first statement.
     db = SessionLocal()
+    sessions = _request_sessions.get()
+    if sessions is not None:
+        sessions.append(db)
     logger.debug("DB session opened")
     try:
         yield db
     finally:
-        db.close()
-        logger.debug("DB session closed")
+        if not db.info.get("kept_open"):
+            db.close()
+            logger.debug("DB session closed")
+
+
+def keep_open(db) -> None:
+    """Hand the request session to the response, which then closes it.
+
+    Used by streamed bodies that read on the session after the endpoint
+    returns; the request neither releases nor closes it.
+    """
+    db.info["kept_open"] = True
+
+
+def release_session(db: Session) -> None:
+    """End a read-only transaction so its connection returns to the pool.
+
+    Loaded objects stay attached and usable for serialization; a later lazy
+    load checks out a connection again. Sessions with unflushed or
+    uncommitted ORM writes are left for ``close`` to roll back.
+    """
+    if not db.in_transaction() or db.new or db.dirty or db.deleted:
+        return
+    if db.info.get("kept_open"):
+        return
+    if db.info.get("changed_tables"):
+        return
+    expire, db.expire_on_commit = db.expire_on_commit, False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire
+
+
+def _releasing(endpoint):
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def call(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                for db in _request_sessions.get() or ():
+                    await run_in_threadpool(release_session, db)
+
+    else:
+
+        @functools.wraps(endpoint)
+        def call(*args, **kwargs):
+            profiler = request_profiler.get()
+            if profiler is not None:
+                profiler.add_thread(threading.get_ident())
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                for db in _request_sessions.get() or ():
+                    release_session(db)
+                if profiler is not None:
+                    profiler.remove_thread(threading.get_ident())
+
+    return call
+
+
+class SessionRoute(APIRoute):
+    """Route that gives back pooled connections when the endpoint returns.
+
+    Without it the session of a request is only closed after the response
+    has been serialized.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _releasing(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request):
+            token = _request_sessions.set([])
+            try:
+                return await handler(request)
+            finally:
+                _request_sessions.reset(token)
+
+        return route_handler
+
+
+async def get_async_db():
+    """AsyncSession per request; sync helpers run on it through ``run_sync``."""
+    db = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        if not db.info.get("kept_open"):
+            await db.close()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return hashing.verify_password(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return hashing.hash_password(password)
 
 
 def get_user(db: Session, username: str):
@@ -74,8 +200,166 @@ def authenticate_user(db: Session, username: str, password: str):
     return user
 
 
-def create_access_token(data: dict) -> str:
-    return jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
+async def authenticate_user_async(db: Session, username: str, password: str):
+    """Variant of ``authenticate_user`` that awaits bcrypt in the hashing pool."""
+    user = await run_in_threadpool(get_user, db, username)
+    if not user:
+        return False
+    if not await hashing.verify_password_async(password, user.password):
+        return False
+    if not user.is_active:
+        return False
+    return user
+
+
+def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
+    to_encode = data.copy()
+    expire = datetime.now(timezone.utc) + (
+        expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _snapshot_user(user: models.User) -> types.SimpleNamespace:
+    """Copy the columns used by handlers so no session is needed later."""
+    role = user.role
+    return types.SimpleNamespace(
+        id=user.id,
+        username=user.username,
+        password=user.password,
+        last_login=user.last_login,
+        is_active=user.is_active,
+        endSubscriptionDate=user.endSubscriptionDate,
+        role_id=user.role_id,
+        dedication=user.dedication,
+        role=types.SimpleNamespace(
+            id=role.id, name=role.name, description=role.description
+        ),
+    )
+
+
+def invalidate_principal(token: str) -> None:
+    principal_cache.pop(_token_digest(token))
+
+
+def principals_generation(db: Session) -> int:
+    """Shared principals generation, re-read at the revocation sync interval."""
+    global _principals_generation, _principals_generation_read
+    if time.monotonic() - _principals_generation_read > revocation.SYNC_INTERVAL_SECONDS:
+        value = (
+            db.query(models.TableGeneration.generation)
+            .filter_by(name=PRINCIPALS_GENERATION)
+            .scalar()
+        )
+        _principals_generation = value or 0
+        _principals_generation_read = time.monotonic()
+    return _principals_generation
+
+
+def _bump_principals_generation(db: Session) -> None:
+    global _principals_generation_read
+    table = models.TableGeneration.__table__
+    bumped = db.execute(
+        table.update()
+        .where(table.c.name == PRINCIPALS_GENERATION)
+        .values(generation=table.c.generation + 1)
+    ).rowcount
+    if not bumped:
+        db.add(models.TableGeneration(name=PRINCIPALS_GENERATION, generation=1))
+    db.commit()
+    # Read the new value on the next request instead of waiting for the interval.
+    _principals_generation_read = 0.0
+
+
+def invalidate_user_principals(db: Session, *user_ids: int) -> None:
+    """Forget cached principals of ``user_ids`` here and, within
+    ``REVOCATION_SYNC_INTERVAL`` seconds, in every other worker."""
+    ids = set(user_ids)
+    principal_cache.evict_where(lambda _, v: v[1].id in ids)
+    _bump_principals_generation(db)
+
+
+def invalidate_role_principals(db: Session, *role_ids: int) -> None:
+    ids = set(role_ids)
+    principal_cache.evict_where(lambda _, v: v[1].role_id in ids)
+    _bump_principals_generation(db)
+
+
+def _hash_refresh_token(token: str) -> str:
+    return hmac.new(REFRESH_TOKEN_SECRET, token.encode(), hashlib.sha256).hexdigest()
+
+
+def create_refresh_token(db: Session, user_id: int) -> str:
+    """Issue a new refresh token for ``user_id`` and store only its hash."""
+    token = secrets.token_urlsafe(32)
+    expires = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(
+        models.RefreshToken(
+            userId=user_id,
+            token_hash=_hash_refresh_token(token),
+            expires_at=int(expires.timestamp()),
+            creationDate=datetime.utcnow(),
+        )
+    )
+    db.commit()
+    return token
+
+
+def rotate_refresh_token(db: Session, token: str) -> tuple[str, str]:
+    """Exchange a refresh token for a new access and refresh token pair.
+
+    A refresh token can be used once. Presenting one that was already rotated
+    revokes every refresh token of its user, since it must have leaked.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+    )
+    token_hash = _hash_refresh_token(token)
+    stored = db.query(models.RefreshToken).filter_by(token_hash=token_hash).first()
+    if stored is None:
+        raise invalid
+    # Claim the token with one conditional UPDATE: of two concurrent
+    # refreshes only one can flip it, the other is treated as reuse.
+    claimed = (
+        db.query(models.RefreshToken)
+        .filter_by(token_hash=token_hash, revoked=False)
+        .update({"revoked": True}, synchronize_session=False)
+    )
+    db.commit()
+    if not claimed:
+        revoke_refresh_tokens(db, stored.userId)
+        raise invalid
+    if stored.expires_at <= time.time():
+        raise invalid
+    user = db.query(models.User).filter_by(id=stored.userId).first()
+    if user is None or not user.is_active:
+        raise invalid
+    access = create_access_token({"user_id": user.id})
+    return access, create_refresh_token(db, user.id)
+
+
+def revoke_refresh_token(db: Session, token: str) -> None:
+    (
+        db.query(models.RefreshToken)
+        .filter_by(token_hash=_hash_refresh_token(token))
+        .update({"revoked": True}, synchronize_session=False)
+    )
+    db.commit()
+
+
+def revoke_refresh_tokens(db: Session, user_id: int) -> None:
+    (
+        db.query(models.RefreshToken)
+        .filter_by(userId=user_id, revoked=False)
+        .update({"revoked": True}, synchronize_session=False)
+    )
+    db.commit()
 
 
 def get_current_user(
@@ -86,19 +370,48 @@ def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    digest = _token_digest(token)
+    cached = principal_cache.get(digest)
+    if cached is not None and cached[2] == principals_generation(db):
+        if is_token_revoked(db, cached[0]):
+            principal_cache.pop(digest)
+            raise credentials_exception
+        return cached[1]
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(
+            token,
+            SECRET_KEY,
+            algorithms=[ALGORITHM],
+            options={"require_exp": True, "require_jti": True},
+        )
         user_id: int | None = payload.get("user_id")
         if user_id is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    if is_token_revoked(token):
+    if is_token_revoked(db, payload):
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    # Read before the user so a change committed meanwhile is not masked.
+    generation = principals_generation(db)
+    user = (
+        db.query(models.User)
+        .options(joinedload(models.User.role))
+        .filter(models.User.id == user_id)
+        .first()
+    )
     if user is None:
         raise credentials_exception
-    return user
+    principal = _snapshot_user(user)
+    ttl = min(PRINCIPAL_CACHE_TTL, payload["exp"] - time.time())
+    principal_cache.set(digest, (payload, principal, generation), ttl=ttl)
+    return principal
+
+
+async def get_current_user_async(
+    db=Depends(get_async_db), token: str = Depends(oauth2_scheme)
+):
+    """``get_current_user`` on the async session, without a threadpool hop."""
+    return await db.run_sync(get_current_user, token)
 
 
 def require_api_permission(route: str, method: str):
@@ -108,18 +421,26 @@ def require_api_permission(route: str, method: str):
     ):
         if current_user.role.name == "Administrador":
             return
-        perms = (
-            db.query(models.ApiPermission)
-            .filter_by(route=route, method=method)
-            .all()
-        )
-        if not perms:
+        if not permissions.has_api_permission(
+            db, current_user.role_id, route, method
+        ):
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Forbidden",
+                status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden"
             )
-        allowed = any(p.role_id == current_user.role_id for p in perms)
-        if not allowed:
+
+    return _check
+
+
+def require_api_permission_async(route: str, method: str):
+    async def _check(
+        current_user: models.User = Depends(get_current_user_async),
+        db=Depends(get_async_db),
+    ):
+        if current_user.role.name == "Administrador":
+            return
+        if not await db.run_sync(
+            permissions.has_api_permission, current_user.role_id, route, method
+        ):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden"
             )
@@ -140,18 +461,19 @@ def require_architect(current_user: models.User = Depends(get_current_user)):
     return current_user
 
 
+async def require_architect_async(
+    current_user: models.User = Depends(get_current_user_async),
+):
+    return require_architect(current_user)
+
+
 
 def require_page_permission(page: str):
     def _check(
         current_user: models.User = Depends(get_current_user),
         db: Session = Depends(get_db),
     ):
-        perm = (
-            db.query(models.PagePermission)
-            .filter_by(page=page, role_id=current_user.role_id)
-            .first()
-        )
-        if perm is None:
+        if not permissions.has_page_permission(db, current_user.role_id, page):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden"
             )
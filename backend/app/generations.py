@@ -0,0 +1,164 @@
+import hashlib
+import logging
+from typing import Callable, Iterable, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import deps, models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Bookkeeping tables whose writes never change an API listing.
+UNTRACKED = {
+    "table_generations",
+    "rate_limits",
+    "revoked_tokens",
+    "refresh_tokens",
+    "key_rotation_state",
+    "seed_state",
+}
+
+_generations = models.TableGeneration.__table__
+_listeners: list[Callable[[set], None]] = []
+
+
+def tracked_tables() -> list[str]:
+    return [t.name for t in models.Base.metadata.sorted_tables if t.name not in UNTRACKED]
+
+
+def _changed(session: Session) -> set:
+    return session.info.setdefault("changed_tables", set())
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_flushed(session: Session, _flush_context) -> None:
+    changed = _changed(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            changed.add(table.name)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _collect_statements(state) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None:
+            _changed(state.session).add(table.name)
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _collect_before_commit(session: Session) -> None:
+    # Flush first so pending objects are counted.
+    session.flush()
+    names = _changed(session) - UNTRACKED
+    session.info["changed_tables"] = set()
+    if names:
+        session.info.setdefault("bumped_tables", set()).update(names)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _bump_committed(session: Session) -> None:
+    # Bumped after the write commits, in a transaction of its own, so the
+    # counter row is locked for one UPDATE instead of for the whole write.
+    # Between the two commits readers may see the new rows under the old
+    # generation; the bump then changes the ETag and evicts what they cached.
+    names = session.info.pop("bumped_tables", None)
+    if not names:
+        return
+    try:
+        bump(session.get_bind().engine, names)
+    except Exception:
+        logger.exception("Could not bump generations of %s", sorted(names))
+    for listener in _listeners:
+        listener(names)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_rolled_back(session: Session) -> None:
+    session.info["changed_tables"] = set()
+    session.info.pop("bumped_tables", None)
+
+
+def subscribe(listener: Callable[[set], None]) -> None:
+    """Call ``listener(table_names)`` after each commit that changed them."""
+    _listeners.append(listener)
+
+
+def bump(bind, names: Iterable[str]) -> None:
+    """Advance the generation of ``names`` in a short transaction on ``bind``."""
+    with bind.begin() as conn:
+        conn.execute(
+            _generations.update()
+            .where(_generations.c.name.in_(sorted(names)))
+            .values(generation=_generations.c.generation + 1)
+        )
+
+
+def current(db: Session, names: Iterable[str]) -> Optional[tuple]:
+    """Generations of ``names``, or ``None`` if any is not tracked."""
+    names = sorted(set(names))
+    rows = dict(
+        db.query(models.TableGeneration.name, models.TableGeneration.generation)
+        .filter(models.TableGeneration.name.in_(names))
+        .all()
+    )
+    if len(rows) != len(names):
+        return None
+    return tuple(rows[n] for n in names)
+
+
+def _matches(header: str, etag: str) -> bool:
+    candidates = [c.strip() for c in header.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def check(
+    db: Session,
+    request: Request,
+    response: Response,
+    tables: Iterable[str],
+    scope: str = "",
+) -> Optional[str]:
+    """Answer 304 when ``If-None-Match`` still matches, else set ``ETag``.
+
+    The tag covers the generations of ``tables``, the URL (path and query)
+    and ``scope`` (e.g. the user, for listings filtered per user). Call it
+    before running the query so a match costs one indexed lookup.
+    """
+    generation = current(db, tables)
+    if generation is None:
+        return None
+    raw = f"{generation}|{request.url.path}?{request.url.query}|{scope}"
+    etag = '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return etag
+
+
+def conditional(tables: Iterable[str], per_user: bool = False):
+    """Dependency version of :func:`check` for routes that list ``tables``."""
+    tables = tuple(tables)
+
+    if per_user:
+        def _check(
+            request: Request,
+            response: Response,
+            db: Session = Depends(deps.get_db),
+            current_user: models.User = Depends(deps.get_current_user),
+        ) -> Optional[str]:
+            return check(db, request, response, tables, scope=str(current_user.id))
+    else:
+        def _check(
+            request: Request,
+            response: Response,
+            db: Session = Depends(deps.get_db),
+        ) -> Optional[str]:
+            return check(db, request, response, tables)
+
+    return _check
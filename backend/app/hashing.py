@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import types
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import bcrypt
+from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+# passlib<=1.7.4 expects `bcrypt.__about__.__version__`, which is no longer
+# available starting with bcrypt 4.0. To remain compatible with newer bcrypt
+# releases while keeping passlib untouched, emulate the old attribute if it is
+# missing.
+if not hasattr(bcrypt, "__about__"):
+    bcrypt.__about__ = types.SimpleNamespace(__version__=bcrypt.__version__)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Number of processes dedicated to bcrypt; 0 hashes inline in the caller.
+HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+# Forking a multithreaded server can copy locks held by other threads into
+# the child, so workers come from a clean forkserver (spawn where missing).
+HASH_START_METHOD = os.getenv(
+    "PASSWORD_HASH_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+# Jobs allowed to wait or run at once before new ones are rejected with 503.
+HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+
+class HashingOverloaded(RuntimeError):
+    """Raised when ``HASH_MAX_PENDING`` jobs are already queued."""
+
+
+_lock = threading.Lock()
+_executor: ProcessPoolExecutor | None = None
+_stats = {"pending": 0, "max_pending_seen": 0, "completed": 0, "rejected": 0}
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=HASH_WORKERS,
+            mp_context=multiprocessing.get_context(HASH_START_METHOD),
+        )
+        logger.info("Started password hashing pool with %d workers", HASH_WORKERS)
+    return _executor
+
+
+def _done(_: Future) -> None:
+    with _lock:
+        _stats["pending"] -= 1
+        _stats["completed"] += 1
+
+
+def _submit(fn, *args) -> Future:
+    with _lock:
+        if _stats["pending"] >= HASH_MAX_PENDING:
+            _stats["rejected"] += 1
+            raise HashingOverloaded("Too many concurrent logins, retry later")
+        _stats["pending"] += 1
+        _stats["max_pending_seen"] = max(_stats["max_pending_seen"], _stats["pending"])
+        executor = _get_executor()
+    try:
+        future = executor.submit(fn, *args)
+    except Exception:
+        with _lock:
+            _stats["pending"] -= 1
+        raise
+    future.add_done_callback(_done)
+    return future
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Check a password, blocking the caller until the pool answers."""
+    if HASH_WORKERS <= 0:
+        return _verify(plain_password, hashed_password)
+    return _submit(_verify, plain_password, hashed_password).result()
+
+
+def hash_password(password: str) -> str:
+    if HASH_WORKERS <= 0:
+        return _hash(password)
+    return _submit(_hash, password).result()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Check a password without holding a threadpool thread while waiting."""
+    if HASH_WORKERS <= 0:
+        return _verify(plain_password, hashed_password)
+    return await asyncio.wrap_future(_submit(_verify, plain_password, hashed_password))
+
+
+async def hash_password_async(password: str) -> str:
+    if HASH_WORKERS <= 0:
+        return _hash(password)
+    return await asyncio.wrap_future(_submit(_hash, password))
+
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    """Hash a batch across the pool, at most half the queue at a time."""
+    window = max(1, HASH_MAX_PENDING // 2)
+    hashes = []
+    for start in range(0, len(passwords), window):
+        hashes.extend(await asyncio.gather(
+            *(hash_password_async(p) for p in passwords[start:start + window])
+        ))
+    return hashes
+
+
+def stats() -> dict:
+    with _lock:
+        data = dict(_stats)
+    data["workers"] = HASH_WORKERS
+    data["max_pending"] = HASH_MAX_PENDING
+    return data
+
+
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
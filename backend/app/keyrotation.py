@@ -0,0 +1,133 @@
+import logging
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import bindparam, func
+from sqlalchemy.orm import Session
+
+from . import crypto, models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Rows read and rewritten per transaction.
+BATCH_SIZE = int(os.getenv("REENCRYPT_BATCH_SIZE", "500"))
+# Pause between batches so the job never saturates the database.
+PAUSE_SECONDS = float(os.getenv("REENCRYPT_PAUSE_SECONDS", "0.05"))
+
+_raw = models.RawData.__table__
+# Only rewrite a row if nobody changed it since it was read.
+_UPDATE = (
+    _raw.update()
+    .where(_raw.c.id == bindparam("b_id"), _raw.c.fieldValue == bindparam("b_old"))
+    .values(fieldValue=bindparam("b_new"))
+)
+
+_lock = threading.Lock()
+_thread: threading.Thread | None = None
+_stop = threading.Event()
+
+
+def _state(db: Session) -> models.KeyRotationState:
+    state = db.get(models.KeyRotationState, crypto.KEY_ID)
+    if state is None:
+        state = models.KeyRotationState(
+            key_id=crypto.KEY_ID, last_id=0, scanned=0, rotated=0, finished=False
+        )
+        db.add(state)
+        db.flush()
+    return state
+
+
+def run_batch(db: Session) -> bool:
+    """Re-encrypt the next chunk after the saved cursor.
+
+    Returns ``True`` while more rows may remain.
+    """
+    state = _state(db)
+    if state.finished:
+        return False
+    rows = (
+        db.query(models.RawData.id, models.RawData.fieldValue)
+        .filter(models.RawData.id > state.last_id, models.RawData.fieldValue.isnot(None))
+        .order_by(models.RawData.id)
+        .limit(BATCH_SIZE)
+        .all()
+    )
+    updates = []
+    for row in rows:
+        token = crypto.reencrypt(row.fieldValue)
+        if token is not None:
+            updates.append({"b_id": row.id, "b_old": row.fieldValue, "b_new": token})
+    if updates:
+        db.execute(_UPDATE, updates)
+    if rows:
+        state.last_id = rows[-1].id
+    state.scanned += len(rows)
+    state.rotated += len(updates)
+    state.finished = len(rows) < BATCH_SIZE
+    state.updatedDate = datetime.utcnow()
+    db.commit()
+    return not state.finished
+
+
+def run(stop: threading.Event | None = None) -> None:
+    """Walk ``raw_data`` until every value uses the current key."""
+    logger.info("Re-encrypting raw data with key %s", crypto.KEY_ID)
+    db = SessionLocal()
+    try:
+        while run_batch(db):
+            if stop is not None and stop.wait(PAUSE_SECONDS):
+                logger.info("Re-encryption paused")
+                return
+        logger.info("Re-encryption finished")
+    except Exception:
+        db.rollback()
+        logger.exception("Re-encryption failed, it will resume from the last batch")
+    finally:
+        db.close()
+
+
+def start() -> bool:
+    """Start the job in a daemon thread; ``False`` if it is already running."""
+    global _thread
+    with _lock:
+        if _thread is not None and _thread.is_alive():
+            return False
+        _stop.clear()
+        _thread = threading.Thread(
+            target=run, args=(_stop,), name="reencrypt", daemon=True
+        )
+        _thread.start()
+        return True
+
+
+def stop(timeout: float = 5) -> None:
+    _stop.set()
+    thread = _thread
+    if thread is not None:
+        thread.join(timeout)
+
+
+def status(db: Session) -> dict:
+    state = db.get(models.KeyRotationState, crypto.KEY_ID)
+    last_id = state.last_id if state else 0
+    remaining = (
+        db.query(func.count(models.RawData.id))
+        .filter(models.RawData.id > last_id, models.RawData.fieldValue.isnot(None))
+        .scalar()
+    )
+    scanned = state.scanned if state else 0
+    total = scanned + remaining
+    return {
+        "key_id": crypto.KEY_ID,
+        "running": _thread is not None and _thread.is_alive(),
+        "finished": bool(state and state.finished),
+        "last_id": last_id,
+        "scanned": scanned,
+        "rotated": state.rotated if state else 0,
+        "remaining": remaining,
+        "progress": scanned / total if total else 1.0,
+        "updatedDate": state.updatedDate if state else None,
+    }
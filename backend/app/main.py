@@ -1,149 +1,42 @@
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Request
 import logging
+import os
 
 logging.basicConfig(level=logging.INFO)
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import datetime
+from typing import Optional
 
-from .database import engine, SessionLocal
-from . import models, schemas, deps
+from .database import engine, SessionLocal, check_connection
+from . import models, schemas, deps, permissions, hashing, seed, ratelimit, security, keyrotation
+from . import database, metrics, migrations, profiling, responsecache, slowqueries, sqlstats, streaming, writes
 from .crud import create_crud_router
 from .routes import all_routers
 
 logger = logging.getLogger(__name__)
 
+router = APIRouter(route_class=deps.SessionRoute)
+
 
 def seed_database() -> None:
-    logger.info("Seeding database")
+    """Create the schema and reference data unless they are up to date."""
     db = SessionLocal()
     try:
-        roles = [
-            ("Administrador", "/dashboard"),
-            ("Automation Engineer", "/dashboard"),
-            ("Gerente de servicios", "/clients"),
-            ("Analista de Performance", "/clients"),
-            ("Automatizador de Pruebas", "/clients"),
-            ("Arquitecto de Automatización", "/interactions"),
-            ("Analista de Pruebas con skill de automatización", "/clients"),
-        ]
-
-        role_objs: list[tuple[models.Role, str]] = []
-        for name, start_page in roles:
-            role = db.query(models.Role).filter_by(name=name).first()
-            if not role:
-                role = models.Role(name=name, description=name)
-                db.add(role)
-                db.commit()
-                db.refresh(role)
-            role_objs.append((role, start_page))
-
-        for role, page in role_objs:
-            exists = (
-                db.query(models.PagePermission)
-                .filter_by(role_id=role.id, page=page, isStartPage=True)
-                .first()
-            )
-            if not exists:
-                db.add(
-                    models.PagePermission(
-                        page=page,
-                        role_id=role.id,
-                        isStartPage=True,
-                        description="start",
-                    )
-                )
-
-        role_map = {r.name: r for r, _ in role_objs}
-        perms = [
-            ("/clients", "POST", "Gerente de servicios"),
-            ("/users", "PUT", "Arquitecto de Automatización"),
-            ("/actors", "GET", "Gerente de servicios"),
-            ("/digitalassets", "GET", "Gerente de servicios"),
-        ]
-        for route, method, role_name in perms:
-            role = role_map.get(role_name)
-            if role:
-                if (
-                    not db.query(models.ApiPermission)
-                    .filter_by(route=route, method=method, role_id=role.id)
-                    .first()
-                ):
-                    db.add(
-                        models.ApiPermission(
-                            route=route, method=method, role_id=role.id
-                        )
-                    )
-
-        for name in ["web", "movil", "apis", "performance"]:
-            if not db.query(models.Hability).filter_by(name=name).first():
-                db.add(models.Hability(name=name))
-
-        for desc in ["textbox", "button", "combobox", "selector"]:
-            if not db.query(models.ElementType).filter_by(description=desc).first():
-                db.add(models.ElementType(description=desc))
-
-        for name in ["pendiente", "aprobado", "rechazado"]:
-            if (
-                not db.query(models.InteractionApprovalState)
-                .filter_by(name=name)
-                .first()
-            ):
-                db.add(models.InteractionApprovalState(name=name))
-
-        field_types = [
-            ("numerico", None, "numeric"),
-            ("alfanumerico", None, "alphanumeric"),
-            ("alfabeto", None, "alphabet"),
-            ("uuid", None, "uuid"),
-            ("fecha", "YYYY-MM-DD", "date"),
-        ]
-        for name, fmt, desc in field_types:
-            if not db.query(models.FieldType).filter_by(name=name).first():
-                db.add(models.FieldType(name=name, format=fmt, description=desc))
-
-        admin_role = db.query(models.Role).filter_by(name="Administrador").first()
-        admin_user = db.query(models.User).filter_by(username="admin").first()
-        if admin_role and not admin_user:
-            db.add(
-                models.User(
-                    username="admin",
-                    password=deps.get_password_hash("admin"),
-                    role_id=admin_role.id,
-                )
-            )
-
-        default_users = [
-            ("architect", "Arquitecto de Automatización"),
-            ("AngelC", "Gerente de servicios"),
-            ("T23AutoPerson", "Automatizador de Pruebas"),
-        ]
-        for username, role_name in default_users:
-            role = role_map.get(role_name)
-            if role and not db.query(models.User).filter_by(username=username).first():
-                db.add(
-                    models.User(
-                        username=username,
-                        password=deps.get_password_hash("admin"),
-                        role_id=role.id,
-                    )
-                )
-
-        db.commit()
-        logger.info("Database seed commit successful")
+        seed.ensure_seeded(
+            db, lambda: models.Base.metadata.create_all(bind=engine)
+        )
     finally:
         db.close()
         logger.info("Seeding finished")
 
 
-logger.info("Creating database tables")
-models.Base.metadata.create_all(bind=engine)
-logger.info("Tables created")
-seed_database()
-
-
 def validate_database() -> None:
     """Ensure critical tables exist and have data."""
     logger.info("Validating seeded tables")
@@ -158,40 +51,84 @@ def validate_database() -> None:
         db.close()
 
 
-validate_database()
-
-app = FastAPI(title="Test Automation API")
-
-# Enable CORS for frontend requests
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-@app.post("/token")
-def login(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(deps.get_db)
+_initialized = False
+
+
+def init_database() -> None:
+    """Run the startup database work once per process."""
+    global _initialized
+    if _initialized:
+        return
+    check_connection()
+    seed_database()
+    if migrations.MIGRATE_ON_STARTUP:
+        migrations.apply_indexes()
+    validate_database()
+    _initialized = True
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    await run_in_threadpool(init_database)
+    if os.getenv("REENCRYPT_ON_STARTUP") == "1":
+        keyrotation.start()
+    profiling.start_continuous()
+    yield
+    profiling.stop_continuous()
+    keyrotation.stop()
+    hashing.shutdown()
+    engine.dispose()
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+
+@router.post("/token")
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(deps.get_db),
 ):
-    user = deps.authenticate_user(db, form_data.username, form_data.password)
+    # Only failed attempts are charged, so legitimate clients are not throttled.
+    client_ip = ratelimit.client_ip(request)
+    await run_in_threadpool(
+        security.ensure_login_allowed, client_ip, form_data.username
+    )
+    user = await deps.authenticate_user_async(
+        db, form_data.username, form_data.password
+    )
     if not user:
+        await run_in_threadpool(
+            security.record_failed_login, client_ip, form_data.username
+        )
         raise HTTPException(status_code=400, detail="Invalid credentials")
     token = deps.create_access_token({"user_id": user.id})
-    return {"access_token": token, "token_type": "bearer"}
+    refresh = await run_in_threadpool(deps.create_refresh_token, db, user.id)
+    return {"access_token": token, "refresh_token": refresh, "token_type": "bearer"}
 
 
-@app.post("/logout")
-def logout(token: str = Depends(deps.oauth2_scheme)):
-    deps.revoke_token(token)
+@router.post("/token/refresh")
+def refresh_access_token(
+    body: schemas.RefreshRequest, db: Session = Depends(deps.get_db)
+):
+    """Issue a new token pair from a refresh token without checking a password."""
+    token, refresh = deps.rotate_refresh_token(db, body.refresh_token)
+    return {"access_token": token, "refresh_token": refresh, "token_type": "bearer"}
+
+
+@router.post("/logout")
+def logout(
+    body: Optional[schemas.RefreshRequest] = None,
+    token: str = Depends(deps.oauth2_scheme),
+    db: Session = Depends(deps.get_db),
+):
+    deps.revoke_token(db, token)
+    deps.invalidate_principal(token)
+    if body is not None:
+        deps.revoke_refresh_token(db, body.refresh_token)
     return {"ok": True}
 
 
-@app.post("/register", response_model=schemas.User)
-def register(user: schemas.UserRegister, db: Session = Depends(deps.get_db)):
-    """Public endpoint to create a new user with the selected role."""
+def _registration_role(user: schemas.UserRegister, db: Session) -> models.Role:
     role_map = {
         "analyst": "Analista de Pruebas con skill de automatización",
         "service_manager": "Gerente de servicios",
@@ -205,112 +142,53 @@ def register(user: schemas.UserRegister, db: Session = Depends(deps.get_db)):
         raise HTTPException(status_code=400, detail="Role not found")
     if db.query(models.User).filter_by(username=user.username).first():
         raise HTTPException(status_code=400, detail="Username already exists")
-    db_user = models.User(
-        username=user.username,
-        password=deps.get_password_hash(user.password),
-        role_id=role.id,
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    return role
 
 
-def _client_with_analysts(client: models.Client, db: Session) -> models.Client:
-    analysts = (
-        db.query(models.User)
-        .join(models.ClientAnalyst, models.ClientAnalyst.userId == models.User.id)
-        .filter(models.ClientAnalyst.clientId == client.id)
-        .all()
+def _store_registered_user(
+    user: schemas.UserRegister, hashed: str, role: models.Role, db: Session
+) -> models.User:
+    row = writes.insert_row(
+        db, models.User, {"username": user.username, "password": hashed, "role_id": role.id}
     )
-    client.analysts = analysts
-    return client
-
+    db.commit()
+    return row
 
-def _project_with_analysts(project: models.Project, db: Session) -> models.Project:
-    analysts = (
-        db.query(models.User)
-        .join(models.ProjectEmployee, models.ProjectEmployee.userId == models.User.id)
-        .filter(models.ProjectEmployee.projectId == project.id)
-        .all()
-    )
-    project.analysts = analysts
-    return project
 
+@router.post(
+    "/register",
+    response_model=schemas.User,
+    dependencies=[Depends(ratelimit.limit_requests(security.register_limiter))],
+)
+async def register(user: schemas.UserRegister, db: Session = Depends(deps.get_db)):
+    """Public endpoint to create a new user with the selected role."""
+    role = await run_in_threadpool(_registration_role, user, db)
+    hashed = await hashing.hash_password_async(user.password)
+    return await run_in_threadpool(_store_registered_user, user, hashed, role, db)
 
-# CRUD routers for main entities
-def register_cruds():
-    mappings = [
-        ("roles", models.Role, schemas.Role),
-        ("users", models.User, schemas.User),
-        ("pagepermissions", models.PagePermission, schemas.PagePermission),
-        ("apipermissions", models.ApiPermission, schemas.ApiPermission),
-        ("businessagreements", models.BusinessAgreement, schemas.BusinessAgreement),
-        ("userinterfaces", models.UserInterface, schemas.UserInterface),
-        ("elementtypes", models.ElementType, schemas.ElementType),
-        ("elements", models.Element, schemas.Element),
-        ("projectemployees", models.ProjectEmployee, schemas.ProjectEmployee),
-        ("actors", models.Actor, schemas.Actor),
-        ("habilities", models.Hability, schemas.Hability),
-        ("interactions", models.Interaction, schemas.Interaction),
-        (
-            "interactionparameters",
-            models.InteractionParameter,
-            schemas.InteractionParameter,
-        ),
-        (
-            "interactionapprovalstates",
-            models.InteractionApprovalState,
-            schemas.InteractionApprovalState,
-        ),
-        (
-            "interactionapprovals",
-            models.InteractionApproval,
-            schemas.InteractionApproval,
-        ),
-        ("validations", models.Validation, schemas.Validation),
-        (
-            "validationparameters",
-            models.ValidationParameter,
-            schemas.ValidationParameter,
-        ),
-        ("validationapprovals", models.ValidationApproval, schemas.ValidationApproval),
-        ("tasks", models.Task, schemas.Task),
-
-        (
-            "taskhaveinteractions",
-            models.TaskHaveInteraction,
-            schemas.TaskHaveInteraction,
-        ),
-        ("fieldtypes", models.FieldType, schemas.FieldType),
-        ("features", models.Feature, schemas.Feature),
-        ("clientanalysts", models.ClientAnalyst, schemas.ClientAnalyst),
-        ("scenariohasfeatures", models.ScenarioHasFeature, schemas.ScenarioHasFeature),
-        ("featuresteps", models.FeatureStep, schemas.FeatureStep),
-        ("scenarioinfo", models.ScenarioInfo, schemas.ScenarioInfo)
-    ]
-    for prefix, model, schema in mappings:
-        app.include_router(create_crud_router(prefix, model, schema))
 
+def _client_with_analysts(client: models.Client, db: Session) -> models.Client:
+    """Reload ``analysts`` so it reflects the link just added or removed.
 
-register_cruds()
-for r in all_routers:
-    app.include_router(r)
+    Client and project writes return the ORM object, not a RETURNING row,
+    because their response embeds this relationship.
+    """
+    db.refresh(client, attribute_names=["analysts"])
+    return client
 
-from .routes import all_routers as custom_routers
 
-for r in custom_routers:
-    app.include_router(r)
-from .routes import interactions as interactions_routes
-from .routes import validations as validations_routes
+def _project_with_analysts(project: models.Project, db: Session) -> models.Project:
+    """Project counterpart of :func:`_client_with_analysts`."""
+    db.refresh(project, attribute_names=["analysts"])
+    return project
 
 
-@app.get("/users/me/", response_model=schemas.User)
+@router.get("/users/me/", response_model=schemas.User)
 def read_current_user(current_user: models.User = Depends(deps.get_current_user)):
     return current_user
 
 
-@app.get("/permissions")
+@router.get("/permissions")
 def read_permissions(
     current_user: models.User = Depends(deps.get_current_user),
     db: Session = Depends(deps.get_db),
@@ -326,12 +204,12 @@ def read_permissions(
     }
 
 
-@app.get("/roles/{role_id}/permissions")
+@router.get("/roles/{role_id}/permissions")
 def list_role_page_permissions(role_id: int, db: Session = Depends(deps.get_db)):
     return db.query(models.PagePermission).filter_by(role_id=role_id).all()
 
 
-@app.post("/roles/{role_id}/permissions", response_model=schemas.PagePermission)
+@router.post("/roles/{role_id}/permissions", response_model=schemas.PagePermission)
 def add_role_page_permission(
     role_id: int,
     perm: schemas.PagePermissionInput,
@@ -343,19 +221,22 @@ def add_role_page_permission(
         .first()
     ):
         raise HTTPException(status_code=400, detail="Permission exists")
-    obj = models.PagePermission(
-        page=perm.page,
-        role_id=role_id,
-        isStartPage=perm.isStartPage,
-        description=perm.description,
+    row = writes.insert_row(
+        db,
+        models.PagePermission,
+        {
+            "page": perm.page,
+            "role_id": role_id,
+            "isStartPage": perm.isStartPage,
+            "description": perm.description,
+        },
     )
-    db.add(obj)
     db.commit()
-    db.refresh(obj)
-    return obj
+    permissions.invalidate()
+    return row
 
 
-@app.delete("/roles/{role_id}/permissions/{page:path}")
+@router.delete("/roles/{role_id}/permissions/{page:path}")
 def remove_role_page_permission(
     role_id: int, page: str, db: Session = Depends(deps.get_db)
 ):
@@ -364,15 +245,16 @@ def remove_role_page_permission(
         raise HTTPException(status_code=404, detail="Not found")
     db.delete(perm)
     db.commit()
+    permissions.invalidate()
     return {"ok": True}
 
 
-@app.get("/roles/{role_id}/api-permissions")
+@router.get("/roles/{role_id}/api-permissions")
 def list_role_api_permissions(role_id: int, db: Session = Depends(deps.get_db)):
     return db.query(models.ApiPermission).filter_by(role_id=role_id).all()
 
 
-@app.post("/roles/{role_id}/api-permissions", response_model=schemas.ApiPermission)
+@router.post("/roles/{role_id}/api-permissions", response_model=schemas.ApiPermission)
 def add_role_api_permission(
     role_id: int,
     perm: schemas.ApiPermissionInput,
@@ -384,19 +266,22 @@ def add_role_api_permission(
         .first()
     ):
         raise HTTPException(status_code=400, detail="Permission exists")
-    obj = models.ApiPermission(
-        route=perm.route,
-        method=perm.method,
-        role_id=role_id,
-        description=perm.description,
+    row = writes.insert_row(
+        db,
+        models.ApiPermission,
+        {
+            "route": perm.route,
+            "method": perm.method,
+            "role_id": role_id,
+            "description": perm.description,
+        },
     )
-    db.add(obj)
     db.commit()
-    db.refresh(obj)
-    return obj
+    permissions.invalidate()
+    return row
 
 
-@app.delete("/roles/{role_id}/api-permissions/{perm_id}")
+@router.delete("/roles/{role_id}/api-permissions/{perm_id}")
 def remove_role_api_permission(
     role_id: int, perm_id: int, db: Session = Depends(deps.get_db)
 ):
@@ -405,50 +290,159 @@ def remove_role_api_permission(
         raise HTTPException(status_code=404, detail="Not found")
     db.delete(perm)
     db.commit()
+    permissions.invalidate()
     return {"ok": True}
 
 
-@app.post("/users/{user_id}/role/{role_id}", response_model=schemas.User)
+@router.get("/admin/hashing/stats")
+def hashing_stats(_: models.User = Depends(deps.require_admin)):
+    """Expose queue depth and rejections of the password hashing pool."""
+    return hashing.stats()
+
+
+@router.get("/admin/permissions/stats")
+def permission_index_stats(_: models.User = Depends(deps.require_admin)):
+    """Expose hit/miss and rebuild counters of the permission index."""
+    return permissions.stats()
+
+
+@router.get("/admin/database/pool")
+def database_pool_stats(_: models.User = Depends(deps.require_admin)):
+    """Pool size, checked-out and overflow connections plus timing histograms."""
+    return database.pool_report()
+
+
+@router.get("/admin/sql/stats")
+def sql_route_stats(_: models.User = Depends(deps.require_admin)):
+    """Statements, database time and flagged N+1 requests per route."""
+    return sqlstats.route_stats()
+
+
+@router.get("/admin/profiles")
+def list_request_profiles(_: models.User = Depends(deps.require_admin)):
+    """Profiles recorded with ``X-Profile: 1``, newest first."""
+    return profiling.list_profiles()
+
+
+@router.get("/admin/profiles/continuous", response_class=PlainTextResponse)
+def download_continuous_profile(
+    reset: bool = False, _: models.User = Depends(deps.require_admin)
+):
+    """Folded stacks of the always-on sampler (``PROFILE_CONTINUOUS_HZ``)."""
+    folded = profiling.continuous_profile(reset=reset)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Continuous profiling is off")
+    return PlainTextResponse(folded)
+
+
+@router.get("/admin/profiles/{profile_id}", response_class=PlainTextResponse)
+def download_request_profile(
+    profile_id: str, _: models.User = Depends(deps.require_admin)
+):
+    """Folded stacks, ready for flamegraph.pl, speedscope or inferno."""
+    profile = profiling.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return PlainTextResponse(
+        profile["folded"],
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'},
+    )
+
+
+@router.get("/admin/slow-queries")
+def list_slow_queries(
+    route: Optional[str] = None,
+    limit: int = 50,
+    _: models.User = Depends(deps.require_admin),
+):
+    """Statements slower than ``SLOW_QUERY_MS``, newest first."""
+    return slowqueries.entries(route=route, limit=limit)
+
+
+@router.get("/admin/slow-queries/{entry_id}")
+def read_slow_query(entry_id: int, _: models.User = Depends(deps.require_admin)):
+    entry = slowqueries.get(entry_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return entry
+
+
+@router.delete("/admin/slow-queries")
+def clear_slow_queries(_: models.User = Depends(deps.require_admin)):
+    slowqueries.clear()
+    return {"ok": True}
+
+
+@router.get("/admin/cache/stats")
+def response_cache_stats(_: models.User = Depends(deps.require_admin)):
+    """Expose size, hit ratio and per-route counters of the response cache."""
+    return responsecache.stats()
+
+
+@router.get("/admin/encryption/rotation")
+def encryption_rotation_status(
+    db: Session = Depends(deps.get_db), _: models.User = Depends(deps.require_admin)
+):
+    """Report how far raw data has been re-encrypted with the current key."""
+    return keyrotation.status(db)
+
+
+@router.post("/admin/encryption/rotation", status_code=202)
+def start_encryption_rotation(
+    db: Session = Depends(deps.get_db), _: models.User = Depends(deps.require_admin)
+):
+    """Start (or resume) re-encrypting raw data in the background."""
+    keyrotation.start()
+    return keyrotation.status(db)
+
+
+@router.post("/users/{user_id}/role/{role_id}", response_model=schemas.User)
 def assign_role(
     user_id: int,
     role_id: int,
     db: Session = Depends(deps.get_db),
     _: models.User = Depends(deps.require_admin),
 ):
-    user = db.query(models.User).filter_by(id=user_id).first()
-    role = db.query(models.Role).filter_by(id=role_id).first()
-    if not user or not role:
+    if not db.query(models.Role.id).filter_by(id=role_id).first():
+        raise HTTPException(status_code=404, detail="Not found")
+    row = writes.update_row(db, models.User, user_id, {"role_id": role_id})
+    if row is None:
         raise HTTPException(status_code=404, detail="Not found")
-    user.role_id = role_id
     db.commit()
-    db.refresh(user)
-    return user
+    deps.invalidate_user_principals(db, user_id)
+    return row
 
 
-@app.put("/roles/{role_id}/active", response_model=schemas.Role)
+@router.put("/roles/{role_id}/active", response_model=schemas.Role)
 def update_role_active(
     role_id: int,
     data: dict,
     db: Session = Depends(deps.get_db),
     _: models.User = Depends(deps.require_admin),
 ):
-    role = db.query(models.Role).filter_by(id=role_id).first()
-    if not role:
+    row = writes.update_row(db, models.Role, role_id, {"is_active": bool(data.get("is_active"))})
+    if row is None:
         raise HTTPException(status_code=404, detail="Not found")
-    role.is_active = bool(data.get("is_active"))
     db.commit()
-    db.refresh(role)
-    return role
+    deps.invalidate_role_principals(db, role_id)
+    return row
 
 
 # ---------------- Architect Endpoints -----------------
 
-@app.get("/metrics/dashboard")
-def metrics_dashboard(
-    db: Session = Depends(deps.get_db),
-    _: models.User = Depends(deps.require_architect),
-):
-    """Return key metrics for the automation architect dashboard."""
+def _dashboard_response(db: Session, request: Request):
+    tables = [
+        "projects",
+        "interaction_approval_states",
+        "interaction_approvals",
+        "validation_approvals",
+    ]
+    return responsecache.serve(
+        db, request, tables, lambda _: streaming.dumps(_dashboard_metrics(db))
+    )
+
+
+def _dashboard_metrics(db: Session) -> dict:
     scripts_per_day = (
         db.query(func.coalesce(func.sum(models.Project.scripts_per_day), 0)).scalar()
     )
@@ -481,11 +475,7 @@ def metrics_dashboard(
     }
 
 
-@app.get("/architect/pending/interactions")
-def list_pending_interactions(
-    db: Session = Depends(deps.get_db),
-    _: models.User = Depends(deps.require_architect),
-):
+def _pending_interactions(db: Session) -> list:
     state = db.query(models.InteractionApprovalState).filter_by(name="pendiente").first()
     if not state:
         return []
@@ -501,11 +491,7 @@ def list_pending_interactions(
     return result
 
 
-@app.get("/architect/pending/validations")
-def list_pending_validations(
-    db: Session = Depends(deps.get_db),
-    _: models.User = Depends(deps.require_architect),
-):
+def _pending_validations(db: Session) -> list:
     state = db.query(models.InteractionApprovalState).filter_by(name="pendiente").first()
     if not state:
         return []
@@ -521,51 +507,107 @@ def list_pending_validations(
     return result
 
 
-@app.post("/interactionapprovals/{approval_id}/{action}", response_model=schemas.InteractionApproval)
+if database.AsyncSessionLocal is None:
+
+    @router.get("/metrics/dashboard")
+    def metrics_dashboard(
+        request: Request,
+        db: Session = Depends(deps.get_db),
+        _: models.User = Depends(deps.require_architect),
+    ):
+        """Return key metrics for the automation architect dashboard."""
+        return _dashboard_response(db, request)
+
+    @router.get("/architect/pending/interactions")
+    def list_pending_interactions(
+        db: Session = Depends(deps.get_db),
+        _: models.User = Depends(deps.require_architect),
+    ):
+        return _pending_interactions(db)
+
+    @router.get("/architect/pending/validations")
+    def list_pending_validations(
+        db: Session = Depends(deps.get_db),
+        _: models.User = Depends(deps.require_architect),
+    ):
+        return _pending_validations(db)
+
+else:
+    # Dashboards poll these; on the async stack they do not hold a thread.
+
+    @router.get("/metrics/dashboard")
+    async def metrics_dashboard(
+        request: Request,
+        db: AsyncSession = Depends(deps.get_async_db),
+        _: models.User = Depends(deps.require_architect_async),
+    ):
+        """Return key metrics for the automation architect dashboard."""
+        return await db.run_sync(_dashboard_response, request)
+
+    @router.get("/architect/pending/interactions")
+    async def list_pending_interactions(
+        db: AsyncSession = Depends(deps.get_async_db),
+        _: models.User = Depends(deps.require_architect_async),
+    ):
+        return await db.run_sync(_pending_interactions)
+
+    @router.get("/architect/pending/validations")
+    async def list_pending_validations(
+        db: AsyncSession = Depends(deps.get_async_db),
+        _: models.User = Depends(deps.require_architect_async),
+    ):
+        return await db.run_sync(_pending_validations)
+
+
+@router.post("/interactionapprovals/{approval_id}/{action}", response_model=schemas.InteractionApproval)
 def update_interaction_approval_state(
     approval_id: int,
     action: str,
     db: Session = Depends(deps.get_db),
     _: models.User = Depends(deps.require_architect),
 ):
-    approval = db.query(models.InteractionApproval).filter_by(id=approval_id).first()
-    if not approval:
-        raise HTTPException(status_code=404, detail="Not found")
     if action not in {"approve", "reject"}:
         raise HTTPException(status_code=400, detail="Invalid action")
     state_name = "aprobado" if action == "approve" else "rechazado"
     state = db.query(models.InteractionApprovalState).filter_by(name=state_name).first()
     if not state:
         raise HTTPException(status_code=404, detail="State not found")
-    approval.interactionAprovalStateId = state.id
-    approval.aprovalDate = datetime.utcnow()
+    row = writes.update_row(
+        db,
+        models.InteractionApproval,
+        approval_id,
+        {"interactionAprovalStateId": state.id, "aprovalDate": datetime.utcnow()},
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Not found")
     db.commit()
-    db.refresh(approval)
-    return approval
+    return row
 
 
-@app.post("/validationapprovals/{approval_id}/{action}", response_model=schemas.ValidationApproval)
+@router.post("/validationapprovals/{approval_id}/{action}", response_model=schemas.ValidationApproval)
 def update_validation_approval_state(
     approval_id: int,
     action: str,
     db: Session = Depends(deps.get_db),
     _: models.User = Depends(deps.require_architect),
 ):
-    approval = db.query(models.ValidationApproval).filter_by(id=approval_id).first()
-    if not approval:
-        raise HTTPException(status_code=404, detail="Not found")
     if action not in {"approve", "reject"}:
         raise HTTPException(status_code=400, detail="Invalid action")
     state_name = "aprobado" if action == "approve" else "rechazado"
     state = db.query(models.InteractionApprovalState).filter_by(name=state_name).first()
     if not state:
         raise HTTPException(status_code=404, detail="State not found")
-    approval.interactionAprovalStateId = state.id
-    approval.aprovalDate = datetime.utcnow()
+    row = writes.update_row(
+        db,
+        models.ValidationApproval,
+        approval_id,
+        {"interactionAprovalStateId": state.id, "aprovalDate": datetime.utcnow()},
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Not found")
     db.commit()
-    db.refresh(approval)
-    return approval
-@app.post("/clients/{client_id}/analysts/{user_id}", response_model=schemas.Client)
+    return row
+@router.post("/clients/{client_id}/analysts/{user_id}", response_model=schemas.Client)
 def assign_client_analyst(
     client_id: int,
     user_id: int,
@@ -590,7 +632,7 @@ def assign_client_analyst(
     return _client_with_analysts(client, db)
 
 
-@app.delete("/clients/{client_id}/analysts/{user_id}", response_model=schemas.Client)
+@router.delete("/clients/{client_id}/analysts/{user_id}", response_model=schemas.Client)
 def unassign_client_analyst(
     client_id: int,
     user_id: int,
@@ -610,7 +652,7 @@ def unassign_client_analyst(
     return _client_with_analysts(client, db)
 
 
-@app.post("/projects/{project_id}/analysts/{user_id}", response_model=schemas.Project)
+@router.post("/projects/{project_id}/analysts/{user_id}", response_model=schemas.Project)
 def assign_project_analyst(
     project_id: int,
     user_id: int,
@@ -639,7 +681,7 @@ def assign_project_analyst(
     return _project_with_analysts(project, db)
 
 
-@app.delete("/projects/{project_id}/analysts/{user_id}", response_model=schemas.Project)
+@router.delete("/projects/{project_id}/analysts/{user_id}", response_model=schemas.Project)
 def unassign_project_analyst(
     project_id: int,
     user_id: int,
@@ -658,3 +700,112 @@ def unassign_project_analyst(
         raise HTTPException(status_code=404, detail="Not found")
     return _project_with_analysts(project, db)
 
+
+# CRUD routers for main entities
+CRUD_MAPPINGS = [
+    ("roles", models.Role, schemas.Role),
+    ("users", models.User, schemas.User),
+    ("pagepermissions", models.PagePermission, schemas.PagePermission),
+    ("apipermissions", models.ApiPermission, schemas.ApiPermission),
+    ("businessagreements", models.BusinessAgreement, schemas.BusinessAgreement),
+    ("userinterfaces", models.UserInterface, schemas.UserInterface),
+    ("elementtypes", models.ElementType, schemas.ElementType),
+    ("elements", models.Element, schemas.Element),
+    ("projectemployees", models.ProjectEmployee, schemas.ProjectEmployee),
+    ("actors", models.Actor, schemas.Actor),
+    ("habilities", models.Hability, schemas.Hability),
+    ("interactions", models.Interaction, schemas.Interaction),
+    (
+        "interactionparameters",
+        models.InteractionParameter,
+        schemas.InteractionParameter,
+    ),
+    (
+        "interactionapprovalstates",
+        models.InteractionApprovalState,
+        schemas.InteractionApprovalState,
+    ),
+    (
+        "interactionapprovals",
+        models.InteractionApproval,
+        schemas.InteractionApproval,
+    ),
+    ("validations", models.Validation, schemas.Validation),
+    (
+        "validationparameters",
+        models.ValidationParameter,
+        schemas.ValidationParameter,
+    ),
+    ("validationapprovals", models.ValidationApproval, schemas.ValidationApproval),
+    ("tasks", models.Task, schemas.Task),
+
+    (
+        "taskhaveinteractions",
+        models.TaskHaveInteraction,
+        schemas.TaskHaveInteraction,
+    ),
+    ("fieldtypes", models.FieldType, schemas.FieldType),
+    ("features", models.Feature, schemas.Feature),
+    ("clientanalysts", models.ClientAnalyst, schemas.ClientAnalyst),
+    ("scenariohasfeatures", models.ScenarioHasFeature, schemas.ScenarioHasFeature),
+    ("featuresteps", models.FeatureStep, schemas.FeatureStep),
+    ("scenarioinfo", models.ScenarioInfo, schemas.ScenarioInfo)
+]
+
+
+# Reference lists the frontend fetches on every navigation; served from the
+# in-process response cache.
+CACHED_PREFIXES = {
+    "roles",
+    "elementtypes",
+    "fieldtypes",
+    "habilities",
+    "interactionapprovalstates",
+    "pagepermissions",
+    "apipermissions",
+}
+
+
+async def _hashing_overloaded(request: Request, exc: hashing.HashingOverloaded) -> JSONResponse:
+    return JSONResponse(
+        status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"}
+    )
+
+
+def create_app() -> FastAPI:
+    """Build the API without touching the database.
+
+    Schema creation, seeding and validation run in the lifespan hook, so
+    importing this module or extracting the OpenAPI spec costs no I/O.
+    """
+    application = FastAPI(title="Test Automation API", lifespan=lifespan)
+
+    # Enable CORS for frontend requests
+    application.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[
+            "ETag", "Link", "X-Next-After", "X-Total-Count", "X-Total-Count-Estimated",
+            "Server-Timing", "X-Repeated-Statements", "X-Profile-Id",
+        ],
+    )
+    application.add_middleware(sqlstats.SQLStatsMiddleware)
+    application.add_middleware(metrics.MetricsMiddleware)
+    application.add_middleware(profiling.ProfilingMiddleware)
+    application.add_api_route("/metrics", metrics.metrics_endpoint, include_in_schema=False)
+    application.add_exception_handler(hashing.HashingOverloaded, _hashing_overloaded)
+
+    for prefix, model, schema in CRUD_MAPPINGS:
+        application.include_router(
+            create_crud_router(prefix, model, schema, cache=prefix in CACHED_PREFIXES)
+        )
+    for r in all_routers:
+        application.include_router(r)
+    application.include_router(router)
+    return application
+
+
+app = create_app()
@@ -0,0 +1,243 @@
+import bisect
+import os
+import secrets
+import time
+
+import anyio.to_thread
+from fastapi import HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+from . import crypto, database, deps, hashing, permissions, responsecache
+
+# Request latency bucket bounds in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Scrapes must send ``Authorization: Bearer <token>``; without a token the
+# endpoint is closed unless METRICS_PUBLIC=1 (e.g. behind an internal-only
+# listener or network policy).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "0") == "1"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _RouteSeries:
+    """Counters for one (method, route) pair.
+
+    Only the event loop thread writes them, so no lock is taken.
+    """
+
+    __slots__ = ("statuses", "buckets", "total", "count")
+
+    def __init__(self):
+        self.statuses: dict[str, int] = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, status_code: int, seconds: float) -> None:
+        key = str(status_code)
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+_series: dict[tuple[str, str], _RouteSeries] = {}
+_in_flight: dict[str, int] = {}
+
+
+class MetricsMiddleware:
+    """Record request counts, latency and in-flight requests per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        start = time.perf_counter()
+        status_code = 500
+        _in_flight[method] = _in_flight.get(method, 0) + 1
+
+        async def send_recording(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_recording)
+        finally:
+            _in_flight[method] -= 1
+            # The template, not the raw path, keeps label cardinality bounded.
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            series = _series.get((method, route))
+            if series is None:
+                series = _series[(method, route)] = _RouteSeries()
+            series.observe(status_code, time.perf_counter() - start)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Writer:
+    def __init__(self):
+        self.lines: list[str] = []
+        self._declared: set[str] = set()
+
+    def declare(self, name: str, kind: str, help_text: str) -> None:
+        if name not in self._declared:
+            self._declared.add(name)
+            self.lines.append(f"# HELP {name} {help_text}")
+            self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value, **labels) -> None:
+        text = str(value) if isinstance(value, int) else repr(float(value))
+        self.lines.append(f"{name}{_labels(**labels)} {text}")
+
+    def histogram(self, name: str, bounds, cumulative, total, count, **labels) -> None:
+        for bound, value in zip(list(bounds) + ["+Inf"], cumulative):
+            self.sample(f"{name}_bucket", value, **labels, le=bound)
+        self.sample(f"{name}_sum", total, **labels)
+        self.sample(f"{name}_count", count, **labels)
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _requests(out: _Writer) -> None:
+    out.declare("http_requests_total", "counter", "Requests by method, route and status.")
+    out.declare("http_request_duration_seconds", "histogram", "Request latency by method and route.")
+    for (method, route), series in list(_series.items()):
+        for code, count in list(series.statuses.items()):
+            out.sample("http_requests_total", count, method=method, route=route, status=code)
+    for (method, route), series in list(_series.items()):
+        running, cumulative = 0, []
+        for count in series.buckets:
+            running += count
+            cumulative.append(running)
+        out.histogram(
+            "http_request_duration_seconds", LATENCY_BUCKETS, cumulative,
+            series.total, series.count, method=method, route=route,
+        )
+    out.declare("http_requests_in_flight", "gauge", "Requests being served.")
+    for method, count in list(_in_flight.items()):
+        out.sample("http_requests_in_flight", count, method=method)
+
+
+def _threadpool(out: _Writer) -> None:
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    out.declare("threadpool_threads_total", "gauge", "Worker threads available to sync handlers.")
+    out.sample("threadpool_threads_total", limiter.total_tokens)
+    out.declare("threadpool_threads_busy", "gauge", "Worker threads running sync handlers.")
+    out.sample("threadpool_threads_busy", limiter.borrowed_tokens)
+    out.declare("threadpool_tasks_waiting", "gauge", "Sync calls queued for a worker thread.")
+    out.sample("threadpool_tasks_waiting", limiter.statistics().tasks_waiting)
+
+
+def _pools(out: _Writer) -> None:
+    report = database.pool_report()
+    gauges = {
+        "size": "Configured pool size.",
+        "checkedout": "Connections checked out.",
+        "checkedin": "Idle connections in the pool.",
+        "overflow": "Connections above pool size.",
+    }
+    counters = {
+        "connects": "Connections opened.",
+        "checkouts": "Connection checkouts.",
+        "timeouts": "Checkouts that timed out.",
+        "invalidations": "Connections invalidated.",
+    }
+    histograms = {
+        "checkout_wait_ms": "Time waiting for a connection in milliseconds.",
+        "held_ms": "Time a connection stays checked out in milliseconds.",
+        "lifetime_s": "Connection lifetime in seconds.",
+    }
+    # Samples of one metric must be contiguous, so loop engines innermost.
+    pools = {name: report[name] for name in ("sync", "async") if name in report}
+    for key, help_text in gauges.items():
+        for engine_name, pool in pools.items():
+            if key in pool:
+                out.declare(f"db_pool_{key}", "gauge", help_text)
+                out.sample(f"db_pool_{key}", pool[key], engine=engine_name)
+    for key, help_text in counters.items():
+        out.declare(f"db_pool_{key}_total", "counter", help_text)
+        for engine_name, pool in pools.items():
+            out.sample(f"db_pool_{key}_total", pool[key], engine=engine_name)
+    for key, help_text in histograms.items():
+        out.declare(f"db_pool_{key}", "histogram", help_text)
+        for engine_name, pool in pools.items():
+            data = pool[key]
+            out.histogram(
+                f"db_pool_{key}",
+                [bound for bound, _ in data["buckets"][:-1]],
+                [count for _, count in data["buckets"]],
+                data["sum"], data["count"], engine=engine_name,
+            )
+
+
+def _caches(out: _Writer) -> None:
+    perms = permissions.stats()
+    caches = {
+        "response": responsecache.stats(),
+        "principal": deps.principal_cache.stats(),
+        "decrypt": crypto.stats(),
+        "permission": {
+            "hits": perms["hits"],
+            "misses": perms["misses"],
+            "size": perms["api_entries"] + perms["page_entries"],
+        },
+    }
+    out.declare("cache_hits_total", "counter", "Cache hits.")
+    out.declare("cache_misses_total", "counter", "Cache misses.")
+    out.declare("cache_entries", "gauge", "Entries held by the cache.")
+    out.declare("cache_hit_ratio", "gauge", "Hits over lookups since start.")
+    for name, data in caches.items():
+        lookups = data["hits"] + data["misses"]
+        out.sample("cache_hits_total", data["hits"], cache=name)
+        out.sample("cache_misses_total", data["misses"], cache=name)
+        out.sample("cache_entries", data["size"], cache=name)
+        out.sample("cache_hit_ratio", data["hits"] / lookups if lookups else 0, cache=name)
+
+
+def _hashing(out: _Writer) -> None:
+    data = hashing.stats()
+    out.declare("password_hash_queue_depth", "gauge", "bcrypt jobs waiting or running.")
+    out.sample("password_hash_queue_depth", data["pending"])
+    out.declare("password_hash_queue_limit", "gauge", "bcrypt jobs allowed before 503.")
+    out.sample("password_hash_queue_limit", data["max_pending"])
+    out.declare("password_hash_completed_total", "counter", "bcrypt jobs finished.")
+    out.sample("password_hash_completed_total", data["completed"])
+    out.declare("password_hash_rejected_total", "counter", "bcrypt jobs rejected as overloaded.")
+    out.sample("password_hash_rejected_total", data["rejected"])
+
+
+def render() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    out = _Writer()
+    _requests(out)
+    _threadpool(out)
+    _pools(out)
+    _caches(out)
+    _hashing(out)
+    return out.text()
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    if METRICS_TOKEN:
+        sent = request.headers.get("authorization", "")
+        if not secrets.compare_digest(sent.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    elif not METRICS_PUBLIC:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Set METRICS_TOKEN to enable metrics")
+    return PlainTextResponse(render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,110 @@
+import logging
+import os
+
+from sqlalchemy import func, inspect, select, text
+
+from . import models
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+# Set to 0 to build missing indexes by hand with ``python -m backend.app.migrations``.
+MIGRATE_ON_STARTUP = os.getenv("INDEX_MIGRATION_ON_STARTUP", "1") == "1"
+# PostgreSQL advisory lock held while one process builds indexes.
+LOCK_KEY = 0x67707474  # "gptt"
+
+
+def missing_indexes(bind=engine) -> list:
+    """Indexes declared on the models but absent from the database."""
+    inspector = inspect(bind)
+    tables = set(inspector.get_table_names())
+    missing = []
+    for table in models.Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        missing += [ix for ix in sorted(table.indexes, key=lambda ix: ix.name) if ix.name not in existing]
+    return missing
+
+
+def _invalid_indexes(conn) -> set[str]:
+    """PostgreSQL keeps a failed ``CONCURRENTLY`` build as an invalid index."""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE NOT i.indisvalid"
+        )
+    )
+    return {name for (name,) in rows}
+
+
+def _has_duplicates(conn, index) -> bool:
+    columns = list(index.columns)
+    duplicated = (
+        select(*columns).group_by(*columns).having(func.count() > 1).limit(1)
+    )
+    return conn.execute(duplicated).first() is not None
+
+
+def _create_sql(index, dialect) -> str:
+    quote = dialect.identifier_preparer.quote
+    columns = ", ".join(quote(column.name) for column in index.columns)
+    unique = "UNIQUE " if index.unique else ""
+    # CONCURRENTLY builds without blocking writes to the table.
+    online = "CONCURRENTLY " if dialect.name == "postgresql" else ""
+    return (
+        f"CREATE {unique}INDEX {online}IF NOT EXISTS {quote(index.name)} "
+        f"ON {quote(index.table.name)} ({columns})"
+    )
+
+
+def apply_indexes(bind=engine) -> list[str]:
+    """Build the indexes missing from an existing database.
+
+    Each index is created in its own autocommit statement so one failure
+    does not undo the others. Unique indexes over duplicated values are
+    skipped with a warning until the data is cleaned up. On PostgreSQL only
+    the process holding the advisory lock builds; the others (e.g. the
+    remaining workers starting at the same time) return at once instead of
+    dropping an invalid index that is really a build still in progress.
+    """
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.dialect.name != "postgresql":
+            return _apply(conn)
+        if not conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": LOCK_KEY}).scalar():
+            logger.info("Index migration already running in another process")
+            return []
+        try:
+            return _apply(conn)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY})
+
+
+def _apply(conn) -> list[str]:
+    created = []
+    quote = conn.dialect.identifier_preparer.quote
+    postgres = conn.dialect.name == "postgresql"
+    invalid = _invalid_indexes(conn) if postgres else set()
+    declared = [ix for table in models.Base.metadata.sorted_tables for ix in table.indexes]
+    pending = missing_indexes(conn) + [ix for ix in declared if ix.name in invalid]
+    for index in pending:
+        if index.unique and _has_duplicates(conn, index):
+            logger.warning("Skipping unique index %s: duplicated values", index.name)
+            continue
+        if index.name in invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {quote(index.name)}"))
+        try:
+            conn.execute(text(_create_sql(index, conn.dialect)))
+        except Exception:
+            logger.exception("Could not create index %s", index.name)
+            if postgres:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {quote(index.name)}"))
+            continue
+        logger.info("Created index %s", index.name)
+        created.append(index.name)
+    return created
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    apply_indexes()
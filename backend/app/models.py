@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -79,6 +79,7 @@ class Evidence(Base):
 # 7️⃣ PagePermissions
 class PagePermission(Base):
     __tablename__ = 'page_permissions'
+    __table_args__ = (Index('ix_page_permissions_role_page', 'role_id', 'page'),)
     id = Column(Integer, primary_key=True, index=True)
     page = Column(String(200), nullable=False)
     role_id = Column(Integer, ForeignKey('roles.id'), nullable=False)
@@ -91,6 +92,7 @@ class PagePermission(Base):
 # 8️⃣ ApiPermissions
 class ApiPermission(Base):
     __tablename__ = 'api_permissions'
+    __table_args__ = (Index('ix_api_permissions_route_method', 'route', 'method'),)
     id = Column(Integer, primary_key=True, index=True)
     route = Column(String(200), nullable=False)
     method = Column(String(10), nullable=False)
@@ -112,13 +114,19 @@ class Client(Base):
     paginaInicio = Column(String(200))
     dedication = Column(Integer)
 
+    # Load in bulk with selectinload() when listing clients.
+    analysts = relationship(
+        "User", secondary="client_analysts", viewonly=True, order_by="User.id"
+    )
+
 
 # 🔟 BusinessAgreements
 class ClientAnalyst(Base):
     __tablename__ = 'client_analysts'
+    __table_args__ = (Index('ix_client_analysts_client_user', 'clientId', 'userId'),)
     id = Column(Integer, primary_key=True, index=True)
     clientId = Column(Integer, ForeignKey('clients.id'), nullable=False)
-    userId = Column(Integer, ForeignKey('users.id'), nullable=False)
+    userId = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
     dedication = Column(Integer)
 
 
@@ -178,13 +186,19 @@ class Project(Base):
     is_active = Column(Boolean, default=True)
     scripts_per_day = Column(Integer)
 
+    # Load in bulk with selectinload() when listing projects.
+    analysts = relationship(
+        "User", secondary="project_employees", viewonly=True, order_by="User.id"
+    )
+
 
 # 1️⃣6️⃣ ProjectEmployee
 class ProjectEmployee(Base):
     __tablename__ = 'project_employees'
+    __table_args__ = (Index('ix_project_employees_project_user', 'projectId', 'userId'),)
     id = Column(Integer, primary_key=True, index=True)
     projectId = Column(Integer, ForeignKey('projects.id'), nullable=False)
-    userId = Column(Integer, ForeignKey('users.id'), nullable=False)
+    userId = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
     objective = Column(Text)
     dedicationHours = Column(Integer)
 
@@ -210,7 +224,7 @@ class Interaction(Base):
     __tablename__ = 'interactions'
     id = Column(Integer, primary_key=True, index=True)
     userId = Column(Integer, ForeignKey('users.id'), nullable=False)
-    code = Column(String(100), nullable=False)
+    code = Column(String(100), unique=True, nullable=False, index=True)
     name = Column(String(200), nullable=False)
     requireReview = Column(Boolean, default=False)
     description = Column(Text)
@@ -220,7 +234,7 @@ class Interaction(Base):
 class InteractionParameter(Base):
     __tablename__ = 'interaction_parameters'
     id = Column(Integer, primary_key=True, index=True)
-    interactionId = Column(Integer, ForeignKey('interactions.id'), nullable=False)
+    interactionId = Column(Integer, ForeignKey('interactions.id'), nullable=False, index=True)
     name = Column(String(200), nullable=False)
     description = Column(Text)
     direction = Column(Boolean, default=True)
@@ -238,11 +252,11 @@ class InteractionApprovalState(Base):
 class InteractionApproval(Base):
     __tablename__ = 'interaction_approvals'
     id = Column(Integer, primary_key=True, index=True)
-    interactionId = Column(Integer, ForeignKey('interactions.id'), nullable=False)
+    interactionId = Column(Integer, ForeignKey('interactions.id'), nullable=False, index=True)
     creatorId = Column(Integer, ForeignKey('users.id'), nullable=False)
     aprovalUserId = Column(Integer, ForeignKey('users.id'), nullable=False)
     comment = Column(Text)
-    interactionAprovalStateId = Column(Integer, ForeignKey('interaction_approval_states.id'), nullable=False)
+    interactionAprovalStateId = Column(Integer, ForeignKey('interaction_approval_states.id'), nullable=False, index=True)
     aprovalDate = Column(DateTime)
     creationDate = Column(DateTime)
 
@@ -259,6 +273,7 @@ class Task(Base):
 # 2️⃣4️⃣ TaskHaveInteraction
 class TaskHaveInteraction(Base):
     __tablename__ = 'task_have_interactions'
+    __table_args__ = (Index('ix_task_have_interactions_task_interaction', 'taskId', 'interactionId'),)
     id = Column(Integer, primary_key=True, index=True)
     taskId = Column(Integer, ForeignKey('tasks.id'), nullable=False)
     interactionId = Column(Integer, ForeignKey('interactions.id'), nullable=False)
@@ -270,7 +285,7 @@ class Validation(Base):
     __tablename__ = 'validations'
     id = Column(Integer, primary_key=True, index=True)
     userId = Column(Integer, ForeignKey('users.id'), nullable=False)
-    code = Column(String(100), nullable=False)
+    code = Column(String(100), unique=True, nullable=False, index=True)
     name = Column(String(200), nullable=False)
     requireReview = Column(Boolean, default=False)
     description = Column(Text)
@@ -280,7 +295,7 @@ class Validation(Base):
 class ValidationParameter(Base):
     __tablename__ = 'validation_parameters'
     id = Column(Integer, primary_key=True, index=True)
-    interactionId = Column(Integer, ForeignKey('validations.id'), nullable=False)
+    interactionId = Column(Integer, ForeignKey('validations.id'), nullable=False, index=True)
     name = Column(String(200), nullable=False)
     description = Column(Text)
     direction = Column(Boolean, default=True)
@@ -290,11 +305,11 @@ class ValidationParameter(Base):
 class ValidationApproval(Base):
     __tablename__ = 'validation_approvals'
     id = Column(Integer, primary_key=True, index=True)
-    validationId = Column(Integer, ForeignKey('validations.id'), nullable=False)
+    validationId = Column(Integer, ForeignKey('validations.id'), nullable=False, index=True)
     creatorId = Column(Integer, ForeignKey('users.id'), nullable=False)
     aprovalUserId = Column(Integer, ForeignKey('users.id'), nullable=False)
     comment = Column(Text)
-    interactionAprovalStateId = Column(Integer, ForeignKey('interaction_approval_states.id'), nullable=False)
+    interactionAprovalStateId = Column(Integer, ForeignKey('interaction_approval_states.id'), nullable=False, index=True)
     aprovalDate = Column(DateTime)
     creationDate = Column(DateTime)
 
@@ -311,6 +326,7 @@ class Question(Base):
 # 2️⃣9️⃣ QuestionHasValidation
 class QuestionHasValidation(Base):
     __tablename__ = 'question_has_validations'
+    __table_args__ = (Index('ix_question_has_validations_question_validation', 'questionId', 'validationId'),)
     id = Column(Integer, primary_key=True, index=True)
     validationId = Column(Integer, ForeignKey('validations.id'), nullable=False)
     questionId = Column(Integer, ForeignKey('questions.id'), nullable=False)
@@ -329,7 +345,7 @@ class Scenario(Base):
 class ScenarioData(Base):
     __tablename__ = 'scenario_data'
     id = Column(Integer, primary_key=True, index=True)
-    idScenario = Column(Integer, ForeignKey('scenarios.id'), nullable=False)
+    idScenario = Column(Integer, ForeignKey('scenarios.id'), nullable=False, index=True)
     status = Column(Boolean, default=True)
 
 
@@ -341,7 +357,7 @@ class RawData(Base):
     fieldName = Column(String(200), nullable=False)
     fieldValue = Column(String(500))
     autoGenerated = Column(Boolean, default=False)
-    scenarioDataId = Column(Integer, ForeignKey('scenario_data.id'), nullable=False)
+    scenarioDataId = Column(Integer, ForeignKey('scenario_data.id'), nullable=False, index=True)
     length = Column(String(100))
     status = Column(Boolean, default=True)
 
@@ -368,6 +384,7 @@ class Feature(Base):
 # 3️⃣5️⃣ ScenarioHasFeature
 class ScenarioHasFeature(Base):
     __tablename__ = 'scenario_has_features'
+    __table_args__ = (Index('ix_scenario_has_features_feature_scenario', 'featureId', 'scenarioId'),)
     id = Column(Integer, primary_key=True, index=True)
     featureId = Column(Integer, ForeignKey('features.id'), nullable=False)
     scenarioId = Column(Integer, ForeignKey('scenarios.id'), nullable=False)
@@ -387,6 +404,59 @@ class ScenarioInfo(Base):
     __tablename__ = 'scenario_info'
     id = Column(Integer, primary_key=True, index=True)
     featureStepId = Column(Integer, ForeignKey('feature_steps.id'), nullable=False)
-    scenarioId = Column(Integer, ForeignKey('scenarios.id'), nullable=False)
+    scenarioId = Column(Integer, ForeignKey('scenarios.id'), nullable=False, index=True)
     order = Column(Integer)
     status = Column(Boolean, default=True)
+
+
+# 3️⃣8️⃣ RevokedToken
+class RevokedToken(Base):
+    __tablename__ = 'revoked_tokens'
+    __table_args__ = {'sqlite_autoincrement': True}
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(64), unique=True, nullable=False)
+    expires_at = Column(Integer, nullable=False, index=True)
+
+
+# 3️⃣9️⃣ RefreshToken
+class RefreshToken(Base):
+    __tablename__ = 'refresh_tokens'
+    id = Column(Integer, primary_key=True, index=True)
+    userId = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, nullable=False)
+    expires_at = Column(Integer, nullable=False)
+    revoked = Column(Boolean, default=False)
+    creationDate = Column(DateTime)
+
+
+# 4️⃣0️⃣ SeedState
+class SeedState(Base):
+    __tablename__ = 'seed_state'
+    key = Column(String(50), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    updatedDate = Column(DateTime)
+
+
+# 4️⃣1️⃣ RateLimitState
+class RateLimitState(Base):
+    __tablename__ = 'rate_limits'
+    key = Column(String(200), primary_key=True)
+    tat = Column(Float, nullable=False, index=True)
+
+
+# 4️⃣2️⃣ KeyRotationState
+class KeyRotationState(Base):
+    __tablename__ = 'key_rotation_state'
+    key_id = Column(String(16), primary_key=True)
+    last_id = Column(Integer, default=0, nullable=False)
+    scanned = Column(Integer, default=0, nullable=False)
+    rotated = Column(Integer, default=0, nullable=False)
+    finished = Column(Boolean, default=False, nullable=False)
+    updatedDate = Column(DateTime)
+
+
+# 4️⃣3️⃣ TableGeneration
+class TableGeneration(Base):
+    __tablename__ = 'table_generations'
+    name = Column(String(100), primary_key=True)
+    generation = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,207 @@
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import HTTPException, Query, Request, Response
+from sqlalchemy import Select, and_, or_, select, text
+from sqlalchemy.orm import Query as OrmQuery, Session
+
+DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", "100"))
+MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "1000"))
+# Above this many rows (per pg_class) an unfiltered count=true is estimated.
+APPROX_COUNT_THRESHOLD = int(os.getenv("APPROX_COUNT_THRESHOLD", "100000"))
+
+RESERVED_PARAMS = {"after", "limit", "sort", "count"}
+# Never filterable: secrets and encrypted values.
+HIDDEN_COLUMNS = {"password", "fieldValue", "token_hash"}
+_FILTER_TYPES = (int, str, bool, float)
+
+
+@dataclass
+class PageParams:
+    request: Request
+    after: Optional[int] = None
+    limit: int = DEFAULT_LIMIT
+    sort: Optional[str] = None
+    count: bool = False
+    filters: dict[str, str] = field(default_factory=dict)
+
+
+async def page_params(
+    request: Request,
+    after: Optional[int] = Query(None, ge=0, description="Return rows after this id"),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    sort: Optional[str] = Query(None, description="Indexed field, '-' prefix for descending"),
+    count: bool = Query(False, description="Send X-Total-Count"),
+) -> PageParams:
+    """Dependency collecting paging options; other query params naming a
+    column are filters and the rest are ignored."""
+    filters = {
+        k: v for k, v in request.query_params.items() if k not in RESERVED_PARAMS
+    }
+    return PageParams(request, after, limit, sort, count, filters)
+
+
+def _primary_key(model):
+    return model.__mapper__.primary_key[0]
+
+
+def sortable_columns(model) -> dict:
+    """Non-null indexed columns; these keep keyset ordering cheap and total."""
+    return {
+        c.key: c
+        for c in model.__table__.columns
+        if c.primary_key or ((c.index or c.unique) and not c.nullable)
+    }
+
+
+def filterable_columns(model) -> dict:
+    columns = {}
+    for c in model.__table__.columns:
+        if c.key in HIDDEN_COLUMNS:
+            continue
+        try:
+            python_type = c.type.python_type
+        except NotImplementedError:
+            continue
+        if python_type in _FILTER_TYPES:
+            columns[c.key] = c
+    return columns
+
+
+def _coerce(column, raw: str):
+    python_type = column.type.python_type
+    if python_type is bool:
+        if raw.lower() in ("true", "1"):
+            return True
+        if raw.lower() in ("false", "0"):
+            return False
+        raise ValueError(raw)
+    return python_type(raw)
+
+
+def estimated_rows(db: Session, model) -> Optional[int]:
+    """Row estimate from planner statistics (PostgreSQL only)."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    estimate = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:t)"),
+        {"t": model.__tablename__},
+    ).scalar()
+    return estimate if estimate is not None and estimate >= 0 else None
+
+
+def count_rows(db: Session, query: OrmQuery, model, whole_table: bool) -> tuple[int, bool]:
+    """Return ``(count, estimated)``; large unfiltered tables are estimated."""
+    if whole_table:
+        estimate = estimated_rows(db, model)
+        if estimate is not None and estimate >= APPROX_COUNT_THRESHOLD:
+            return estimate, True
+    return query.order_by(None).count(), False
+
+
+def _criteria(db: Session, model, params: PageParams) -> tuple[list, list, list, object]:
+    """Translate filters, sort and cursor into
+    ``(filters, where, order_by, pk_attr)``; ``where`` starts with ``filters``.
+
+    Parameters that are not columns of ``model`` (such as ``profile``) are
+    skipped. The expressions work for ORM queries and Core ``select()`` alike.
+    """
+    allowed = filterable_columns(model)
+    where = []
+    for name, raw in params.filters.items():
+        if name not in model.__table__.columns:
+            continue
+        column = allowed.get(name)
+        if column is None:
+            raise HTTPException(status_code=400, detail=f"Cannot filter by {name}")
+        try:
+            value = _coerce(column, raw)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid value for {name}")
+        where.append(getattr(model, column.key) == value)
+
+    filters = list(where)
+    pk = _primary_key(model)
+    pk_attr = getattr(model, pk.key)
+    descending = bool(params.sort) and params.sort.startswith("-")
+    sort_name = params.sort.lstrip("-") if params.sort else pk.key
+    column = sortable_columns(model).get(sort_name)
+    if column is None:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by {sort_name}")
+    sort_attr = getattr(model, column.key)
+
+    if params.after is not None:
+        tie = pk_attr < params.after if descending else pk_attr > params.after
+        if column is pk:
+            where.append(tie)
+        else:
+            anchor = db.query(sort_attr).filter(pk_attr == params.after).scalar()
+            if anchor is None:
+                raise HTTPException(status_code=400, detail="Unknown cursor")
+            beyond = sort_attr < anchor if descending else sort_attr > anchor
+            where.append(or_(beyond, and_(sort_attr == anchor, tie)))
+
+    order = [pk_attr.desc() if descending else pk_attr]
+    if column is not pk:
+        order.insert(0, sort_attr.desc() if descending else sort_attr)
+    return filters, where, order, pk_attr
+
+
+def _next_headers(params: PageParams, next_after) -> dict[str, str]:
+    next_url = params.request.url.include_query_params(after=next_after, limit=params.limit)
+    return {"X-Next-After": str(next_after), "Link": f'<{next_url}>; rel="next"'}
+
+
+def _count_headers(db: Session, query: OrmQuery, model, whole_table: bool) -> dict[str, str]:
+    total, estimated = count_rows(db, query, model, whole_table)
+    headers = {"X-Total-Count": str(total)}
+    if estimated:
+        headers["X-Total-Count-Estimated"] = "true"
+    return headers
+
+
+def paginate(
+    db: Session,
+    query: OrmQuery,
+    model,
+    params: PageParams,
+    response: Response,
+    whole_table: bool = True,
+) -> list:
+    """Apply filters, sort and an ``after`` cursor and return one page.
+
+    The id to continue from is sent in ``X-Next-After`` and a ``Link`` header;
+    with ``count=true`` the total goes in ``X-Total-Count``.
+    """
+    filters, where, order, pk_attr = _criteria(db, model, params)
+    if params.count:
+        response.headers.update(
+            _count_headers(db, query.filter(*filters), model, whole_table and not filters)
+        )
+    items = query.filter(*where).order_by(*order).limit(params.limit + 1).all()
+    if len(items) > params.limit:
+        items = items[: params.limit]
+        response.headers.update(_next_headers(params, getattr(items[-1], pk_attr.key)))
+    return items
+
+
+def page_select(db: Session, model, columns: list, params: PageParams) -> tuple[Select, dict[str, str]]:
+    """Core counterpart of :func:`paginate` for streaming responses.
+
+    Headers have to be known before the first row is sent, so the next cursor
+    is found with a probe on the primary key (an index-only lookup) instead of
+    by reading one row too many.
+    """
+    filters, where, order, pk_attr = _criteria(db, model, params)
+    headers = {}
+    if params.count:
+        headers.update(
+            _count_headers(db, db.query(model).filter(*filters), model, not filters)
+        )
+    probe = db.execute(
+        select(pk_attr).where(*where).order_by(*order).offset(params.limit - 1).limit(2)
+    ).scalars().all()
+    if len(probe) == 2:
+        headers.update(_next_headers(params, probe[0]))
+    return select(*columns).where(*where).order_by(*order).limit(params.limit), headers
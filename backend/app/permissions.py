@@ -0,0 +1,81 @@
+import logging
+import threading
+
+from sqlalchemy.orm import Session
+
+from . import generations, models
+
+logger = logging.getLogger(__name__)
+
+# The index is keyed on the generations of these tables, which every worker
+# bumps on commit, so a change made through any worker triggers a rebuild.
+TABLES = (models.ApiPermission.__tablename__, models.PagePermission.__tablename__)
+
+_lock = threading.Lock()
+_api_index: frozenset[tuple[int, str, str]] | None = None
+_page_index: frozenset[tuple[int, str]] | None = None
+_generation: tuple | None = None
+
+_stats = {"hits": 0, "misses": 0, "rebuilds": 0, "invalidations": 0}
+
+
+def _rebuild(db: Session, generation: tuple | None) -> None:
+    global _api_index, _page_index, _generation
+    api_rows = db.query(
+        models.ApiPermission.role_id,
+        models.ApiPermission.route,
+        models.ApiPermission.method,
+    ).all()
+    page_rows = db.query(
+        models.PagePermission.role_id, models.PagePermission.page
+    ).all()
+    _api_index = frozenset((r.role_id, r.route, r.method) for r in api_rows)
+    _page_index = frozenset((r.role_id, r.page) for r in page_rows)
+    _generation = generation
+    _stats["rebuilds"] += 1
+    logger.debug(
+        "Permission index rebuilt: %d api, %d page entries",
+        len(_api_index),
+        len(_page_index),
+    )
+
+
+def _indexes(db: Session) -> tuple[frozenset, frozenset]:
+    # Read before the rows so a concurrent bump forces another rebuild.
+    generation = generations.current(db, TABLES)
+    with _lock:
+        if _api_index is None or generation != _generation:
+            _stats["misses"] += 1
+            _rebuild(db, generation)
+        else:
+            _stats["hits"] += 1
+        return _api_index, _page_index
+
+
+def has_api_permission(db: Session, role_id: int, route: str, method: str) -> bool:
+    """Return whether ``role_id`` may call ``method`` on ``route``."""
+    api, _ = _indexes(db)
+    return (role_id, route, method) in api
+
+
+def has_page_permission(db: Session, role_id: int, page: str) -> bool:
+    """Return whether ``role_id`` may open the frontend ``page``."""
+    _, pages = _indexes(db)
+    return (role_id, page) in pages
+
+
+def invalidate() -> None:
+    """Drop this worker's index so the next check reloads it right away."""
+    global _api_index, _page_index
+    with _lock:
+        _api_index = None
+        _page_index = None
+        _stats["invalidations"] += 1
+
+
+def stats() -> dict:
+    """Return cache counters and the current index size."""
+    data = dict(_stats)
+    data["api_entries"] = len(_api_index) if _api_index is not None else 0
+    data["page_entries"] = len(_page_index) if _page_index is not None else 0
+    return data
@@ -0,0 +1,132 @@
+import bisect
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+# Upper bounds in milliseconds for wait and hold times.
+MS_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# Upper bounds in seconds for connection lifetimes.
+LIFETIME_BUCKETS = (1, 10, 60, 300, 900, 1800, 3600, 7200)
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``buckets`` are inclusive upper bounds."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    def snapshot(self) -> dict:
+        """Cumulative counts per bound (the last one is ``+Inf``)."""
+        with self._lock:
+            counts, total, largest = list(self._counts), self._sum, self._max
+        cumulative, running = [], 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], counts):
+            running += count
+            cumulative.append((bound, running))
+        return {"count": running, "sum": total, "max": largest, "buckets": cumulative}
+
+
+class PoolStats:
+    """Counters and timings for one engine's connection pool."""
+
+    def __init__(self):
+        self.checkout_wait_ms = Histogram(MS_BUCKETS)
+        self.held_ms = Histogram(MS_BUCKETS)
+        self.lifetime_s = Histogram(LIFETIME_BUCKETS)
+        self.connects = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self, pool) -> dict:
+        data = {
+            "pool": getattr(pool, "base_name", type(pool).__name__),
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "invalidations": self.invalidations,
+            "checkout_wait_ms": self.checkout_wait_ms.snapshot(),
+            "held_ms": self.held_ms.snapshot(),
+            "lifetime_s": self.lifetime_s.snapshot(),
+        }
+        # Only queue pools have a fixed size and overflow.
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            if hasattr(pool, name):
+                data[name] = getattr(pool, name)()
+        if hasattr(pool, "_timeout"):
+            data["timeout"] = pool._timeout
+        return data
+
+
+class _TimedPool:
+    """Mixin timing how long callers wait for a connection."""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeout:
+            self.stats.count("timeouts")
+            raise
+        finally:
+            self.stats.checkout_wait_ms.observe((time.perf_counter() - start) * 1000)
+
+
+def timed_pool(pool_class, stats: PoolStats):
+    """Subclass of ``pool_class`` reporting to ``stats``.
+
+    The stats live on the class so they survive ``engine.dispose()``, which
+    recreates the pool from ``type(pool)``.
+    """
+    attrs = {"stats": stats, "base_name": pool_class.__name__}
+    return type(f"Timed{pool_class.__name__}", (_TimedPool, pool_class), attrs)
+
+
+def instrument(engine, stats: PoolStats) -> None:
+    """Record connects, checkouts, hold times and lifetimes of ``engine``."""
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, record):
+        record.info["connected_at"] = time.monotonic()
+        stats.count("connects")
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, record, proxy):
+        record.info["checked_out_at"] = time.perf_counter()
+        stats.count("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, record):
+        started = record.info.pop("checked_out_at", None)
+        if started is not None:
+            stats.held_ms.observe((time.perf_counter() - started) * 1000)
+
+    @event.listens_for(engine, "close")
+    def _close(dbapi_connection, record):
+        connected = record.info.pop("connected_at", None)
+        if connected is not None:
+            stats.lifetime_s.observe(time.monotonic() - connected)
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_connection, record, exception):
+        stats.count("invalidations")
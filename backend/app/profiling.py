@@ -0,0 +1,232 @@
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from . import deps
+from .cache import LRUCache
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Seconds between samples of a profiled request.
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+# Finished request profiles kept for download.
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "50"))
+# Samples per second of the always-on profiler; 0 disables it.
+PROFILE_CONTINUOUS_HZ = float(os.getenv("PROFILE_CONTINUOUS_HZ", "0"))
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY = "profile"
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_ROOT = os.path.dirname(os.path.dirname(APP_DIR))
+
+
+def _label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_ROOT):
+        filename = os.path.relpath(filename, _ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def folded_stack(frame, app_only: bool) -> Optional[str]:
+    """``root;...;leaf`` for ``frame``; ``None`` if no application code runs."""
+    labels, in_app = [], False
+    while frame is not None:
+        code = frame.f_code
+        in_app = in_app or code.co_filename.startswith(APP_DIR)
+        labels.append(_label(code))
+        frame = frame.f_back
+    if app_only and not in_app:
+        return None
+    return ";".join(reversed(labels))
+
+
+class Sampler(threading.Thread):
+    """Sample the stacks of threads at a fixed interval.
+
+    ``app_only`` keeps only stacks that pass through this package, which
+    drops idle workers and the event loop waiting on its selector. With
+    ``threads`` only those thread ids are sampled; :meth:`add_thread` and
+    :meth:`remove_thread` change the set while sampling.
+    """
+
+    def __init__(self, interval: float, app_only: bool = True, threads: Optional[set] = None):
+        super().__init__(name="profiler", daemon=True)
+        self.interval = interval
+        self.app_only = app_only
+        self.threads = None if threads is None else set(threads)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def add_thread(self, ident: int) -> None:
+        with self._lock:
+            if self.threads is not None:
+                self.threads.add(ident)
+
+    def remove_thread(self, ident: int) -> None:
+        with self._lock:
+            if self.threads is not None:
+                self.threads.discard(ident)
+
+    def run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                wanted = None if self.threads is None else set(self.threads)
+            stacks = [
+                folded_stack(frame, self.app_only)
+                for ident, frame in frames.items()
+                if ident != me and (wanted is None or ident in wanted)
+            ]
+            with self._lock:
+                self.samples += 1
+                self.stacks.update(s for s in stacks if s)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def folded(self, reset: bool = False) -> str:
+        """Collapsed stacks, one ``stack count`` line each (flamegraph.pl,
+        speedscope and inferno read this format)."""
+        with self._lock:
+            stacks = self.stacks
+            if reset:
+                self.stacks, self.samples = Counter(), 0
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+_profiles = LRUCache(PROFILE_STORE_SIZE)
+_continuous: Optional[Sampler] = None
+
+
+def _requested(scope) -> bool:
+    headers = dict(scope.get("headers") or [])
+    if headers.get(PROFILE_HEADER.encode(), b"").lower() in (b"1", b"true"):
+        return True
+    query = parse_qs(scope.get("query_string", b"").decode())
+    return query.get(PROFILE_QUERY, [""])[-1].lower() in ("1", "true")
+
+
+def _is_admin(token: str) -> bool:
+    db = SessionLocal()
+    try:
+        user = deps.get_current_user(db, token)
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+    return user.role.name == "Administrador"
+
+
+def _bearer(scope) -> Optional[str]:
+    value = dict(scope.get("headers") or []).get(b"authorization", b"").decode()
+    scheme, _, token = value.partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+
+class ProfilingMiddleware:
+    """Profile requests sent by administrators with ``X-Profile: 1`` or
+    ``?profile=1``; the id of the stored profile comes back in
+    ``X-Profile-Id``. Anyone else gets the request served unprofiled.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+        token = _bearer(scope)
+        if token is None or not await run_in_threadpool(_is_admin, token):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        # The event loop thread runs the request's async code (shared with
+        # other requests); sync endpoints add their threadpool thread.
+        sampler = Sampler(PROFILE_INTERVAL, threads={threading.get_ident()})
+        profiler_token = deps.request_profiler.set(sampler)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            deps.request_profiler.reset(profiler_token)
+            sampler.stop()
+            _profiles.set(
+                profile_id,
+                {
+                    "id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(scope.get("route"), "path", None),
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+                    "samples": sampler.samples,
+                    "interval_ms": PROFILE_INTERVAL * 1000,
+                    "created": datetime.now(timezone.utc).isoformat(),
+                    "folded": sampler.folded(),
+                },
+            )
+
+
+def list_profiles() -> list[dict]:
+    """Stored profiles, newest first, without their stacks."""
+    return [
+        {k: v for k, v in p.items() if k != "folded"}
+        for p in reversed(_profiles.values())
+    ]
+
+
+def get_profile(profile_id: str) -> Optional[dict]:
+    return _profiles.get(profile_id)
+
+
+def start_continuous(hz: float = PROFILE_CONTINUOUS_HZ) -> bool:
+    """Start the always-on sampler at ``hz`` samples per second."""
+    global _continuous
+    if hz <= 0 or _continuous is not None:
+        return False
+    _continuous = Sampler(1 / hz)
+    _continuous.start()
+    logger.info("Continuous profiling at %.1f Hz", hz)
+    return True
+
+
+def stop_continuous() -> None:
+    global _continuous
+    sampler, _continuous = _continuous, None
+    if sampler is not None:
+        sampler.stop()
+
+
+def continuous_profile(reset: bool = False) -> Optional[str]:
+    """Folded stacks gathered since start (or the last reset)."""
+    if _continuous is None:
+        return None
+    return _continuous.folded(reset=reset)
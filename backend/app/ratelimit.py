@@ -0,0 +1,184 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy.exc import IntegrityError
+
+from . import models
+from .cache import LRUCache
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Keys kept by the in-memory backend; idle keys expire on their own.
+MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+# How often the database backend deletes idle keys.
+PURGE_INTERVAL_SECONDS = 300
+
+# update(key, fn): fn receives the stored TAT (or None) and returns
+# (new_tat or None to leave it unchanged, result). Must be atomic per key.
+Updater = Callable[[Optional[float]], tuple[Optional[float], float]]
+
+
+class MemoryBackend:
+    """Per-process TAT store with LRU eviction and expiry of idle keys."""
+
+    def __init__(self, max_keys: int = MAX_KEYS):
+        self._tats = LRUCache(max_keys)
+        self._lock = threading.Lock()
+
+    def update(self, key: str, fn: Updater) -> float:
+        with self._lock:
+            new_tat, result = fn(self._tats.get(key))
+            if new_tat is not None:
+                self._tats.set(key, new_tat, ttl=max(new_tat - time.time(), 0.001))
+        return result
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+class DatabaseBackend:
+    """TAT store in the rate_limits table, shared by every worker."""
+
+    def __init__(self):
+        self._last_purge = time.monotonic()
+
+    def update(self, key: str, fn: Updater) -> float:
+        db = SessionLocal()
+        try:
+            row = (
+                db.query(models.RateLimitState)
+                .filter_by(key=key)
+                .with_for_update()
+                .first()
+            )
+            new_tat, result = fn(row.tat if row else None)
+            if new_tat is not None:
+                if row is None:
+                    db.add(models.RateLimitState(key=key, tat=new_tat))
+                else:
+                    row.tat = new_tat
+                db.commit()
+            self._purge(db)
+            return result
+        except IntegrityError:
+            # Another worker inserted the key first; let this request through.
+            db.rollback()
+            return 0.0
+        finally:
+            db.close()
+
+    def _purge(self, db) -> None:
+        if time.monotonic() - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.monotonic()
+        db.query(models.RateLimitState).filter(
+            models.RateLimitState.tat < time.time()
+        ).delete(synchronize_session=False)
+        db.commit()
+
+
+def _default_backend():
+    if os.getenv("RATE_LIMIT_BACKEND", "memory") == "database":
+        return DatabaseBackend()
+    return MemoryBackend()
+
+
+backend = _default_backend()
+
+
+def configure(new_backend) -> None:
+    """Plug a different shared store (any object with ``update``)."""
+    global backend
+    backend = new_backend
+
+
+class RateLimiter:
+    """Generic cell rate algorithm: ``limit`` requests per ``period`` seconds.
+
+    Each key stores a single float, its theoretical arrival time (TAT), so
+    memory per key is constant no matter how many requests it sends.
+    """
+
+    def __init__(self, name: str, limit: int, period: float):
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    def _evaluate(self, tat: Optional[float], consume: bool):
+        now = time.time()
+        emission = self.period / self.limit
+        new_tat = max(tat or now, now) + emission
+        allow_at = new_tat - self.period
+        if now < allow_at:
+            return None, allow_at - now
+        return (new_tat if consume else None), 0.0
+
+    def hit(self, key: str) -> float:
+        """Consume one request; return seconds to wait (0 when allowed)."""
+        if not self.enabled:
+            return 0.0
+        return backend.update(
+            f"{self.name}:{key}", lambda tat: self._evaluate(tat, True)
+        )
+
+    def peek(self, key: str) -> float:
+        """Return seconds until the next request would be allowed."""
+        if not self.enabled:
+            return 0.0
+        return backend.update(
+            f"{self.name}:{key}", lambda tat: self._evaluate(tat, False)
+        )
+
+    def _reject(self, retry_after: float, detail: str) -> None:
+        self.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+        )
+
+    def check(self, key: str, detail: str = "Too many requests") -> None:
+        """Consume one request or raise 429."""
+        retry_after = self.hit(key)
+        if retry_after > 0:
+            self._reject(retry_after, detail)
+
+    def ensure_available(self, key: str, detail: str = "Too many requests") -> None:
+        """Raise 429 while ``key`` is blocked, without consuming a request."""
+        retry_after = self.peek(key)
+        if retry_after > 0:
+            self._reject(retry_after, detail)
+
+
+def from_env(setting: str, default: str, name: Optional[str] = None) -> RateLimiter:
+    """Build a limiter from ``RATE_LIMIT_<SETTING>`` given as ``limit/seconds``.
+
+    ``name`` namespaces the keys and defaults to ``setting``. A limit of ``0``
+    disables the limiter.
+    """
+    spec = os.getenv(f"RATE_LIMIT_{setting.upper()}", default)
+    limit, _, period = spec.partition("/")
+    return RateLimiter(name or setting, int(limit), float(period or 60))
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def limit_requests(limiter: RateLimiter):
+    """Dependency that charges one request per client IP to ``limiter``."""
+
+    def _check(request: Request) -> None:
+        limiter.check(client_ip(request))
+
+    return _check
@@ -0,0 +1,97 @@
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from . import generations
+from .cache import LRUCache
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+# Bodies larger than this are served but not kept.
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(1024 * 1024)))
+
+_SKIPPED_HEADERS = {"content-length", "content-type"}
+
+
+@dataclass(frozen=True)
+class _Entry:
+    body: bytes
+    headers: dict
+    tables: frozenset
+
+
+_cache = LRUCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+_lock = threading.Lock()
+_routes: dict[str, dict[str, int]] = {}
+_evictions = 0
+
+
+def _count(route: str, outcome: str) -> None:
+    with _lock:
+        counters = _routes.setdefault(route, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+
+def _respond(body: bytes, headers: dict) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def serve(
+    db: Session,
+    request: Request,
+    tables: Iterable[str],
+    produce: Callable[[Response], bytes],
+    scope: str = "",
+    headers: Optional[dict] = None,
+) -> Response:
+    """Return the stored body for this request, or build and store it.
+
+    ``produce(response)`` returns the encoded JSON body and may set headers
+    on ``response`` (e.g. pagination cursors). Entries are keyed by path,
+    query, ``scope`` and the generations of ``tables``, so a write in any
+    worker makes them unreachable; writes in this worker also evict them.
+    """
+    tables = frozenset(tables)
+    route = request.scope["route"].path
+    generation = generations.current(db, tables) if RESPONSE_CACHE_SIZE > 0 else None
+    key = None
+    if generation is not None:
+        key = (request.url.path, request.url.query, scope, generation)
+        entry = _cache.get(key)
+        if entry is not None:
+            _count(route, "hits")
+            return _respond(entry.body, {**entry.headers, **(headers or {})})
+    _count(route, "misses")
+    holder = Response()
+    body = produce(holder)
+    stored = {k: v for k, v in holder.headers.items() if k not in _SKIPPED_HEADERS}
+    if key is not None and len(body) <= RESPONSE_CACHE_MAX_BYTES:
+        _cache.set(key, _Entry(body, stored, tables))
+    return _respond(body, {**stored, **(headers or {})})
+
+
+def _evict(names: set) -> None:
+    global _evictions
+    removed = _cache.evict_where(lambda _, entry: not entry.tables.isdisjoint(names))
+    if removed:
+        with _lock:
+            _evictions += removed
+
+
+generations.subscribe(_evict)
+
+
+def clear() -> None:
+    _cache.clear()
+
+
+def stats() -> dict:
+    data = _cache.stats()
+    with _lock:
+        data["evictions"] = _evictions
+        data["routes"] = {route: dict(c) for route, c in _routes.items()}
+    return data
@@ -0,0 +1,156 @@
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# How often a worker pulls revocations written by other workers.
+SYNC_INTERVAL_SECONDS = float(os.getenv("REVOCATION_SYNC_INTERVAL", "5"))
+# How often expired rows are deleted from the shared table.
+PURGE_INTERVAL_SECONDS = float(os.getenv("REVOCATION_PURGE_INTERVAL", "300"))
+# How long an id skipped by a sync is re-checked. On PostgreSQL ids are
+# taken at insert time, so a slow transaction can commit a lower id after
+# a higher one was already loaded.
+GAP_SECONDS = float(os.getenv("REVOCATION_GAP_SECONDS", "60"))
+# Upper bound on tracked gaps (sequence jumps can skip many ids at once).
+MAX_GAPS = 1000
+BUCKET_SECONDS = 60
+
+
+class RevocationStore:
+    """Set of revoked token ids that forgets entries once they expire.
+
+    Entries are grouped in buckets by expiry minute (a hash wheel) so purging
+    drops whole buckets instead of scanning every entry. Memory is bounded by
+    the number of revoked tokens that are still within their lifetime.
+    """
+
+    def __init__(self, bucket_seconds: int = BUCKET_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self._expiry: dict[str, float] = {}
+        self._buckets: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, ts: float) -> int:
+        return int(ts // self.bucket_seconds)
+
+    def add(self, jti: str, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+        bucket = self._bucket(expires_at)
+        with self._lock:
+            if jti in self._expiry:
+                return
+            self._expiry[jti] = expires_at
+            self._buckets.setdefault(bucket, set()).add(jti)
+
+    def contains(self, jti: str) -> bool:
+        expires_at = self._expiry.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def purge(self, now: float | None = None) -> int:
+        """Drop every bucket whose tokens have all expired."""
+        current = self._bucket(time.time() if now is None else now)
+        removed = 0
+        with self._lock:
+            for bucket in [b for b in self._buckets if b < current]:
+                for jti in self._buckets.pop(bucket):
+                    self._expiry.pop(jti, None)
+                    removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+
+_store = RevocationStore()
+_sync_lock = threading.Lock()
+_last_id = 0
+_gaps: dict[int, float] = {}
+_last_sync = 0.0
+_last_purge = time.monotonic()
+
+
+def _purge_expired(now: float) -> None:
+    # Own session: the caller's belongs to a request that may not expect a commit.
+    db = SessionLocal()
+    try:
+        deleted = (
+            db.query(models.RevokedToken)
+            .filter(models.RevokedToken.expires_at < int(now))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+    finally:
+        db.close()
+    logger.debug("Purged %d expired revocations", deleted)
+
+
+def sync(db: Session) -> None:
+    """Load revocations recorded by any worker since the last sync.
+
+    Ids skipped between two loaded rows are re-checked for ``GAP_SECONDS``
+    in case their transaction commits late.
+    """
+    global _last_id, _last_sync, _last_purge
+    with _sync_lock:
+        now = time.time()
+        pending = models.RevokedToken.id > _last_id
+        if _gaps:
+            pending = or_(pending, models.RevokedToken.id.in_(list(_gaps)))
+        rows = (
+            db.query(
+                models.RevokedToken.id,
+                models.RevokedToken.jti,
+                models.RevokedToken.expires_at,
+            )
+            .filter(pending)
+            .order_by(models.RevokedToken.id)
+            .all()
+        )
+        seen = set()
+        for row in rows:
+            _store.add(row.jti, row.expires_at)
+            _gaps.pop(row.id, None)
+            seen.add(row.id)
+        newest = max(seen, default=_last_id)
+        if newest > _last_id:
+            for gap in range(max(_last_id + 1, newest - MAX_GAPS), newest):
+                if gap not in seen:
+                    _gaps[gap] = now
+            _last_id = newest
+        for gap in [g for g, found in _gaps.items() if now - found > GAP_SECONDS]:
+            del _gaps[gap]
+        _store.purge(now)
+        _last_sync = time.monotonic()
+        if _last_sync - _last_purge > PURGE_INTERVAL_SECONDS:
+            _last_purge = _last_sync
+            _purge_expired(now)
+
+
+def revoke(db: Session, jti: str, expires_at: float) -> None:
+    """Record ``jti`` as revoked until ``expires_at`` (epoch seconds)."""
+    _store.add(jti, expires_at)
+    db.add(models.RevokedToken(jti=jti, expires_at=int(expires_at)))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+
+
+def is_revoked(db: Session, jti: str) -> bool:
+    if time.monotonic() - _last_sync > SYNC_INTERVAL_SECONDS:
+        sync(db)
+    return _store.contains(jti)
+
+
+def stats() -> dict:
+    return {"revoked": len(_store), "last_id": _last_id, "gaps": len(_gaps)}
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, selectinload
 
-from .. import models, schemas, deps
+from .. import models, schemas, deps, generations, responsecache
+from ..pagination import PageParams, page_params, paginate
 
-router = APIRouter(prefix="/clients", tags=["clients"])
+router = APIRouter(prefix="/clients", tags=["clients"], route_class=deps.SessionRoute)
 
 
 # Dependency to require Service Manager role
@@ -31,24 +33,56 @@ def create_client(
     return db_obj
 
 
+_client_list = TypeAdapter(list[schemas.Client])
+ANALYST_ROLES = ["Analista de Pruebas con skill de automatización", "Automatizador de Pruebas"]
+
+
 @router.get("/", response_model=list[schemas.Client])
 def list_clients(
+    response: Response,
+    page: PageParams = Depends(page_params),
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_user),
 ):
-    if current_user.role.name in ["Analista de Pruebas con skill de automatización", "Automatizador de Pruebas"]:
+    # Analysts only see their own clients, so the tag is scoped to the user.
+    tables = [
+        "clients", "client_analysts", "users", "projects", "project_employees", "digital_assets",
+    ]
+    etag = generations.check(db, page.request, response, tables, scope=str(current_user.id))
+    analyst = current_user.role.name in ANALYST_ROLES
+
+    def produce(holder: Response) -> bytes:
+        clients = _visible_clients(db, page, holder, current_user if analyst else None)
+        return _client_list.dump_json(
+            _client_list.validate_python(clients, from_attributes=True)
+        )
+
+    return responsecache.serve(
+        db,
+        page.request,
+        tables,
+        produce,
+        scope=str(current_user.id) if analyst else "all",
+        headers={"ETag": etag} if etag else None,
+    )
+
+
+def _visible_clients(db: Session, page: PageParams, response: Response, analyst=None):
+    query = db.query(models.Client).options(selectinload(models.Client.analysts))
+    if analyst is not None:
         projects = (
             db.query(models.Project)
             .join(models.ProjectEmployee, models.Project.id == models.ProjectEmployee.projectId)
-            .filter(models.ProjectEmployee.userId == current_user.id)
+            .filter(models.ProjectEmployee.userId == analyst.id)
             .all()
         )
         client_ids = {p.digitalAssetsId for p in projects}
         # map digital asset -> client
         assets = db.query(models.DigitalAsset).filter(models.DigitalAsset.id.in_(client_ids)).all()
         allowed_clients = {a.clientId for a in assets}
-        return db.query(models.Client).filter(models.Client.id.in_(allowed_clients)).all()
-    return db.query(models.Client).all()
+        query = query.filter(models.Client.id.in_(allowed_clients))
+        return paginate(db, query, models.Client, page, response, whole_table=False)
+    return paginate(db, query, models.Client, page, response)
 
 
 @router.get("/{client_id}", response_model=schemas.Client)
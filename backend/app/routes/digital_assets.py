@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
 
-from .. import models, schemas, deps
+from .. import models, schemas, deps, generations, writes
+from ..pagination import PageParams, page_params, paginate
 from .clients import require_service_manager
 
-router = APIRouter(prefix="/digitalassets", tags=["digitalassets"])
+router = APIRouter(prefix="/digitalassets", tags=["digitalassets"], route_class=deps.SessionRoute)
 
 
 @router.post("/", response_model=schemas.DigitalAsset)
@@ -16,16 +17,19 @@ def create_digital_asset(
     client = db.query(models.Client).filter_by(id=asset.clientId, is_active=True).first()
     if not client:
         raise HTTPException(status_code=400, detail="Client not found or inactive")
-    db_obj = models.DigitalAsset(**asset.dict())
-    db.add(db_obj)
+    row = writes.insert_row(db, models.DigitalAsset, asset.model_dump())
     db.commit()
-    db.refresh(db_obj)
-    return db_obj
+    return row
 
 
 @router.get("/", response_model=list[schemas.DigitalAsset])
-def list_digital_assets(db: Session = Depends(deps.get_db)):
-    return db.query(models.DigitalAsset).all()
+def list_digital_assets(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(deps.get_db),
+):
+    generations.check(db, page.request, response, ["digital_assets"])
+    return paginate(db, db.query(models.DigitalAsset), models.DigitalAsset, page, response)
 
 
 @router.get("/{asset_id}", response_model=schemas.DigitalAsset)
@@ -43,18 +47,16 @@ def update_digital_asset(
     db: Session = Depends(deps.get_db),
     _: models.User = Depends(require_service_manager),
 ):
-    db_obj = db.query(models.DigitalAsset).filter_by(id=asset_id).first()
-    if not db_obj:
-        raise HTTPException(status_code=404, detail="Not found")
     client = db.query(models.Client).filter_by(id=asset.clientId, is_active=True).first()
     if not client:
         raise HTTPException(status_code=400, detail="Client not found or inactive")
-    data = asset.dict()
-    for k, v in data.items():
-        setattr(db_obj, k, v)
+    data = asset.model_dump()
+    data.pop("id", None)
+    row = writes.update_row(db, models.DigitalAsset, asset_id, data)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Not found")
     db.commit()
-    db.refresh(db_obj)
-    return db_obj
+    return row
 
 
 @router.delete("/{asset_id}")
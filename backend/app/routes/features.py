@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from .. import models, schemas, deps, crypto
+from .. import models, schemas, deps, crypto, writes
+from ..pagination import PageParams, page_params, paginate
 from ..crud import create_crud_router
 
 router = create_crud_router("features", models.Feature, schemas.Feature)
@@ -38,11 +39,11 @@ def add_feature_scenario(
     )
     if existing:
         raise HTTPException(status_code=409, detail="Relation already exists")
-    obj = models.ScenarioHasFeature(featureId=feature_id, scenarioId=scenario_id)
-    db.add(obj)
+    row = writes.insert_row(
+        db, models.ScenarioHasFeature, {"featureId": feature_id, "scenarioId": scenario_id}
+    )
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 @router.delete(
@@ -70,7 +71,7 @@ step_router = create_crud_router(
 router.include_router(step_router)
 
 # CRUD for ScenarioInfo with validation
-info_router = APIRouter(prefix="/scenarioinfo", tags=["scenarioinfo"])
+info_router = APIRouter(prefix="/scenarioinfo", tags=["scenarioinfo"], route_class=deps.SessionRoute)
 
 
 @info_router.post(
@@ -81,18 +82,20 @@ def create_info(info: schemas.ScenarioInfo, db: Session = Depends(deps.get_db)):
     scenario = db.query(models.Scenario).filter_by(id=info.scenarioId).first()
     if not step or not scenario:
         raise HTTPException(status_code=404, detail="Step or scenario not found")
-    obj = models.ScenarioInfo(**info.dict())
-    db.add(obj)
+    row = writes.insert_row(db, models.ScenarioInfo, info.dict())
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 @info_router.get(
     "/", response_model=list[schemas.ScenarioInfo], dependencies=[perm_si("GET")]
 )
-def list_info(db: Session = Depends(deps.get_db)):
-    return db.query(models.ScenarioInfo).all()
+def list_info(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(deps.get_db),
+):
+    return paginate(db, db.query(models.ScenarioInfo), models.ScenarioInfo, page, response)
 
 
 router.include_router(info_router)
@@ -1,10 +1,12 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from .. import models, schemas, deps
+from .. import models, schemas, deps, generations, writes
+from ..pagination import PageParams, page_params, paginate
 
-router = APIRouter(prefix="/interactions", tags=["interactions"])
+router = APIRouter(prefix="/interactions", tags=["interactions"], route_class=deps.SessionRoute)
 
 perm = lambda method: Depends(deps.require_api_permission("/interactions", method))
 
@@ -12,15 +14,23 @@ perm = lambda method: Depends(deps.require_api_permission("/interactions", metho
 def create_interaction(data: schemas.InteractionCreate, db: Session = Depends(deps.get_db)):
     if db.query(models.Interaction).filter_by(code=data.code).first():
         raise HTTPException(status_code=400, detail="Code exists")
-    obj = models.Interaction(**data.dict())
-    db.add(obj)
+    try:
+        row = writes.insert_row(db, models.Interaction, data.dict())
+    except IntegrityError:
+        # Unique index on code: another request took it after the check.
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Code exists")
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 @router.get("/", response_model=list[schemas.Interaction], dependencies=[perm("GET")])
-def list_interactions(db: Session = Depends(deps.get_db)):
-    return db.query(models.Interaction).all()
+def list_interactions(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(deps.get_db),
+):
+    generations.check(db, page.request, response, ["interactions"])
+    return paginate(db, db.query(models.Interaction), models.Interaction, page, response)
 
 @router.get("/{interaction_id}", response_model=schemas.Interaction, dependencies=[perm("GET")])
 def get_interaction(interaction_id: int, db: Session = Depends(deps.get_db)):
@@ -31,14 +41,15 @@ def get_interaction(interaction_id: int, db: Session = Depends(deps.get_db)):
 
 @router.put("/{interaction_id}", response_model=schemas.Interaction, dependencies=[perm("PUT")])
 def update_interaction(interaction_id: int, data: schemas.InteractionUpdate, db: Session = Depends(deps.get_db)):
-    obj = db.query(models.Interaction).filter_by(id=interaction_id).first()
-    if not obj:
+    try:
+        row = writes.update_row(db, models.Interaction, interaction_id, data.dict(exclude_unset=True))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Code exists")
+    if row is None:
         raise HTTPException(status_code=404, detail="Not found")
-    for field, value in data.dict(exclude_unset=True).items():
-        setattr(obj, field, value)
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 @router.delete("/{interaction_id}", dependencies=[perm("DELETE")])
 def delete_interaction(interaction_id: int, db: Session = Depends(deps.get_db)):
@@ -50,22 +61,25 @@ def delete_interaction(interaction_id: int, db: Session = Depends(deps.get_db)):
     return {"ok": True}
 
 # ------------------ Parameters ------------------
-param_router = APIRouter(prefix="/interactionparameters", tags=["interactionparameters"])
+param_router = APIRouter(prefix="/interactionparameters", tags=["interactionparameters"], route_class=deps.SessionRoute)
 param_perm = lambda method: Depends(deps.require_api_permission("/interactionparameters", method))
 
 @param_router.post("/", response_model=schemas.InteractionParameter, status_code=status.HTTP_201_CREATED, dependencies=[param_perm("POST")])
 def create_parameter(data: schemas.InteractionParameterCreate, db: Session = Depends(deps.get_db)):
     if not db.query(models.Interaction).filter_by(id=data.interactionId).first():
         raise HTTPException(status_code=404, detail="Interaction not found")
-    obj = models.InteractionParameter(**data.dict())
-    db.add(obj)
+    row = writes.insert_row(db, models.InteractionParameter, data.dict())
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 @param_router.get("/", response_model=list[schemas.InteractionParameter], dependencies=[param_perm("GET")])
-def list_parameters(db: Session = Depends(deps.get_db)):
-    return db.query(models.InteractionParameter).all()
+def list_parameters(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(deps.get_db),
+):
+    generations.check(db, page.request, response, ["interaction_parameters"])
+    return paginate(db, db.query(models.InteractionParameter), models.InteractionParameter, page, response)
 
 @param_router.get("/{parameter_id}", response_model=schemas.InteractionParameter, dependencies=[param_perm("GET")])
 def get_parameter(parameter_id: int, db: Session = Depends(deps.get_db)):
@@ -76,14 +90,11 @@ def get_parameter(parameter_id: int, db: Session = Depends(deps.get_db)):
 
 @param_router.put("/{parameter_id}", response_model=schemas.InteractionParameter, dependencies=[param_perm("PUT")])
 def update_parameter(parameter_id: int, data: schemas.InteractionParameterUpdate, db: Session = Depends(deps.get_db)):
-    obj = db.query(models.InteractionParameter).filter_by(id=parameter_id).first()
-    if not obj:
+    row = writes.update_row(db, models.InteractionParameter, parameter_id, data.dict(exclude_unset=True))
+    if row is None:
         raise HTTPException(status_code=404, detail="Not found")
-    for field, value in data.dict(exclude_unset=True).items():
-        setattr(obj, field, value)
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 @param_router.delete("/{parameter_id}", dependencies=[param_perm("DELETE")])
 def delete_parameter(parameter_id: int, db: Session = Depends(deps.get_db)):
@@ -95,7 +106,7 @@ def delete_parameter(parameter_id: int, db: Session = Depends(deps.get_db)):
     return {"ok": True}
 
 # ------------------ Approvals ------------------
-approval_router = APIRouter(prefix="/interactionapprovals", tags=["interactionapprovals"])
+approval_router = APIRouter(prefix="/interactionapprovals", tags=["interactionapprovals"], route_class=deps.SessionRoute)
 approval_perm = lambda method: Depends(deps.require_api_permission("/interactionapprovals", method))
 
 @approval_router.post("/", response_model=schemas.InteractionApproval, status_code=status.HTTP_201_CREATED, dependencies=[approval_perm("POST")])
@@ -118,7 +129,7 @@ def create_approval(data: schemas.InteractionApprovalCreate, db: Session = Depen
     if existing:
         raise HTTPException(status_code=400, detail="Interaction already closed")
 
-    obj = models.InteractionApproval(
+    values = dict(
         interactionId=data.interactionId,
         creatorId=data.creatorId,
         aprovalUserId=data.aprovalUserId,
@@ -127,15 +138,19 @@ def create_approval(data: schemas.InteractionApprovalCreate, db: Session = Depen
         creationDate=datetime.utcnow(),
     )
     if data.interactionAprovalStateId in [approved.id, rejected.id]:
-        obj.aprovalDate = datetime.utcnow()
-    db.add(obj)
+        values["aprovalDate"] = datetime.utcnow()
+    row = writes.insert_row(db, models.InteractionApproval, values)
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 @approval_router.get("/", response_model=list[schemas.InteractionApproval], dependencies=[approval_perm("GET")])
-def list_approvals(db: Session = Depends(deps.get_db)):
-    return db.query(models.InteractionApproval).all()
+def list_approvals(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(deps.get_db),
+):
+    generations.check(db, page.request, response, ["interaction_approvals"])
+    return paginate(db, db.query(models.InteractionApproval), models.InteractionApproval, page, response)
 
 @approval_router.get("/{approval_id}", response_model=schemas.InteractionApproval, dependencies=[approval_perm("GET")])
 def get_approval(approval_id: int, db: Session = Depends(deps.get_db)):
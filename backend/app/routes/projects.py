@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session, selectinload
 
-from .. import models, schemas, deps
+from .. import models, schemas, deps, generations, writes
+from ..pagination import PageParams, page_params, paginate
 from .clients import require_service_manager
 
-router = APIRouter(prefix="/projects", tags=["projects"])
+router = APIRouter(prefix="/projects", tags=["projects"], route_class=deps.SessionRoute)
 
 MAX_DEDICATION_HOURS = 40
 
@@ -30,18 +31,24 @@ def create_project(
 
 @router.get("/", response_model=list[schemas.Project])
 def list_projects(
+    response: Response,
+    page: PageParams = Depends(page_params),
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_user),
 ):
+    generations.check(
+        db, page.request, response, ["projects", "project_employees", "users"],
+        scope=str(current_user.id),
+    )
+    query = db.query(models.Project).options(selectinload(models.Project.analysts))
     if current_user.role.name in ["Analista de Pruebas con skill de automatización", "Automatizador de Pruebas"]:
-        projs = (
-            db.query(models.Project)
+        query = (
+            query
             .join(models.ProjectEmployee, models.Project.id == models.ProjectEmployee.projectId)
             .filter(models.ProjectEmployee.userId == current_user.id)
-            .all()
         )
-        return projs
-    return db.query(models.Project).all()
+        return paginate(db, query, models.Project, page, response, whole_table=False)
+    return paginate(db, query, models.Project, page, response)
 
 
 @router.get("/{project_id}", response_model=schemas.Project)
@@ -90,7 +97,7 @@ def delete_project(
     return {"ok": True}
 
 
-@router.post("/{project_id}/analysts/{user_id}")
+@router.post("/{project_id}/analysts/{user_id}", response_model=schemas.ProjectEmployee)
 def assign_analyst(
     project_id: int,
     user_id: int,
@@ -111,16 +118,18 @@ def assign_analyst(
     total = sum(h[0] or 0 for h in current_hours) + (data.dedicationHours or 0)
     if total > MAX_DEDICATION_HOURS:
         raise HTTPException(status_code=400, detail="Dedication exceeded")
-    db_obj = models.ProjectEmployee(
-        projectId=project_id,
-        userId=user_id,
-        objective=data.objective,
-        dedicationHours=data.dedicationHours,
+    row = writes.insert_row(
+        db,
+        models.ProjectEmployee,
+        {
+            "projectId": project_id,
+            "userId": user_id,
+            "objective": data.objective,
+            "dedicationHours": data.dedicationHours,
+        },
     )
-    db.add(db_obj)
     db.commit()
-    db.refresh(db_obj)
-    return db_obj
+    return row
 
 
 @router.delete("/{project_id}/analysts/{user_id}")
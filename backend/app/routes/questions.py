@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from .. import models, schemas, deps
+from .. import models, schemas, deps, writes
 from ..crud import create_crud_router
 
 router = create_crud_router("questions", models.Question, schemas.Question)
@@ -38,13 +38,11 @@ def add_question_validation(
     )
     if existing:
         raise HTTPException(status_code=409, detail="Relation already exists")
-    obj = models.QuestionHasValidation(
-        questionId=question_id, validationId=validation_id
+    row = writes.insert_row(
+        db, models.QuestionHasValidation, {"questionId": question_id, "validationId": validation_id}
     )
-    db.add(obj)
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 @router.delete(
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from .. import models, schemas, deps, crypto
+from .. import models, schemas, deps, crypto, writes
+from ..pagination import PageParams, page_params, paginate
 from ..crud import create_crud_router
 
 router = create_crud_router("scenarios", models.Scenario, schemas.Scenario)
 
-data_router = APIRouter(prefix="/scenarios", tags=["scenariodata"])
+data_router = APIRouter(prefix="/scenarios", tags=["scenariodata"], route_class=deps.SessionRoute)
 perm_sd = lambda m: Depends(deps.require_api_permission("/scenariodata", m))
 perm_raw = lambda m: Depends(deps.require_api_permission("/rawdata", m))
 
@@ -25,10 +26,9 @@ def update_scenario_status(
     new_status = bool(body.get("status"))
     if new_status and not _scenario_ready(db, scenario_id):
         raise HTTPException(status_code=409, detail="Scenario incomplete")
-    scenario.status = new_status
+    row = writes.update_row(db, models.Scenario, scenario_id, {"status": new_status})
     db.commit()
-    db.refresh(scenario)
-    return scenario
+    return row
 
 
 def _scenario_ready(db: Session, scenario_id: int) -> bool:
@@ -63,11 +63,9 @@ def create_scenario_data(
 ):
     if not db.query(models.Scenario).filter_by(id=scenario_id).first():
         raise HTTPException(status_code=404, detail="Scenario not found")
-    obj = models.ScenarioData(idScenario=scenario_id, status=data.status)
-    db.add(obj)
+    row = writes.insert_row(db, models.ScenarioData, {"idScenario": scenario_id, "status": data.status})
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 @data_router.get(
@@ -75,14 +73,17 @@ def create_scenario_data(
     response_model=list[schemas.RawData],
     dependencies=[perm_raw("GET")],
 )
-def list_raw_data(data_id: int, db: Session = Depends(deps.get_db)):
+def list_raw_data(
+    data_id: int,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(deps.get_db),
+):
     if not db.query(models.ScenarioData).filter_by(id=data_id).first():
         raise HTTPException(status_code=404, detail="ScenarioData not found")
-    objs = db.query(models.RawData).filter_by(scenarioDataId=data_id).all()
-    for o in objs:
-        if o.fieldValue is not None:
-            o.fieldValue = crypto.decrypt(o.fieldValue)
-    return objs
+    query = db.query(models.RawData).filter_by(scenarioDataId=data_id)
+    objs = paginate(db, query, models.RawData, page, response, whole_table=False)
+    return crypto.decrypt_into(objs, schemas.RawData)
 
 
 @data_router.post(
@@ -102,13 +103,10 @@ def create_raw_data(
     data = raw.dict()
     if data.get("fieldValue") is not None:
         data["fieldValue"] = crypto.encrypt(data["fieldValue"])
-    obj = models.RawData(**data, scenarioDataId=data_id)
-    db.add(obj)
+    data["scenarioDataId"] = data_id
+    row = writes.insert_row(db, models.RawData, data)
     db.commit()
-    db.refresh(obj)
-    if obj.fieldValue is not None:
-        obj.fieldValue = crypto.decrypt(obj.fieldValue)
-    return obj
+    return crypto.decrypt_into([row], schemas.RawData)[0]
 
 
 router.include_router(data_router)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from .. import models, schemas, deps
+from .. import models, schemas, deps, writes
 from ..crud import create_crud_router
 
 router = create_crud_router("tasks", models.Task, schemas.Task)
@@ -36,11 +36,11 @@ def add_task_interaction(
     )
     if existing:
         raise HTTPException(status_code=409, detail="Relation already exists")
-    obj = models.TaskHaveInteraction(taskId=task_id, interactionId=interaction_id)
-    db.add(obj)
+    row = writes.insert_row(
+        db, models.TaskHaveInteraction, {"taskId": task_id, "interactionId": interaction_id}
+    )
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 
 @router.delete(
@@ -1,25 +1,35 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from .. import models, schemas, deps
+from .. import models, schemas, deps, generations, writes
+from ..pagination import PageParams, page_params, paginate
 
-router = APIRouter(prefix="/validations", tags=["validations"])
+router = APIRouter(prefix="/validations", tags=["validations"], route_class=deps.SessionRoute)
 perm = lambda method: Depends(deps.require_api_permission("/validations", method))
 
 @router.post("/", response_model=schemas.Validation, status_code=status.HTTP_201_CREATED, dependencies=[perm("POST")])
 def create_validation(data: schemas.ValidationCreate, db: Session = Depends(deps.get_db)):
     if db.query(models.Validation).filter_by(code=data.code).first():
         raise HTTPException(status_code=400, detail="Code exists")
-    obj = models.Validation(**data.dict())
-    db.add(obj)
+    try:
+        row = writes.insert_row(db, models.Validation, data.dict())
+    except IntegrityError:
+        # Unique index on code: another request took it after the check.
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Code exists")
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 @router.get("/", response_model=list[schemas.Validation], dependencies=[perm("GET")])
-def list_validations(db: Session = Depends(deps.get_db)):
-    return db.query(models.Validation).all()
+def list_validations(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(deps.get_db),
+):
+    generations.check(db, page.request, response, ["validations"])
+    return paginate(db, db.query(models.Validation), models.Validation, page, response)
 
 @router.get("/{validation_id}", response_model=schemas.Validation, dependencies=[perm("GET")])
 def get_validation(validation_id: int, db: Session = Depends(deps.get_db)):
@@ -30,14 +40,15 @@ def get_validation(validation_id: int, db: Session = Depends(deps.get_db)):
 
 @router.put("/{validation_id}", response_model=schemas.Validation, dependencies=[perm("PUT")])
 def update_validation(validation_id: int, data: schemas.ValidationUpdate, db: Session = Depends(deps.get_db)):
-    obj = db.query(models.Validation).filter_by(id=validation_id).first()
-    if not obj:
+    try:
+        row = writes.update_row(db, models.Validation, validation_id, data.dict(exclude_unset=True))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Code exists")
+    if row is None:
         raise HTTPException(status_code=404, detail="Not found")
-    for field, value in data.dict(exclude_unset=True).items():
-        setattr(obj, field, value)
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 @router.delete("/{validation_id}", dependencies=[perm("DELETE")])
 def delete_validation(validation_id: int, db: Session = Depends(deps.get_db)):
@@ -49,22 +60,25 @@ def delete_validation(validation_id: int, db: Session = Depends(deps.get_db)):
     return {"ok": True}
 
 # ------------------ Parameters ------------------
-param_router = APIRouter(prefix="/validationparameters", tags=["validationparameters"])
+param_router = APIRouter(prefix="/validationparameters", tags=["validationparameters"], route_class=deps.SessionRoute)
 param_perm = lambda method: Depends(deps.require_api_permission("/validationparameters", method))
 
 @param_router.post("/", response_model=schemas.ValidationParameter, status_code=status.HTTP_201_CREATED, dependencies=[param_perm("POST")])
 def create_val_parameter(data: schemas.ValidationParameterCreate, db: Session = Depends(deps.get_db)):
     if not db.query(models.Validation).filter_by(id=data.interactionId).first():
         raise HTTPException(status_code=404, detail="Validation not found")
-    obj = models.ValidationParameter(**data.dict())
-    db.add(obj)
+    row = writes.insert_row(db, models.ValidationParameter, data.dict())
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 @param_router.get("/", response_model=list[schemas.ValidationParameter], dependencies=[param_perm("GET")])
-def list_val_parameters(db: Session = Depends(deps.get_db)):
-    return db.query(models.ValidationParameter).all()
+def list_val_parameters(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(deps.get_db),
+):
+    generations.check(db, page.request, response, ["validation_parameters"])
+    return paginate(db, db.query(models.ValidationParameter), models.ValidationParameter, page, response)
 
 @param_router.get("/{parameter_id}", response_model=schemas.ValidationParameter, dependencies=[param_perm("GET")])
 def get_val_parameter(parameter_id: int, db: Session = Depends(deps.get_db)):
@@ -75,14 +89,11 @@ def get_val_parameter(parameter_id: int, db: Session = Depends(deps.get_db)):
 
 @param_router.put("/{parameter_id}", response_model=schemas.ValidationParameter, dependencies=[param_perm("PUT")])
 def update_val_parameter(parameter_id: int, data: schemas.ValidationParameterUpdate, db: Session = Depends(deps.get_db)):
-    obj = db.query(models.ValidationParameter).filter_by(id=parameter_id).first()
-    if not obj:
+    row = writes.update_row(db, models.ValidationParameter, parameter_id, data.dict(exclude_unset=True))
+    if row is None:
         raise HTTPException(status_code=404, detail="Not found")
-    for field, value in data.dict(exclude_unset=True).items():
-        setattr(obj, field, value)
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 @param_router.delete("/{parameter_id}", dependencies=[param_perm("DELETE")])
 def delete_val_parameter(parameter_id: int, db: Session = Depends(deps.get_db)):
@@ -94,7 +105,7 @@ def delete_val_parameter(parameter_id: int, db: Session = Depends(deps.get_db)):
     return {"ok": True}
 
 # ------------------ Approvals ------------------
-approval_router = APIRouter(prefix="/validationapprovals", tags=["validationapprovals"])
+approval_router = APIRouter(prefix="/validationapprovals", tags=["validationapprovals"], route_class=deps.SessionRoute)
 approval_perm = lambda method: Depends(deps.require_api_permission("/validationapprovals", method))
 
 @approval_router.post("/", response_model=schemas.ValidationApproval, status_code=status.HTTP_201_CREATED, dependencies=[approval_perm("POST")])
@@ -117,7 +128,7 @@ def create_val_approval(data: schemas.ValidationApprovalCreate, db: Session = De
     if existing:
         raise HTTPException(status_code=400, detail="Validation already closed")
 
-    obj = models.ValidationApproval(
+    values = dict(
         validationId=data.validationId,
         creatorId=data.creatorId,
         aprovalUserId=data.aprovalUserId,
@@ -126,15 +137,19 @@ def create_val_approval(data: schemas.ValidationApprovalCreate, db: Session = De
         creationDate=datetime.utcnow(),
     )
     if data.interactionAprovalStateId in [approved.id, rejected.id]:
-        obj.aprovalDate = datetime.utcnow()
-    db.add(obj)
+        values["aprovalDate"] = datetime.utcnow()
+    row = writes.insert_row(db, models.ValidationApproval, values)
     db.commit()
-    db.refresh(obj)
-    return obj
+    return row
 
 @approval_router.get("/", response_model=list[schemas.ValidationApproval], dependencies=[approval_perm("GET")])
-def list_val_approvals(db: Session = Depends(deps.get_db)):
-    return db.query(models.ValidationApproval).all()
+def list_val_approvals(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(deps.get_db),
+):
+    generations.check(db, page.request, response, ["validation_approvals"])
+    return paginate(db, db.query(models.ValidationApproval), models.ValidationApproval, page, response)
 
 @approval_router.get("/{approval_id}", response_model=schemas.ValidationApproval, dependencies=[approval_perm("GET")])
 def get_val_approval(approval_id: int, db: Session = Depends(deps.get_db)):
@@ -510,3 +510,21 @@ class ScenarioInfo(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+# Bulk operations on the generic CRUD routers
+class BulkItemResult(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    results: list[BulkItemResult]
+    succeeded: int
+    failed: int
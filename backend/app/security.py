@@ -1,11 +1,39 @@
 import re
-import time
 from fastapi import HTTPException, status
 
+from . import ratelimit
+
 MAX_LOGIN_ATTEMPTS = 5
 WINDOW_SECONDS = 60
 
-_login_attempts: dict[str, list[float]] = {}
+# Failed logins per client IP and username.
+login_limiter = ratelimit.from_env("login", f"{MAX_LOGIN_ATTEMPTS}/{WINDOW_SECONDS}")
+# Failed logins per client IP, whatever the username.
+login_ip_limiter = ratelimit.from_env("login_ip", f"{4 * MAX_LOGIN_ATTEMPTS}/{WINDOW_SECONDS}")
+# Registrations per client IP.
+register_limiter = ratelimit.from_env("register", "10/60")
+
+LOGIN_FAILED_DETAIL = "Invalid username or password"
+
+
+def ensure_login_allowed(client_ip: str, username: str) -> None:
+    """Raise 429 while the IP or the (IP, username) pair is blocked."""
+    login_ip_limiter.ensure_available(client_ip, LOGIN_FAILED_DETAIL)
+    login_limiter.ensure_available(f"{client_ip}:{username}", LOGIN_FAILED_DETAIL)
+
+
+def record_failed_login(client_ip: str, username: str) -> None:
+    """Charge a failed login, per IP first and then per (IP, username).
+
+    The per-IP cell is refreshed before any username cell is written and a
+    blocked IP writes none, so one client adds at most ``login_ip_limiter.limit``
+    keys per window and cannot push its own cell out of the memory LRU by
+    cycling usernames.
+    """
+    if login_ip_limiter.hit(client_ip) > 0:
+        return
+    login_limiter.hit(f"{client_ip}:{username}")
+
 
 BANNED_CODE_PATTERNS = ["import os", "import sys", "subprocess", "eval(", "exec(", "open(", "__"]
 
@@ -37,17 +65,6 @@ def validate_password_strength(password: str) -> None:
                             detail="Invalid username or password")
 
 
-def rate_limit_login(ip: str) -> None:
-    now = time.time()
-    attempts = _login_attempts.get(ip, [])
-    attempts = [ts for ts in attempts if now - ts < WINDOW_SECONDS]
-    if len(attempts) >= MAX_LOGIN_ATTEMPTS:
-        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                            detail="Invalid username or password")
-    attempts.append(now)
-    _login_attempts[ip] = attempts
-
-
 def validate_action_code(code: str) -> None:
     for pattern in BANNED_CODE_PATTERNS:
         if pattern in code:
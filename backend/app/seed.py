@@ -0,0 +1,215 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from . import models, deps, generations
+
+logger = logging.getLogger(__name__)
+
+SEED_KEY = "default"
+
+ROLES = [
+    ("Administrador", "/dashboard"),
+    ("Automation Engineer", "/dashboard"),
+    ("Gerente de servicios", "/clients"),
+    ("Analista de Performance", "/clients"),
+    ("Automatizador de Pruebas", "/clients"),
+    ("Arquitecto de Automatización", "/interactions"),
+    ("Analista de Pruebas con skill de automatización", "/clients"),
+]
+
+API_PERMISSIONS = [
+    ("/clients", "POST", "Gerente de servicios"),
+    ("/users", "PUT", "Arquitecto de Automatización"),
+    ("/actors", "GET", "Gerente de servicios"),
+    ("/digitalassets", "GET", "Gerente de servicios"),
+]
+
+HABILITIES = ["web", "movil", "apis", "performance"]
+
+ELEMENT_TYPES = ["textbox", "button", "combobox", "selector"]
+
+APPROVAL_STATES = ["pendiente", "aprobado", "rechazado"]
+
+FIELD_TYPES = [
+    ("numerico", None, "numeric"),
+    ("alfanumerico", None, "alphanumeric"),
+    ("alfabeto", None, "alphabet"),
+    ("uuid", None, "uuid"),
+    ("fecha", "YYYY-MM-DD", "date"),
+]
+
+DEFAULT_USERS = [
+    ("admin", "Administrador"),
+    ("architect", "Arquitecto de Automatización"),
+    ("AngelC", "Gerente de servicios"),
+    ("T23AutoPerson", "Automatizador de Pruebas"),
+]
+
+
+def fingerprint() -> str:
+    """Hash of the table definitions and the reference data seeded below."""
+    schema = [
+        (table.name, [(c.name, str(c.type)) for c in table.columns])
+        for table in models.Base.metadata.sorted_tables
+    ]
+    seed = [ROLES, API_PERMISSIONS, HABILITIES, ELEMENT_TYPES,
+            APPROVAL_STATES, FIELD_TYPES, DEFAULT_USERS]
+    payload = json.dumps([schema, seed], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def stored_fingerprint(db: Session) -> str | None:
+    """Return the fingerprint of the last successful seed, if any."""
+    try:
+        row = db.query(models.SeedState.fingerprint).filter_by(key=SEED_KEY).first()
+    except SQLAlchemyError:
+        # Table missing: the schema has never been created by this version.
+        db.rollback()
+        return None
+    return row.fingerprint if row else None
+
+
+def _add_missing(db: Session, model, column: str, values) -> None:
+    existing = {
+        v for (v,) in db.query(getattr(model, column))
+        .filter(getattr(model, column).in_([key for key, _ in values]))
+    }
+    db.add_all([model(**kwargs) for key, kwargs in values if key not in existing])
+
+
+def seed_database(db: Session) -> None:
+    """Insert missing reference rows with one lookup query per table."""
+    names = [name for name, _ in ROLES]
+    role_map = {
+        r.name: r for r in db.query(models.Role).filter(models.Role.name.in_(names))
+    }
+    new_roles = [
+        models.Role(name=name, description=name)
+        for name in names
+        if name not in role_map
+    ]
+    if new_roles:
+        db.add_all(new_roles)
+        db.flush()
+        role_map.update({r.name: r for r in new_roles})
+
+    start_pages = {
+        (p.role_id, p.page)
+        for p in db.query(models.PagePermission.role_id, models.PagePermission.page)
+        .filter_by(isStartPage=True)
+    }
+    db.add_all(
+        [
+            models.PagePermission(
+                page=page,
+                role_id=role_map[name].id,
+                isStartPage=True,
+                description="start",
+            )
+            for name, page in ROLES
+            if (role_map[name].id, page) not in start_pages
+        ]
+    )
+
+    api_perms = {
+        (p.route, p.method, p.role_id)
+        for p in db.query(
+            models.ApiPermission.route,
+            models.ApiPermission.method,
+            models.ApiPermission.role_id,
+        )
+    }
+    db.add_all(
+        [
+            models.ApiPermission(route=route, method=method, role_id=role_map[name].id)
+            for route, method, name in API_PERMISSIONS
+            if (route, method, role_map[name].id) not in api_perms
+        ]
+    )
+
+    _add_missing(db, models.Hability, "name", [(n, {"name": n}) for n in HABILITIES])
+    _add_missing(
+        db,
+        models.ElementType,
+        "description",
+        [(d, {"description": d}) for d in ELEMENT_TYPES],
+    )
+    _add_missing(
+        db,
+        models.InteractionApprovalState,
+        "name",
+        [(n, {"name": n}) for n in APPROVAL_STATES],
+    )
+    _add_missing(
+        db,
+        models.FieldType,
+        "name",
+        [
+            (name, {"name": name, "format": fmt, "description": desc})
+            for name, fmt, desc in FIELD_TYPES
+        ],
+    )
+
+    _add_missing(
+        db,
+        models.TableGeneration,
+        "name",
+        [
+            (n, {"name": n, "generation": 0})
+            for n in generations.tracked_tables() + [deps.PRINCIPALS_GENERATION]
+        ],
+    )
+
+    usernames = [username for username, _ in DEFAULT_USERS]
+    existing_users = {
+        u for (u,) in db.query(models.User.username)
+        .filter(models.User.username.in_(usernames))
+    }
+    # Only hash passwords for users that are actually created.
+    db.add_all(
+        [
+            models.User(
+                username=username,
+                password=deps.get_password_hash("admin"),
+                role_id=role_map[role_name].id,
+            )
+            for username, role_name in DEFAULT_USERS
+            if username not in existing_users
+        ]
+    )
+    db.commit()
+    logger.info("Database seed commit successful")
+
+
+def record_fingerprint(db: Session, value: str) -> None:
+    state = db.query(models.SeedState).filter_by(key=SEED_KEY).first()
+    if state is None:
+        state = models.SeedState(key=SEED_KEY)
+        db.add(state)
+    state.fingerprint = value
+    state.updatedDate = datetime.utcnow()
+    db.commit()
+
+
+def ensure_seeded(db: Session, create_schema) -> bool:
+    """Create tables and seed them unless the stored fingerprint matches.
+
+    Returns ``True`` when work was done. Set ``SEED_FORCE=1`` to reseed even
+    on a matching fingerprint.
+    """
+    current = fingerprint()
+    if os.getenv("SEED_FORCE") != "1" and stored_fingerprint(db) == current:
+        logger.info("Seed fingerprint unchanged, skipping schema and seed")
+        return False
+    logger.info("Creating database tables")
+    create_schema()
+    logger.info("Seeding database")
+    seed_database(db)
+    record_fingerprint(db, current)
+    return True
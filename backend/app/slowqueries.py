@@ -0,0 +1,146 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event
+
+from . import sqlstats
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this many milliseconds are logged; 0 disables.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "250"))
+# Entries kept in the ring buffer.
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+# Capture plans at most once per statement shape in this many seconds.
+EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "60"))
+# Set to 0 to log slow statements without plans.
+EXPLAIN_ENABLED = os.getenv("SLOW_QUERY_EXPLAIN", "1") == "1"
+# Plans waiting for the explain thread before new ones are skipped.
+EXPLAIN_MAX_PENDING = 10
+
+_log: deque = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_last_explained: dict[str, float] = {}
+_pending = 0
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+
+
+def parameter_shape(parameters, executemany: bool):
+    """Types of the bound parameters; values are never stored."""
+    if executemany and parameters:
+        return {"rows": len(parameters), "row": parameter_shape(parameters[0], False)}
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def _explain_sql(dialect: str, statement: str) -> Optional[str]:
+    if dialect == "postgresql":
+        # ANALYZE runs the statement, so only reads get it; the transaction
+        # is rolled back either way.
+        is_read = statement.lstrip().upper().startswith(("SELECT", "WITH"))
+        options = "ANALYZE, BUFFERS" if is_read else "VERBOSE"
+        return f"EXPLAIN ({options}) {statement}"
+    if dialect == "sqlite":
+        return f"EXPLAIN QUERY PLAN {statement}"
+    return None
+
+
+def _capture_plan(entry: dict, sql: str, parameters) -> None:
+    global _pending
+    try:
+        with engine.connect() as conn:
+            conn.info["slowqueries_skip"] = True
+            try:
+                rows = conn.exec_driver_sql(sql, parameters).all()
+            finally:
+                conn.rollback()
+                conn.info.pop("slowqueries_skip", None)
+        # PostgreSQL returns one text column; SQLite puts the detail last.
+        entry["plan"] = "\n".join(str(row[-1]) for row in rows)
+    except Exception as exc:
+        entry["plan_error"] = str(exc).splitlines()[0]
+    finally:
+        with _lock:
+            _pending -= 1
+
+
+def _should_explain(shape: str, executemany: bool) -> bool:
+    global _pending
+    if not EXPLAIN_ENABLED or executemany:
+        return False
+    now = time.monotonic()
+    with _lock:
+        if _pending >= EXPLAIN_MAX_PENDING or now - _last_explained.get(shape, -EXPLAIN_INTERVAL) < EXPLAIN_INTERVAL:
+            return False
+        _last_explained[shape] = now
+        _pending += 1
+    return True
+
+
+def record(conn, statement: str, parameters, executemany: bool, duration: float) -> dict:
+    shape = sqlstats.normalize(statement)
+    entry = {
+        "id": next(_ids),
+        "at": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round(duration * 1000, 2),
+        "statement": shape,
+        "parameters": parameter_shape(parameters, executemany),
+        "route": sqlstats.current_route(),
+        "plan": None,
+    }
+    with _lock:
+        _log.append(entry)
+    logger.warning("Slow query (%.1f ms) from %s: %s", entry["duration_ms"], entry["route"], shape)
+    sql = _explain_sql(conn.dialect.name, statement)
+    if sql is not None and _should_explain(shape, executemany):
+        _executor.submit(_capture_plan, entry, sql, parameters)
+    return entry
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    if SLOW_QUERY_MS > 0 and context is not None:
+        context._slow_query_start = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_slow_query_start", None)
+    if start is None or conn.info.get("slowqueries_skip"):
+        return
+    duration = time.perf_counter() - start
+    if duration * 1000 >= SLOW_QUERY_MS:
+        record(conn, statement, parameters, executemany, duration)
+
+
+def entries(route: Optional[str] = None, limit: int = 50) -> list[dict]:
+    """Newest first, optionally only those issued by ``route``."""
+    with _lock:
+        items = list(_log)
+    items.reverse()
+    if route:
+        items = [e for e in items if e["route"] and route in e["route"]]
+    return items[:limit]
+
+
+def get(entry_id: int) -> Optional[dict]:
+    with _lock:
+        return next((e for e in _log if e["id"] == entry_id), None)
+
+
+def clear() -> None:
+    with _lock:
+        _log.clear()
+        _last_explained.clear()
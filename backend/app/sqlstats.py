@@ -0,0 +1,163 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# A request running one statement shape more often than this is flagged.
+REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "10"))
+# Set to 0 to skip the Server-Timing headers.
+SERVER_TIMING = os.getenv("SQL_SERVER_TIMING", "1") == "1"
+
+_PARAM = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_PARAM_RE = re.compile(_PARAM)
+_PARAM_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """Statement shape: placeholders unified, IN lists and literals collapsed."""
+    shape = _PARAM_RE.sub("?", statement)
+    shape = _NUMBER_RE.sub("?", shape)
+    shape = _PARAM_LIST_RE.sub("(?)", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+class RequestStats:
+    """Statements issued while serving one request."""
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope or {}
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float) -> None:
+        shape = normalize(statement)
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.shapes[shape] += 1
+
+    def repeated(self) -> tuple[Optional[str], int]:
+        """Most repeated shape and its count."""
+        with self._lock:
+            common = self.shapes.most_common(1)
+        return common[0] if common else (None, 0)
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("sql_request_stats", default=None)
+_routes: dict[str, dict] = {}
+_routes_lock = threading.Lock()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, so a statement that raises leaves
+    # nothing behind on the connection.
+    if _current.get() is not None and context is not None:
+        context._sqlstats_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    start = getattr(context, "_sqlstats_start", None)
+    if stats is None or start is None:
+        return
+    stats.record(statement, time.perf_counter() - start)
+
+
+def _route_of(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+def current_route() -> Optional[str]:
+    """Method and route template of the request running this code, if any."""
+    stats = _current.get()
+    if stats is None:
+        return None
+    return f"{stats.scope.get('method')} {_route_of(stats.scope)}"
+
+
+def _finish(scope, stats: RequestStats) -> None:
+    route = _route_of(scope)
+    shape, repeats = stats.repeated()
+    flagged = repeats > REPEAT_THRESHOLD
+    if flagged:
+        logger.warning(
+            "%s %s ran one statement %d times (possible N+1): %s",
+            scope.get("method"), route, repeats, shape,
+        )
+    with _routes_lock:
+        entry = _routes.setdefault(
+            route,
+            {"requests": 0, "statements": 0, "db_seconds": 0.0, "max_statements": 0, "flagged": 0},
+        )
+        entry["requests"] += 1
+        entry["statements"] += stats.count
+        entry["db_seconds"] += stats.duration
+        entry["max_statements"] = max(entry["max_statements"], stats.count)
+        entry["flagged"] += int(flagged)
+        if flagged:
+            entry["last_repeated"] = {"statement": shape, "count": repeats}
+
+
+def _timing_headers(stats: RequestStats) -> list[tuple[bytes, bytes]]:
+    shape, repeats = stats.repeated()
+    value = f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+    headers = [(b"server-timing", value.encode())]
+    if repeats > REPEAT_THRESHOLD:
+        headers.append((b"x-repeated-statements", str(repeats).encode()))
+    return headers
+
+
+class SQLStatsMiddleware:
+    """Count statements and database time per request.
+
+    Adds ``Server-Timing`` (and ``X-Repeated-Statements`` when one statement
+    shape repeats more than ``SQL_REPEAT_THRESHOLD`` times) and aggregates
+    the numbers per route for :func:`route_stats`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and SERVER_TIMING:
+                message["headers"] = list(message.get("headers", [])) + _timing_headers(stats)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            _finish(scope, stats)
+
+
+def route_stats() -> dict:
+    with _routes_lock:
+        return {route: dict(entry) for route, entry in _routes.items()}
+
+
+def reset() -> None:
+    with _routes_lock:
+        _routes.clear()
@@ -0,0 +1,112 @@
+import json
+import os
+from typing import Callable, Optional
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+
+from . import deps
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+# Rows fetched from the cursor and encoded per chunk sent to the client.
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "500"))
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str, separators=(",", ":")).encode()
+
+
+def direct_columns(model, schema) -> Optional[list]:
+    """Return the columns backing ``schema`` if every field is a plain column.
+
+    ``None`` means the schema needs the ORM (relationships, computed or
+    encrypted fields) and must go through the regular path.
+    """
+    columns = model.__mapper__.columns
+    names = list(schema.model_fields)
+    if not all(name in columns for name in names):
+        return None
+    return [getattr(model, name) for name in names]
+
+
+def render_rows(db, stmt: Select, keys: list[str]) -> bytes:
+    """Encode every row of ``stmt`` at once (for bodies that get cached)."""
+    return dumps([dict(zip(keys, row)) for row in db.execute(stmt)])
+
+
+def _snapshot(db: Session) -> None:
+    """End the request's auth reads and start the listing's transaction on
+    ``db``; on PostgreSQL every read in it then sees one snapshot."""
+    deps.release_session(db)
+    if not db.in_transaction() and db.get_bind().dialect.name == "postgresql":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+
+def _chunk(rows, keys: list[str], first: bool) -> bytes:
+    chunk = dumps([dict(zip(keys, row)) for row in rows])[1:-1]
+    return chunk if first else b"," + chunk
+
+
+def stream_rows(db: Session, prepare: Callable[[Session], tuple], keys: list[str]) -> StreamingResponse:
+    """Send the rows of a statement as a JSON array of ``keys`` objects.
+
+    ``prepare(db)`` runs the checks and returns ``(stmt, headers)``; the
+    headers (ETag, cursor, total) and the body are read in one transaction
+    on the request session, which the response keeps open until the last
+    row is sent. ``Server-Timing`` is sent with the headers, so it does not
+    include the body query; ``/admin/sql/stats`` does.
+    """
+    _snapshot(db)
+    stmt, headers = prepare(db)
+    deps.keep_open(db)
+
+    def _body():
+        try:
+            result = db.execute(
+                stmt, execution_options={"stream_results": True, "yield_per": STREAM_CHUNK_ROWS}
+            )
+            yield b"["
+            first = True
+            for rows in result.partitions():
+                yield _chunk(rows, keys, first)
+                first = False
+            yield b"]"
+        finally:
+            db.close()
+
+    # The background task closes the session if the body is never iterated.
+    return StreamingResponse(
+        _body(), media_type="application/json", headers=headers, background=BackgroundTask(db.close)
+    )
+
+
+async def stream_rows_async(db: AsyncSession, prepare: Callable[[Session], tuple], keys: list[str]) -> StreamingResponse:
+    """:func:`stream_rows` on the async request session (``ASYNC_DB=1``)."""
+    await db.run_sync(_snapshot)
+    stmt, headers = await db.run_sync(prepare)
+    deps.keep_open(db)
+
+    async def _body():
+        try:
+            result = await db.stream(stmt, execution_options={"yield_per": STREAM_CHUNK_ROWS})
+            yield b"["
+            first = True
+            async for rows in result.partitions():
+                yield _chunk(rows, keys, first)
+                first = False
+            yield b"]"
+        finally:
+            await db.close()
+
+    return StreamingResponse(
+        _body(), media_type="application/json", headers=headers, background=BackgroundTask(db.close)
+    )
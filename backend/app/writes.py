@@ -0,0 +1,57 @@
+from typing import Any, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+
+def columns(model) -> list:
+    """Mapped column attributes of ``model``, labelled by attribute name."""
+    return [getattr(model, attr.key) for attr in model.__mapper__.column_attrs]
+
+
+def supports_returning(db: Session, statement: str) -> bool:
+    """Whether the dialect can return rows from ``insert`` or ``update``.
+
+    True on PostgreSQL and SQLite 3.35+.
+    """
+    return getattr(db.get_bind().dialect, f"{statement}_returning", False)
+
+
+def insert_row(db: Session, model, data: dict) -> Any:
+    """Insert ``data`` and return the stored row in the same round trip.
+
+    The result is a Core row with one attribute per column; on dialects
+    without RETURNING it is the flushed ORM object instead.
+    """
+    if supports_returning(db, "insert"):
+        return db.execute(insert(model).values(**data).returning(*columns(model))).one()
+    obj = model(**data)
+    db.add(obj)
+    db.flush()
+    return obj
+
+
+def update_row(db: Session, model, item_id: int, data: dict) -> Optional[Any]:
+    """Apply ``data`` to row ``item_id`` and return it, or ``None`` if missing.
+
+    Only the keys in ``data`` are written, so partial updates do not need the
+    row to be loaded first.
+    """
+    if not data:
+        return db.execute(select(*columns(model)).where(model.id == item_id)).one_or_none()
+    if supports_returning(db, "update"):
+        stmt = (
+            update(model)
+            .where(model.id == item_id)
+            .values(**data)
+            .returning(*columns(model))
+            .execution_options(synchronize_session=False)
+        )
+        return db.execute(stmt).one_or_none()
+    obj = db.get(model, item_id)
+    if obj is None:
+        return None
+    for field, value in data.items():
+        setattr(obj, field, value)
+    db.flush()
+    return obj
@@ -0,0 +1,66 @@
+"""Track cold-start cost of the backend.
+
+Measures, in fresh interpreters, how long ``import backend.app.main`` takes
+and how long the lifespan startup (schema, seed, validation) takes on a cold
+and on a warm database. Use ``--max-import-ms`` to fail CI on regressions.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import backend.app.main; "
+    "print(time.perf_counter() - t)"
+)
+STARTUP_SNIPPET = (
+    "import time; from backend.app import main; t = time.perf_counter(); "
+    "main.init_database(); print(time.perf_counter() - t)"
+)
+
+
+def _run(snippet: str, database_url: str) -> float:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    out = subprocess.run(
+        [sys.executable, "-c", snippet],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1]) * 1000
+
+
+def measure(runs: int) -> dict:
+    imports = [_run(IMPORT_SNIPPET, "sqlite://") for _ in range(runs)]
+    db_path = tempfile.mktemp(suffix=".db")
+    try:
+        cold = _run(STARTUP_SNIPPET, "sqlite:///" + db_path)
+        warm = [_run(STARTUP_SNIPPET, "sqlite:///" + db_path) for _ in range(runs)]
+    finally:
+        if os.path.exists(db_path):
+            os.remove(db_path)
+    return {
+        "import_ms_median": round(statistics.median(imports), 1),
+        "import_ms_max": round(max(imports), 1),
+        "startup_cold_ms": round(cold, 1),
+        "startup_warm_ms_median": round(statistics.median(warm), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    args = parser.parse_args()
+    result = measure(args.runs)
+    print(json.dumps(result, indent=2))
+    if args.max_import_ms is not None and result["import_ms_median"] > args.max_import_ms:
+        sys.exit(f"Import time regression: {result['import_ms_median']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import { Injectable } from '@angular/core';
 import { HttpClient, HttpHeaders } from '@angular/common/http';
-import { Observable, BehaviorSubject } from 'rxjs';
-import { map, catchError } from 'rxjs/operators';
+import { Observable, BehaviorSubject, EMPTY } from 'rxjs';
+import { map, catchError, expand, reduce } from 'rxjs/operators';
 import { 
   User, Role, Client, Project, Test, TestPlan, Page, PageElement,
   Action, ActionAssignment, Agent, ExecutionPlan, PlanExecution,
@@ -61,6 +61,23 @@ export class ApiService {
       });
   }
 
+  // Los listados están paginados: se siguen las páginas indicadas en X-Next-After.
+  private getAllPages<T>(url: string): Observable<T[]> {
+    const fetchPage = (after?: string) =>
+      this.http.get<T[]>(url, {
+        headers: this.getHeaders(),
+        observe: 'response',
+        params: after ? { limit: 1000, after } : { limit: 1000 }
+      });
+    return fetchPage().pipe(
+      expand(response => {
+        const next = response.headers.get('X-Next-After');
+        return next ? fetchPage(next) : EMPTY;
+      }),
+      reduce((items: T[], response) => items.concat(response.body ?? []), [])
+    );
+  }
+
   clearSession(): void {
     localStorage.removeItem('token');
     this.tokenSubject.next(null);
@@ -72,7 +89,7 @@ export class ApiService {
 
   // Roles
   getRoles(): Observable<Role[]> {
-    return this.http.get<Role[]>(`${this.baseUrl}/roles/`, { headers: this.getHeaders() });
+    return this.getAllPages<Role>(`${this.baseUrl}/roles/`);
   }
 
   createRole(role: RoleCreate): Observable<Role> {
@@ -113,7 +130,7 @@ export class ApiService {
   }
 
   getUsers(): Observable<User[]> {
-    return this.http.get<User[]>(`${this.baseUrl}/users/`, { headers: this.getHeaders() });
+    return this.getAllPages<User>(`${this.baseUrl}/users/`);
   }
 
   getAnalysts(search?: string, page = 1): Observable<User[]> {
@@ -134,7 +151,7 @@ export class ApiService {
 
   // Clientes
   getClients(): Observable<Client[]> {
-    return this.http.get<Client[]>(`${this.baseUrl}/clients/`, { headers: this.getHeaders() });
+    return this.getAllPages<Client>(`${this.baseUrl}/clients/`);
   }
 
   createClient(client: ClientCreate): Observable<Client> {
@@ -168,7 +185,7 @@ export class ApiService {
   // Digital Assets
   getDigitalAssets(clientId?: number): Observable<DigitalAsset[]> {
     const query = clientId ? `?clientId=${clientId}` : '';
-    return this.http.get<DigitalAsset[]>(`${this.baseUrl}/digitalassets/${query}`, { headers: this.getHeaders() });
+    return this.getAllPages<DigitalAsset>(`${this.baseUrl}/digitalassets/${query}`);
   }
 
   createDigitalAsset(asset: DigitalAssetCreate): Observable<DigitalAsset> {
@@ -185,7 +202,7 @@ export class ApiService {
 
   // Proyectos
   getProjects(): Observable<Project[]> {
-    return this.http.get<Project[]>(`${this.baseUrl}/projects/`, { headers: this.getHeaders() });
+    return this.getAllPages<Project>(`${this.baseUrl}/projects/`);
   }
 
   getProject(id: number): Observable<Project> {
@@ -236,7 +253,7 @@ export class ApiService {
     if (status) params.push(`status=${status}`);
     if (planId !== undefined) params.push(`test_plan_id=${planId}`);
     const query = params.length ? `?${params.join('&')}` : '';
-    return this.http.get<Test[]>(`${this.baseUrl}/tests/${query}`, { headers: this.getHeaders() });
+    return this.getAllPages<Test>(`${this.baseUrl}/tests/${query}`);
   }
 
   getTest(id: number): Observable<Test> {
@@ -257,7 +274,7 @@ export class ApiService {
 
   // Test Plans
   getTestPlans(): Observable<TestPlan[]> {
-    return this.http.get<TestPlan[]>(`${this.baseUrl}/testplans/`, { headers: this.getHeaders() });
+    return this.getAllPages<TestPlan>(`${this.baseUrl}/testplans/`);
   }
 
   getTestPlan(id: number): Observable<TestPlan> {
@@ -278,7 +295,7 @@ export class ApiService {
 
   // Pages
   getPages(): Observable<Page[]> {
-    return this.http.get<Page[]>(`${this.baseUrl}/pages/`, { headers: this.getHeaders() });
+    return this.getAllPages<Page>(`${this.baseUrl}/pages/`);
   }
 
   getPage(id: number): Observable<Page> {
@@ -325,7 +342,7 @@ export class ApiService {
 
   // Page Elements
   getElements(): Observable<PageElement[]> {
-    return this.http.get<PageElement[]>(`${this.baseUrl}/elements/`, { headers: this.getHeaders() });
+    return this.getAllPages<PageElement>(`${this.baseUrl}/elements/`);
   }
 
   getElement(id: number): Observable<PageElement> {
@@ -358,7 +375,7 @@ export class ApiService {
     if (search) params.push(`search=${encodeURIComponent(search)}`);
     if (tipo) params.push(`tipo=${tipo}`);
     const query = params.length ? `?${params.join('&')}` : '';
-    return this.http.get<Action[]>(`${this.baseUrl}/actions/${query}`, { headers: this.getHeaders() });
+    return this.getAllPages<Action>(`${this.baseUrl}/actions/${query}`);
   }
 
   getAction(id: number): Observable<Action> {
@@ -379,7 +396,7 @@ export class ApiService {
 
   // Action Assignments
   getAssignments(): Observable<ActionAssignment[]> {
-    return this.http.get<ActionAssignment[]>(`${this.baseUrl}/assignments/`, { headers: this.getHeaders() });
+    return this.getAllPages<ActionAssignment>(`${this.baseUrl}/assignments/`);
   }
 
   getAssignment(id: number): Observable<ActionAssignment> {
@@ -401,7 +418,7 @@ export class ApiService {
   // Actors
   getActors(clientId?: number): Observable<Actor[]> {
     const query = clientId ? `?client_id=${clientId}` : '';
-    return this.http.get<Actor[]>(`${this.baseUrl}/actors/${query}`, { headers: this.getHeaders() });
+    return this.getAllPages<Actor>(`${this.baseUrl}/actors/${query}`);
   }
 
   createActor(actor: ActorCreate): Observable<Actor> {
@@ -418,7 +435,7 @@ export class ApiService {
 
   // Agents
   getAgents(): Observable<Agent[]> {
-    return this.http.get<Agent[]>(`${this.baseUrl}/agents/`, { headers: this.getHeaders() });
+    return this.getAllPages<Agent>(`${this.baseUrl}/agents/`);
   }
 
   getAgent(id: number): Observable<Agent> {
@@ -448,7 +465,7 @@ export class ApiService {
       params = '?' + queryParams.join('&');
     }
     
-    return this.http.get<ExecutionPlan[]>(`${this.baseUrl}/executionplans/${params}`, { headers: this.getHeaders() });
+    return this.getAllPages<ExecutionPlan>(`${this.baseUrl}/executionplans/${params}`);
   }
 
   getExecutionPlan(id: number): Observable<ExecutionPlan> {
@@ -481,7 +498,7 @@ export class ApiService {
     if (planId) params.push(`plan_id=${planId}`);
     if (agentId) params.push(`agent_id=${agentId}`);
     const query = params.length ? `?${params.join('&')}` : '';
-    return this.http.get<PlanExecution[]>(`${this.baseUrl}/executions/${query}`, { headers: this.getHeaders() });
+    return this.getAllPages<PlanExecution>(`${this.baseUrl}/executions/${query}`);
   }
 
   getExecution(id: number): Observable<PlanExecution> {
@@ -497,7 +514,7 @@ export class ApiService {
   }
 
   getSchedules(): Observable<ExecutionSchedule[]> {
-    return this.http.get<ExecutionSchedule[]>(`${this.baseUrl}/schedules/`, { headers: this.getHeaders() });
+    return this.getAllPages<ExecutionSchedule>(`${this.baseUrl}/schedules/`);
   }
 
   deleteSchedule(id: number): Observable<any> {
@@ -536,7 +553,7 @@ export class ApiService {
 
   // Marketplace
   getMarketplaceComponents(): Observable<MarketplaceComponent[]> {
-    return this.http.get<MarketplaceComponent[]>(`${this.baseUrl}/marketplace/components/`, { headers: this.getHeaders() });
+    return this.getAllPages<MarketplaceComponent>(`${this.baseUrl}/marketplace/components/`);
   }
 
   createMarketplaceComponent(c: MarketplaceComponentCreate): Observable<MarketplaceComponent> {
@@ -554,7 +571,7 @@ export class ApiService {
 
   // Features
   getFeatures(): Observable<Feature[]> {
-    return this.http.get<Feature[]>(`${this.baseUrl}/features/`, { headers: this.getHeaders() });
+    return this.getAllPages<Feature>(`${this.baseUrl}/features/`);
   }
 
   createFeature(feature: Feature): Observable<Feature> {
@@ -563,7 +580,7 @@ export class ApiService {
 
   // Tasks
   getTasks(): Observable<Task[]> {
-    return this.http.get<Task[]>(`${this.baseUrl}/tasks/`, { headers: this.getHeaders() });
+    return this.getAllPages<Task>(`${this.baseUrl}/tasks/`);
   }
 
   createTask(task: Task): Observable<Task> {
@@ -572,7 +589,7 @@ export class ApiService {
 
   // Interactions
   getInteractions(): Observable<Interaction[]> {
-    return this.http.get<Interaction[]>(`${this.baseUrl}/interactions/`, { headers: this.getHeaders() });
+    return this.getAllPages<Interaction>(`${this.baseUrl}/interactions/`);
   }
 
   createInteraction(interaction: Interaction): Observable<Interaction> {
@@ -581,7 +598,7 @@ export class ApiService {
 
   // Validations
   getValidations(): Observable<Validation[]> {
-    return this.http.get<Validation[]>(`${this.baseUrl}/validations/`, { headers: this.getHeaders() });
+    return this.getAllPages<Validation>(`${this.baseUrl}/validations/`);
   }
 
   createValidation(v: Validation): Observable<Validation> {
@@ -590,7 +607,7 @@ export class ApiService {
 
   // Questions
   getQuestions(): Observable<Question[]> {
-    return this.http.get<Question[]>(`${this.baseUrl}/questions/`, { headers: this.getHeaders() });
+    return this.getAllPages<Question>(`${this.baseUrl}/questions/`);
   }
 
   createQuestion(q: Question): Observable<Question> {
@@ -599,7 +616,7 @@ export class ApiService {
 
   // RawData
   getRawData(): Observable<RawData[]> {
-    return this.http.get<RawData[]>(`${this.baseUrl}/rawdata/`, { headers: this.getHeaders() });
+    return this.getAllPages<RawData>(`${this.baseUrl}/rawdata/`);
   }
 
   createRawData(r: RawData): Observable<RawData> {
@@ -633,7 +650,7 @@ export class ApiService {
 
   // Scenarios
   getScenarios(): Observable<Scenario[]> {
-    return this.http.get<Scenario[]>(`${this.baseUrl}/scenarios/`, { headers: this.getHeaders() });
+    return this.getAllPages<Scenario>(`${this.baseUrl}/scenarios/`);
   }
 
   // Performance execution
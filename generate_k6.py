@@ -2,8 +2,9 @@ import json
 import os
 from pathlib import Path
 
-# Use SQLite to avoid requiring Postgres when importing the app
-os.environ.setdefault("DATABASE_URL", "sqlite:///./k6.db")
+# Importing the app performs no database I/O; an in-memory URL only avoids
+# requiring a Postgres driver to build the engine.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
 
 from fastapi.openapi.utils import get_openapi
 from backend.app.main import app
@@ -27,12 +28,33 @@ def build_k6_script(base_url: str, users: list[dict[str, str]]) -> str:
     lines.append(f"const BASE_URL = '{base_url}';")
     lines.append(f"const users = {json.dumps(users)};")
     lines.append("")
-    lines.append("export default function () {")
+    lines.append("const REFRESH_EVERY = 50;")
+    lines.append("")
+    lines.append("// Tokens are kept per VU: log in once, then rotate with the refresh token.")
+    lines.append("let session = null;")
+    lines.append("")
+    lines.append("function login() {")
     lines.append("  const user = users[Math.floor(Math.random() * users.length)];")
     lines.append("  const loginRes = http.post(`${BASE_URL}/token`, { username: user.username, password: user.password });")
     lines.append("  check(loginRes, { 'login ok': r => r.status === 200 });")
-    lines.append("  const token = loginRes.json('access_token');")
-    lines.append("  const params = { headers: { Authorization: `Bearer ${token}` } };")
+    lines.append("  return { access: loginRes.json('access_token'), refresh: loginRes.json('refresh_token') };")
+    lines.append("}")
+    lines.append("")
+    lines.append("function refresh(current) {")
+    lines.append("  const res = http.post(`${BASE_URL}/token/refresh`, JSON.stringify({ refresh_token: current.refresh }), { headers: { 'Content-Type': 'application/json' } });")
+    lines.append("  if (!check(res, { 'refresh ok': r => r.status === 200 })) {")
+    lines.append("    return login();")
+    lines.append("  }")
+    lines.append("  return { access: res.json('access_token'), refresh: res.json('refresh_token') };")
+    lines.append("}")
+    lines.append("")
+    lines.append("export default function () {")
+    lines.append("  if (session === null) {")
+    lines.append("    session = login();")
+    lines.append("  } else if (__ITER % REFRESH_EVERY === 0) {")
+    lines.append("    session = refresh(session);")
+    lines.append("  }")
+    lines.append("  const params = { headers: { Authorization: `Bearer ${session.access}` } };")
     lines.append("  http.get(`${BASE_URL}/users/me`, params);")
     lines.append("  sleep(1);")
     lines.append("}")
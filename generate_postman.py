@@ -2,8 +2,9 @@ import json
 import os
 from pathlib import Path
 
-# use SQLite by default to avoid requiring Postgres when importing app
-os.environ.setdefault("DATABASE_URL", "sqlite:///./postman.db")
+# Importing the app performs no database I/O; an in-memory URL only avoids
+# requiring a Postgres driver to build the engine.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
 
 from fastapi.openapi.utils import get_openapi
 from backend.app.main import app
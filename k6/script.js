@@ -13,12 +13,33 @@ export const options = {
 const BASE_URL = 'http://localhost:8000';
 const users = [{"username": "dev_user", "password": "dev_pass"}];
 
-export default function () {
+const REFRESH_EVERY = 50;
+
+// Tokens are kept per VU: log in once, then rotate with the refresh token.
+let session = null;
+
+function login() {
   const user = users[Math.floor(Math.random() * users.length)];
   const loginRes = http.post(`${BASE_URL}/token`, { username: user.username, password: user.password });
   check(loginRes, { 'login ok': r => r.status === 200 });
-  const token = loginRes.json('access_token');
-  const params = { headers: { Authorization: `Bearer ${token}` } };
+  return { access: loginRes.json('access_token'), refresh: loginRes.json('refresh_token') };
+}
+
+function refresh(current) {
+  const res = http.post(`${BASE_URL}/token/refresh`, JSON.stringify({ refresh_token: current.refresh }), { headers: { 'Content-Type': 'application/json' } });
+  if (!check(res, { 'refresh ok': r => r.status === 200 })) {
+    return login();
+  }
+  return { access: res.json('access_token'), refresh: res.json('refresh_token') };
+}
+
+export default function () {
+  if (session === null) {
+    session = login();
+  } else if (__ITER % REFRESH_EVERY === 0) {
+    session = refresh(session);
+  }
+  const params = { headers: { Authorization: `Bearer ${session.access}` } };
   http.get(`${BASE_URL}/users/me`, params);
   sleep(1);
 }
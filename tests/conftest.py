@@ -0,0 +1,16 @@
+import sys
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _initialized_database():
+    """Run the app's startup database work for modules that imported it.
+
+    ``backend.app.main`` no longer seeds on import and most tests use
+    ``TestClient`` without entering its lifespan.
+    """
+    main = sys.modules.get("backend.app.main")
+    if main is not None:
+        main.init_database()
+    yield
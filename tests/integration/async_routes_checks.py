@@ -0,0 +1,80 @@
+import asyncio
+import os
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+# Run by test_async_routes.py in a child pytest with ASYNC_DB=1 and its own
+# DATABASE_URL; importing it into a shared run would switch every module.
+assert os.environ.get("ASYNC_DB") == "1", "run through test_async_routes.py"
+
+from backend.app.main import app
+from backend.app.database import Base, engine
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+
+def admin_headers():
+    resp = client.post("/token", data={"username": "admin", "password": "admin"})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def _endpoint(path: str, method: str = "GET"):
+    for route in app.routes:
+        if getattr(route, "path", None) == path and method in route.methods:
+            return route.endpoint
+    raise AssertionError(path)
+
+
+def test_read_routes_are_coroutines():
+    assert asyncio.iscoroutinefunction(_endpoint("/elements/"))
+    assert asyncio.iscoroutinefunction(_endpoint("/elements/{item_id}"))
+    assert asyncio.iscoroutinefunction(_endpoint("/metrics/dashboard"))
+    # Writes await bcrypt, then run on the sync session in the threadpool.
+    assert asyncio.iscoroutinefunction(_endpoint("/users/", "POST"))
+
+
+def test_async_reads_see_sync_writes_and_etags():
+    headers = admin_headers()
+    resp = client.post("/habilities/", json={"id": 0, "name": "async"}, headers=headers)
+    assert resp.status_code == 200
+    resp = client.get("/habilities/", headers=headers)
+    assert resp.status_code == 200
+    assert any(h["name"] == "async" for h in resp.json())
+    resp = client.get("/habilities/", headers={**headers, "If-None-Match": resp.headers["ETag"]})
+    assert resp.status_code == 304
+    hability_id = next(h["id"] for h in client.get("/habilities/", headers=headers).json() if h["name"] == "async")
+    assert client.get(f"/habilities/{hability_id}", headers=headers).json()["name"] == "async"
+
+
+def test_async_auth_rejects_bad_token():
+    resp = client.get("/habilities/", headers={"Authorization": "Bearer nope"})
+    assert resp.status_code == 401
+
+
+def test_async_dashboard_for_architect():
+    resp = client.post("/token", data={"username": "architect", "password": "admin"})
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    resp = client.get("/metrics/dashboard", headers=headers)
+    assert resp.status_code == 200
+    assert "active_projects" in resp.json()
+    assert client.get("/architect/pending/interactions", headers=headers).status_code == 200
+
+
+def test_streamed_listing_stays_on_the_async_engine():
+    headers = admin_headers()
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        resp = client.get("/users/", params={"limit": 2, "count": "true"}, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    assert resp.status_code == 200
+    assert len(resp.json()) == 2 and "ETag" in resp.headers
+    assert int(resp.headers["X-Total-Count"]) >= 2
+    assert statements == []
@@ -0,0 +1,78 @@
+import os
+import tempfile
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+os.environ["REVOCATION_SYNC_INTERVAL"] = "3600"
+
+from backend.app.main import app
+from backend.app.database import Base, engine, SessionLocal
+from backend.app import models
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+
+def add_projects(count: int) -> tuple[set, set]:
+    """Create a client, two analysts and ``count`` projects; return their ids."""
+    db = SessionLocal()
+    users = [
+        models.User(username=f"analyst_{uuid4().hex[:8]}", password="x", role_id=1)
+        for _ in range(2)
+    ]
+    db.add_all(users)
+    c = models.Client(name="c", mision="m", vision="v")
+    db.add(c)
+    db.flush()
+    asset = models.DigitalAsset(clientId=c.id, description="d")
+    db.add(asset)
+    db.add_all([models.ClientAnalyst(clientId=c.id, userId=u.id) for u in users])
+    db.flush()
+    project_ids = set()
+    for i in range(count):
+        p = models.Project(digitalAssetsId=asset.id, name=f"p{i}")
+        db.add(p)
+        db.flush()
+        db.add_all([models.ProjectEmployee(projectId=p.id, userId=u.id) for u in users])
+        project_ids.add(p.id)
+    user_ids = {u.id for u in users}
+    db.commit()
+    db.close()
+    return project_ids, user_ids
+
+
+def list_statements(path: str, headers: dict) -> tuple[int, list]:
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        resp = client.get(path, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    assert resp.status_code == 200
+    return len(statements), resp.json()
+
+
+def test_listing_query_count_does_not_grow_with_rows():
+    resp = client.post("/token", data={"username": "admin", "password": "admin"})
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    client.get("/projects/", headers=headers)
+
+    few_ids, few_users = add_projects(3)
+    few_projects, body = list_statements("/projects/", headers)
+    few_clients, _ = list_statements("/clients/", headers)
+    mine = [p for p in body if p["id"] in few_ids]
+    assert len(mine) == 3
+    assert all({a["id"] for a in p["analysts"]} == few_users for p in mine)
+
+    many_ids, _ = add_projects(12)
+    many_projects, body = list_statements("/projects/", headers)
+    many_clients, _ = list_statements("/clients/", headers)
+    assert {p["id"] for p in body} >= few_ids | many_ids
+    assert many_projects == few_projects
+    assert many_clients == few_clients
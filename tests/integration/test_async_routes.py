@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+CHECKS = Path(__file__).with_name("async_routes_checks.py")
+
+
+def test_async_routes():
+    # ASYNC_DB is read once when backend.app.database is imported, so the
+    # async stack runs in a child process instead of changing this one.
+    env = {
+        **os.environ,
+        "ASYNC_DB": "1",
+        "DATABASE_URL": "sqlite:///" + tempfile.mktemp(suffix=".db"),
+    }
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", str(CHECKS)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
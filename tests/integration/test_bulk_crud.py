@@ -0,0 +1,124 @@
+import os
+import tempfile
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine, SessionLocal
+from backend.app import models, deps
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+
+def admin_headers():
+    resp = client.post("/token", data={"username": "admin", "password": "admin"})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_bulk_create_uses_one_insert():
+    headers = admin_headers()
+    items = [{"id": 0, "name": f"bulk{i}"} for i in range(50)]
+    inserts = []
+
+    def _record(conn, cursor, statement, *args):
+        if statement.startswith("INSERT INTO habilities"):
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        resp = client.post("/habilities/bulk", json=items, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["succeeded"] == 50 and body["failed"] == 0
+    # SQLite cannot return generated ids in parameter order from one
+    # multi-row INSERT, so SQLAlchemy falls back to one statement per row.
+    assert len(inserts) == (len(items) if engine.dialect.name == "sqlite" else 1)
+    ids = [r["id"] for r in body["results"]]
+    db = SessionLocal()
+    names = dict(db.query(models.Hability.id, models.Hability.name).filter(models.Hability.id.in_(ids)))
+    db.close()
+    assert [names[i] for i in ids] == [f"bulk{i}" for i in range(50)]
+
+
+def test_bulk_users_hash_passwords_and_report_per_item():
+    headers = admin_headers()
+    role_id = SessionLocal().query(models.Role.id).filter_by(name="Gerente de servicios").scalar()
+    user = {"id": 0, "password": "Secret1!", "is_active": True, "role_id": role_id,
+            "last_login": None, "endSubscriptionDate": None}
+    items = [dict(user, username="bulk_a"), dict(user, username="admin"), dict(user, username="bulk_b")]
+
+    resp = client.post("/users/bulk", json=items, headers=headers)
+    assert resp.status_code == 409
+    resp = client.post("/users/bulk", params={"mode": "best_effort"}, json=items, headers=headers)
+    assert resp.status_code == 200
+    assert [r["ok"] for r in resp.json()["results"]] == [True, False, True]
+
+    db = SessionLocal()
+    stored = db.query(models.User).filter_by(username="bulk_b").first()
+    db.close()
+    assert deps.verify_password("Secret1!", stored.password)
+
+
+def test_bulk_patch_and_delete():
+    headers = admin_headers()
+    resp = client.post("/habilities/bulk", json=[{"id": 0, "name": "x"}, {"id": 0, "name": "y"}], headers=headers)
+    ids = [r["id"] for r in resp.json()["results"]]
+
+    resp = client.patch(
+        "/habilities/bulk",
+        json=[{"id": ids[0], "name": "x2"}, {"id": 999999, "name": "nope"}],
+        headers=headers,
+    )
+    assert resp.status_code == 400
+    resp = client.patch(
+        "/habilities/bulk",
+        params={"mode": "best_effort"},
+        json=[{"id": ids[0], "name": "x2"}, {"id": 999999, "name": "nope"}],
+        headers=headers,
+    )
+    assert [r["ok"] for r in resp.json()["results"]] == [True, False]
+
+    resp = client.request("DELETE", "/habilities/bulk", json=ids, headers=headers)
+    assert resp.json()["succeeded"] == 2
+    db = SessionLocal()
+    assert db.query(models.Hability).filter(models.Hability.id.in_(ids)).count() == 0
+    db.close()
+
+
+def _user_with_projects(count: int) -> tuple[int, list[int]]:
+    db = SessionLocal()
+    user = models.User(username=f"bulk_{uuid4().hex[:8]}", password="x", role_id=1)
+    c = models.Client(name="c", mision="m", vision="v")
+    db.add_all([user, c])
+    db.flush()
+    asset = models.DigitalAsset(clientId=c.id, description="d")
+    db.add(asset)
+    db.flush()
+    projects = [models.Project(digitalAssetsId=asset.id, name=f"p{i}") for i in range(count)]
+    db.add_all(projects)
+    db.commit()
+    ids = user.id, [p.id for p in projects]
+    db.close()
+    return ids
+
+
+def test_bulk_dedication_limit_is_checked_across_the_batch():
+    headers = admin_headers()
+    user_id, project_ids = _user_with_projects(2)
+    items = [
+        {"id": 0, "projectId": project_id, "userId": user_id, "objective": None, "dedicationHours": 5}
+        for project_id in project_ids
+    ]
+    resp = client.post("/projectemployees/bulk", params={"mode": "best_effort"}, json=items, headers=headers)
+    assert [r["ok"] for r in resp.json()["results"]] == [True, False]
+    db = SessionLocal()
+    stored = db.query(models.ProjectEmployee.projectId).filter_by(userId=user_id).all()
+    db.close()
+    assert stored == [(project_ids[0],)]
@@ -0,0 +1,82 @@
+import os
+import tempfile
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+
+def admin_headers():
+    resp = client.post("/token", data={"username": "admin", "password": "admin"})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_unchanged_list_returns_304_without_listing_query():
+    headers = admin_headers()
+    first = client.get("/habilities/", headers=headers)
+    etag = first.headers["ETag"]
+    assert etag.startswith('"')
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        resp = client.get("/habilities/", headers={**headers, "If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+    assert resp.content == b""
+    assert not any("FROM habilities" in s for s in statements)
+
+
+def test_write_through_api_changes_the_etag():
+    headers = admin_headers()
+    etag = client.get("/habilities/", headers=headers).headers["ETag"]
+    other = client.get("/elementtypes/", headers=headers).headers["ETag"]
+
+    resp = client.post("/habilities/", json={"id": 0, "name": "etag"}, headers=headers)
+    assert resp.status_code == 200
+
+    resp = client.get("/habilities/", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    assert any(h["name"] == "etag" for h in resp.json())
+    # Other tables keep their tags.
+    resp = client.get("/elementtypes/", headers={**headers, "If-None-Match": other})
+    assert resp.status_code == 304
+
+
+def test_query_string_is_part_of_the_tag():
+    headers = admin_headers()
+    a = client.get("/habilities/", params={"limit": 1}, headers=headers).headers["ETag"]
+    b = client.get("/habilities/", params={"limit": 2}, headers=headers).headers["ETag"]
+    assert a != b
+
+
+def test_interaction_list_sends_an_etag():
+    headers = admin_headers()
+    etag = client.get("/interactions/", headers=headers).headers["ETag"]
+    resp = client.get("/interactions/", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+
+    user_id = client.get("/users/me/", headers=headers).json()["id"]
+    resp = client.post(
+        "/interactions/",
+        json={"id": 0, "userId": user_id, "code": "ETAG1", "name": "n", "requireReview": False, "description": "d"},
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    resp = client.get("/interactions/", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
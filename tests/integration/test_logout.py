@@ -1,11 +1,14 @@
 import os
+import time
 import tempfile
 from fastapi.testclient import TestClient
+from jose import jwt
 
 os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
 
 from backend.app.main import app
-from backend.app.database import Base, engine
+from backend.app.database import Base, engine, SessionLocal
+from backend.app import models, deps
 
 Base.metadata.create_all(bind=engine)
 client = TestClient(app)
@@ -24,3 +27,21 @@ def test_logout_revokes_token():
 
     resp = client.get("/roles/", headers={"Authorization": f"Bearer {token}"})
     assert resp.status_code == 401
+
+
+def test_tokens_carry_jti_and_expiry():
+    claims = jwt.get_unverified_claims(_login())
+    assert claims["jti"]
+    assert claims["exp"] <= time.time() + deps.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+def test_revocation_is_persisted():
+    token = _login()
+    resp = client.post("/logout", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200
+    db = SessionLocal()
+    try:
+        jti = jwt.get_unverified_claims(token)["jti"]
+        assert db.query(models.RevokedToken).filter_by(jti=jti).count() == 1
+    finally:
+        db.close()
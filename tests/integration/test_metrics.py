@@ -0,0 +1,76 @@
+import os
+import tempfile
+import pytest
+from fastapi.testclient import TestClient
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine
+from backend.app import metrics
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+
+def admin_headers():
+    resp = client.post("/token", data={"username": "admin", "password": "admin"})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+@pytest.fixture
+def scrape(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "s3cret")
+    return lambda: client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+
+
+def _samples(text: str) -> dict:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_report_routes_pool_caches_and_hashing(scrape):
+    headers = admin_headers()
+    for _ in range(3):
+        client.get("/habilities/", headers=headers)
+    client.get("/habilities/999999", headers=headers)
+
+    resp = scrape()
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(resp.text)
+    assert samples['http_requests_total{method="GET",route="/habilities/",status="200"}'] >= 3
+    assert samples['http_requests_total{method="GET",route="/habilities/{item_id}",status="404"}'] == 1
+    assert samples['http_request_duration_seconds_count{method="GET",route="/habilities/"}'] >= 3
+    assert samples['http_request_duration_seconds_bucket{method="GET",route="/habilities/",le="+Inf"}'] >= 3
+    # The scrape itself is in flight while it renders.
+    assert samples['http_requests_in_flight{method="GET"}'] == 1
+    assert samples["threadpool_threads_total"] > 0
+    assert samples['db_pool_checkouts_total{engine="sync"}'] > 0
+    assert 'cache_hit_ratio{cache="principal"}' in samples
+    assert "password_hash_queue_depth" in samples
+
+
+def test_unmatched_paths_share_one_label(scrape):
+    client.get("/no/such/path/1")
+    client.get("/no/such/path/2")
+    samples = _samples(scrape().text)
+    assert samples['http_requests_total{method="GET",route="<unmatched>",status="404"}'] >= 2
+
+
+def test_metrics_token(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+
+def test_metrics_closed_without_token(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 403
+    monkeypatch.setattr(metrics, "METRICS_PUBLIC", True)
+    assert client.get("/metrics").status_code == 200
@@ -0,0 +1,81 @@
+import os
+import tempfile
+from fastapi.testclient import TestClient
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine, SessionLocal
+from backend.app import models
+from backend.app.pagination import DEFAULT_LIMIT, MAX_LIMIT
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+
+def admin_headers():
+    resp = client.post("/token", data={"username": "admin", "password": "admin"})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_keyset_pages_cover_the_table_once():
+    db = SessionLocal()
+    db.add_all([models.Hability(name=f"skill{i}") for i in range(10)])
+    db.commit()
+    total = db.query(models.Hability).count()
+    db.close()
+    headers = admin_headers()
+
+    seen, after = [], None
+    while True:
+        params = {"limit": 3, "count": "true"}
+        if after is not None:
+            params["after"] = after
+        resp = client.get("/habilities/", params=params, headers=headers)
+        assert resp.status_code == 200
+        assert resp.headers["X-Total-Count"] == str(total)
+        seen += [h["id"] for h in resp.json()]
+        after = resp.headers.get("X-Next-After")
+        if after is None:
+            break
+        assert 'rel="next"' in resp.headers["Link"]
+    assert seen == sorted(seen) and len(seen) == len(set(seen)) == total
+
+
+def test_filters_and_sort_are_whitelisted():
+    headers = admin_headers()
+    resp = client.get("/habilities/", params={"name": "skill3"}, headers=headers)
+    assert [h["name"] for h in resp.json()] == ["skill3"]
+
+    resp = client.get("/users/", params={"sort": "-username", "limit": 2}, headers=headers)
+    names = [u["username"] for u in resp.json()]
+    assert names == sorted(names, reverse=True)
+    after = resp.headers["X-Next-After"]
+    resp = client.get(
+        "/users/", params={"sort": "-username", "limit": 2, "after": after}, headers=headers
+    )
+    assert all(u["username"] < names[-1] for u in resp.json())
+
+    assert client.get("/users/", params={"password": "x"}, headers=headers).status_code == 400
+    assert client.get("/habilities/", params={"sort": "name"}, headers=headers).status_code == 400
+    assert client.get("/users/", params={"is_active": "maybe"}, headers=headers).status_code == 400
+
+
+def test_default_limit_applies_and_unknown_params_are_ignored():
+    db = SessionLocal()
+    db.add_all([models.Hability(name=f"bulk{i}") for i in range(DEFAULT_LIMIT + 1)])
+    db.commit()
+    db.close()
+    headers = admin_headers()
+    resp = client.get("/habilities/", params={"count": "true"}, headers=headers)
+    assert resp.status_code == 200
+    assert int(resp.headers["X-Total-Count"]) > DEFAULT_LIMIT
+    assert len(resp.json()) == DEFAULT_LIMIT and "X-Next-After" in resp.headers
+
+    resp = client.get(
+        "/habilities/", params={"search": "x", "skip": 10, "limit": 2}, headers=headers
+    )
+    assert resp.status_code == 200 and len(resp.json()) == 2
+    resp = client.get("/habilities/", params={"limit": MAX_LIMIT + 1}, headers=headers)
+    assert resp.status_code == 422
@@ -0,0 +1,89 @@
+import os
+import tempfile
+from fastapi.testclient import TestClient
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine, SessionLocal
+from backend.app import models, deps, generations, permissions
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+
+def login(username: str, password: str) -> str:
+    resp = client.post("/token", data={"username": username, "password": password})
+    assert resp.status_code == 200
+    return resp.json()["access_token"]
+
+
+def test_index_is_reused_and_invalidated_on_writes():
+    admin_token = login("admin", "admin")
+    admin = {"Authorization": f"Bearer {admin_token}"}
+
+    db = SessionLocal()
+    role = models.Role(name="IndexRole", description="index")
+    db.add(role)
+    db.commit()
+    db.refresh(role)
+    role_id = role.id
+    db.add(
+        models.User(
+            username="indexuser",
+            password=deps.get_password_hash("index"),
+            role_id=role_id,
+        )
+    )
+    db.commit()
+    db.close()
+    user = {"Authorization": f"Bearer {login('indexuser', 'index')}"}
+
+    permissions.invalidate()
+    assert client.get("/elementtypes/", headers=user).status_code == 403
+    rebuilds = permissions.stats()["rebuilds"]
+    assert client.get("/elementtypes/", headers=user).status_code == 403
+    assert permissions.stats()["rebuilds"] == rebuilds
+
+    resp = client.post(
+        f"/roles/{role_id}/api-permissions",
+        json={"route": "/elementtypes", "method": "GET"},
+        headers=admin,
+    )
+    assert resp.status_code == 200
+    perm_id = resp.json()["id"]
+    assert client.get("/elementtypes/", headers=user).status_code == 200
+    assert permissions.stats()["rebuilds"] == rebuilds + 1
+
+    resp = client.delete(f"/roles/{role_id}/api-permissions/{perm_id}", headers=admin)
+    assert resp.status_code == 200
+    assert client.get("/elementtypes/", headers=user).status_code == 403
+
+    stats = client.get("/admin/permissions/stats", headers=admin).json()
+    assert stats["hits"] >= 1
+    assert stats["rebuilds"] >= rebuilds + 2
+
+
+def test_index_follows_writes_from_other_workers():
+    db = SessionLocal()
+    role = models.Role(name="OtherWorkerRole", description="index")
+    db.add(role)
+    db.commit()
+    role_id = role.id
+    db.close()
+    db = SessionLocal()
+    assert not permissions.has_api_permission(db, role_id, "/tests", "GET")
+    rebuilds = permissions.stats()["rebuilds"]
+
+    # Another worker writes the row: no invalidate() reaches this process.
+    with engine.begin() as conn:
+        conn.execute(
+            models.ApiPermission.__table__.insert().values(
+                role_id=role_id, route="/tests", method="GET"
+            )
+        )
+    assert not permissions.has_api_permission(db, role_id, "/tests", "GET")
+    generations.bump(engine, [models.ApiPermission.__tablename__])
+    assert permissions.has_api_permission(db, role_id, "/tests", "GET")
+    assert permissions.stats()["rebuilds"] == rebuilds + 1
+    db.close()
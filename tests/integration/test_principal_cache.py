@@ -0,0 +1,99 @@
+import os
+import tempfile
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine, SessionLocal
+from backend.app import models, deps
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+
+def login(username: str, password: str) -> str:
+    resp = client.post("/token", data={"username": username, "password": password})
+    assert resp.status_code == 200
+    return resp.json()["access_token"]
+
+
+def count_statements(fn) -> int:
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    return len(statements)
+
+
+def test_cached_principal_costs_no_sql():
+    headers = {"Authorization": f"Bearer {login('admin', 'admin')}"}
+    assert client.get("/users/me/", headers=headers).status_code == 200
+
+    def _me():
+        resp = client.get("/users/me/", headers=headers)
+        assert resp.status_code == 200
+        assert resp.json()["username"] == "admin"
+
+    assert count_statements(_me) == 0
+
+
+def test_role_change_invalidates_principal():
+    db = SessionLocal()
+    role = db.query(models.Role).filter_by(name="Gerente de servicios").first()
+    user = models.User(
+        username="cacheuser",
+        password=deps.get_password_hash("cache"),
+        role_id=role.id,
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    user_id = user.id
+    admin_role_id = db.query(models.Role).filter_by(name="Administrador").first().id
+    db.close()
+
+    admin = {"Authorization": f"Bearer {login('admin', 'admin')}"}
+    headers = {"Authorization": f"Bearer {login('cacheuser', 'cache')}"}
+    assert client.get("/users/", headers=headers).status_code == 403
+
+    resp = client.post(f"/users/{user_id}/role/{admin_role_id}", headers=admin)
+    assert resp.status_code == 200
+    assert client.get("/users/", headers=headers).status_code == 200
+
+    assert client.post("/logout", headers=headers).status_code == 200
+    assert client.get("/users/me/", headers=headers).status_code == 401
+
+
+def test_change_from_another_worker_reaches_cached_principal(monkeypatch):
+    db = SessionLocal()
+    role = db.query(models.Role).filter_by(name="Gerente de servicios").first()
+    user = models.User(
+        username="otherworker",
+        password=deps.get_password_hash("other"),
+        role_id=role.id,
+    )
+    db.add(user)
+    db.commit()
+    headers = {"Authorization": f"Bearer {login('otherworker', 'other')}"}
+    assert client.get("/users/", headers=headers).status_code == 403
+
+    # Another worker promotes the user: its own cache is cleared, this
+    # process only sees the shared generation move.
+    user.role_id = db.query(models.Role).filter_by(name="Administrador").first().id
+    db.commit()
+    db.query(models.TableGeneration).filter_by(name=deps.PRINCIPALS_GENERATION).update(
+        {"generation": models.TableGeneration.generation + 1}
+    )
+    db.commit()
+    db.close()
+
+    monkeypatch.setattr(deps.revocation, "SYNC_INTERVAL_SECONDS", 0)
+    assert client.get("/users/", headers=headers).status_code == 200
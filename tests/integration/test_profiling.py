@@ -0,0 +1,108 @@
+import os
+import tempfile
+import threading
+import time
+from fastapi import APIRouter
+from fastapi.testclient import TestClient
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine
+from backend.app import deps, profiling
+
+Base.metadata.create_all(bind=engine)
+
+probe = APIRouter(route_class=deps.SessionRoute)
+
+
+def _busy_work():
+    end = time.perf_counter() + 0.1
+    while time.perf_counter() < end:
+        pass
+
+
+def _other_work():
+    end = time.perf_counter() + 0.4
+    while time.perf_counter() < end:
+        pass
+
+
+@probe.get("/_probe/slow")
+def probe_slow():
+    _busy_work()
+    return {"ok": True}
+
+
+@probe.get("/_probe/other")
+def probe_other():
+    _other_work()
+    return {"ok": True}
+
+
+app.include_router(probe)
+client = TestClient(app)
+
+
+def _headers(username):
+    resp = client.post("/token", data={"username": username, "password": "admin"})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_admin_request_is_profiled_and_downloadable():
+    headers = _headers("admin")
+    resp = client.get("/_probe/slow", headers={**headers, "X-Profile": "1"})
+    assert resp.status_code == 200
+    profile_id = resp.headers["X-Profile-Id"]
+
+    listed = client.get("/admin/profiles", headers=headers).json()
+    assert listed[0]["id"] == profile_id and listed[0]["route"] == "/_probe/slow"
+    assert "folded" not in listed[0]
+
+    resp = client.get(f"/admin/profiles/{profile_id}", headers=headers)
+    assert resp.status_code == 200
+    lines = resp.text.splitlines()
+    assert any("_busy_work" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert ";" in stack and int(count) > 0
+
+
+def test_profile_skips_concurrent_requests():
+    headers = _headers("admin")
+    other = threading.Thread(target=client.get, args=("/_probe/other",))
+    other.start()
+    time.sleep(0.05)
+    resp = client.get("/_probe/slow", headers={**headers, "X-Profile": "1"})
+    other.join()
+    folded = client.get(f"/admin/profiles/{resp.headers['X-Profile-Id']}", headers=headers).text
+    assert "_busy_work" in folded
+    assert "_other_work" not in folded
+
+
+def test_query_flag_works_with_paginated_lists():
+    headers = _headers("admin")
+    resp = client.get("/habilities/?profile=1", headers=headers)
+    assert resp.status_code == 200
+    assert "X-Profile-Id" in resp.headers
+
+
+def test_non_admin_flag_is_ignored():
+    headers = _headers("architect")
+    resp = client.get("/_probe/slow", headers={**headers, "X-Profile": "1"})
+    assert resp.status_code == 200
+    assert "X-Profile-Id" not in resp.headers
+    assert client.get("/admin/profiles", headers=headers).status_code == 403
+
+
+def test_continuous_profiler():
+    headers = _headers("admin")
+    assert client.get("/admin/profiles/continuous", headers=headers).status_code == 404
+    assert profiling.start_continuous(hz=200)
+    try:
+        client.get("/_probe/slow")
+        resp = client.get("/admin/profiles/continuous?reset=true", headers=headers)
+        assert resp.status_code == 200
+        assert "_busy_work" in resp.text
+    finally:
+        profiling.stop_continuous()
@@ -0,0 +1,130 @@
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.orm import Session
+
+from backend.app import models as m
+from backend.app.database import Base
+
+# A private database: the 20k seeded rows would otherwise land in the one
+# shared by every module of a full run.
+engine = create_engine("sqlite:///" + tempfile.mktemp(suffix=".db"))
+
+ROWS = 20000
+
+
+def _seed():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(m.ProjectEmployee.__table__.insert(), [
+            {"projectId": i % 500, "userId": i % 2000, "dedicationHours": 4} for i in range(ROWS)
+        ])
+        conn.execute(m.ClientAnalyst.__table__.insert(), [
+            {"clientId": i % 300, "userId": i % 2000} for i in range(ROWS)
+        ])
+        conn.execute(m.ScenarioInfo.__table__.insert(), [
+            {"featureStepId": i, "scenarioId": i % 1000, "order": i % 20} for i in range(ROWS)
+        ])
+        conn.execute(m.ScenarioData.__table__.insert(), [
+            {"idScenario": i % 1000} for i in range(ROWS)
+        ])
+        conn.execute(m.RawData.__table__.insert(), [
+            {"fieldTypeId": 1, "fieldName": f"f{i}", "scenarioDataId": i % 4000} for i in range(ROWS)
+        ])
+        conn.execute(m.ApiPermission.__table__.insert(), [
+            {"route": f"/r{i % 400}", "method": ("GET", "POST", "PUT", "DELETE")[i % 4], "role_id": i % 7}
+            for i in range(ROWS)
+        ])
+        conn.execute(m.PagePermission.__table__.insert(), [
+            {"page": f"/p{i % 400}", "role_id": i % 7} for i in range(ROWS)
+        ])
+        # Most approvals are closed; the dashboard looks for the pending few.
+        conn.execute(m.InteractionApproval.__table__.insert(), [
+            {"interactionId": i % 5000, "creatorId": 1, "aprovalUserId": 1,
+             "interactionAprovalStateId": 1 if i % 100 == 0 else 2 + i % 50}
+            for i in range(ROWS)
+        ])
+        conn.execute(m.ValidationApproval.__table__.insert(), [
+            {"validationId": i % 5000, "creatorId": 1, "aprovalUserId": 1,
+             "interactionAprovalStateId": 1 if i % 100 == 0 else 2 + i % 50}
+            for i in range(ROWS)
+        ])
+        conn.execute(m.Interaction.__table__.insert(), [
+            {"userId": 1, "code": f"I{i}", "name": "n"} for i in range(ROWS)
+        ])
+        conn.execute(m.Validation.__table__.insert(), [
+            {"userId": 1, "code": f"V{i}", "name": "n"} for i in range(ROWS)
+        ])
+        conn.execute(m.TaskHaveInteraction.__table__.insert(), [
+            {"taskId": i % 1000, "interactionId": i} for i in range(ROWS)
+        ])
+        conn.execute(m.ScenarioHasFeature.__table__.insert(), [
+            {"featureId": i % 1000, "scenarioId": i} for i in range(ROWS)
+        ])
+        conn.execute(m.QuestionHasValidation.__table__.insert(), [
+            {"questionId": i % 1000, "validationId": i} for i in range(ROWS)
+        ])
+        conn.execute(text("ANALYZE"))
+
+
+_seed()
+
+# The statements the routes run on their hot paths, keyed by the table that
+# must be searched through an index.
+HOT_QUERIES = {
+    "dedication totals": ("project_employees", lambda db: db.query(
+        m.ProjectEmployee.userId, func.sum(m.ProjectEmployee.dedicationHours)
+    ).filter(m.ProjectEmployee.userId.in_([1, 2, 3])).group_by(m.ProjectEmployee.userId)),
+    "analyst projects": ("project_employees", lambda db: db.query(m.Project)
+        .join(m.ProjectEmployee, m.Project.id == m.ProjectEmployee.projectId)
+        .filter(m.ProjectEmployee.userId == 7)),
+    "project assignment": ("project_employees", lambda db: db.query(m.ProjectEmployee)
+        .filter_by(projectId=3, userId=7)),
+    "client assignment": ("client_analysts", lambda db: db.query(m.ClientAnalyst)
+        .filter_by(clientId=3, userId=7)),
+    "analyst clients": ("client_analysts", lambda db: db.query(m.ClientAnalyst)
+        .filter_by(userId=7)),
+    "scenario steps": ("scenario_info", lambda db: db.query(m.ScenarioInfo)
+        .filter_by(scenarioId=5)),
+    "scenario data": ("scenario_data", lambda db: db.query(m.ScenarioData)
+        .filter_by(idScenario=5)),
+    "raw data": ("raw_data", lambda db: db.query(m.RawData).filter_by(scenarioDataId=5)),
+    "api permission": ("api_permissions", lambda db: db.query(m.ApiPermission)
+        .filter_by(route="/r5", method="GET")),
+    "page permission": ("page_permissions", lambda db: db.query(m.PagePermission.page)
+        .filter_by(role_id=2, page="/p5")),
+    "pending interactions": ("interaction_approvals", lambda db: db.query(m.InteractionApproval)
+        .filter_by(interactionAprovalStateId=1)),
+    "closed interaction": ("interaction_approvals", lambda db: db.query(m.InteractionApproval)
+        .filter(m.InteractionApproval.interactionId == 5)
+        .filter(m.InteractionApproval.interactionAprovalStateId.in_([2, 3]))),
+    "pending validations": ("validation_approvals", lambda db: db.query(m.ValidationApproval)
+        .filter_by(interactionAprovalStateId=1)),
+    "interaction code": ("interactions", lambda db: db.query(m.Interaction).filter_by(code="I5")),
+    "validation code": ("validations", lambda db: db.query(m.Validation).filter_by(code="V5")),
+    "task links": ("task_have_interactions", lambda db: db.query(m.TaskHaveInteraction)
+        .filter_by(taskId=5)),
+    "feature links": ("scenario_has_features", lambda db: db.query(m.ScenarioHasFeature)
+        .filter_by(featureId=5, scenarioId=5)),
+    "question links": ("question_has_validations", lambda db: db.query(m.QuestionHasValidation)
+        .filter_by(questionId=5)),
+}
+
+
+def query_plan(query) -> list[str]:
+    sql = query.statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(name):
+    table, build = HOT_QUERIES[name]
+    with Session(engine) as db:
+        plan = query_plan(build(db))
+    steps = [step for step in plan if f" {table} " in f" {step} "]
+    assert steps, plan
+    for step in steps:
+        assert step.startswith("SEARCH") and "INDEX" in step, plan
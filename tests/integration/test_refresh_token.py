@@ -0,0 +1,81 @@
+import os
+import tempfile
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine, SessionLocal
+from backend.app import models
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+
+def _login() -> dict:
+    resp = client.post("/token", data={"username": "admin", "password": "admin"})
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def test_refresh_rotates_tokens():
+    tokens = _login()
+    resp = client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert resp.status_code == 200
+    rotated = resp.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+    assert client.get("/users/me/", headers=headers).status_code == 200
+
+    db = SessionLocal()
+    try:
+        stored = db.query(models.RefreshToken.token_hash).all()
+        assert all(tokens["refresh_token"] not in h for (h,) in stored)
+    finally:
+        db.close()
+
+
+def test_reused_refresh_token_revokes_family():
+    tokens = _login()
+    first = client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert first.status_code == 200
+
+    reused = client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert reused.status_code == 401
+
+    latest = client.post("/token/refresh", json={"refresh_token": first.json()["refresh_token"]})
+    assert latest.status_code == 401
+
+
+def test_logout_revokes_refresh_token():
+    tokens = _login()
+    resp = client.post(
+        "/logout",
+        json={"refresh_token": tokens["refresh_token"]},
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    assert resp.status_code == 200
+    resp = client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert resp.status_code == 401
+
+
+def test_concurrent_refresh_with_one_token_succeeds_once():
+    tokens = _login()
+    raced = []
+
+    def _other_refresh_wins(conn, cursor, statement, *args):
+        # A concurrent request claims the token right before this one does.
+        if statement.startswith("UPDATE refresh_tokens") and not raced:
+            raced.append(True)
+            with engine.connect() as other:
+                other.execute(models.RefreshToken.__table__.update().values(revoked=True))
+                other.commit()
+
+    event.listen(engine, "before_cursor_execute", _other_refresh_wins)
+    try:
+        resp = client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    finally:
+        event.remove(engine, "before_cursor_execute", _other_refresh_wins)
+    assert raced
+    assert resp.status_code == 401
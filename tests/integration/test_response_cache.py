@@ -0,0 +1,77 @@
+import os
+import tempfile
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine
+from backend.app import responsecache
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+
+def admin_headers():
+    resp = client.post("/token", data={"username": "admin", "password": "admin"})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def _queries(fn):
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        resp = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    return resp, statements
+
+
+def test_repeated_list_is_served_from_cache():
+    headers = admin_headers()
+    first = client.get("/roles/", headers=headers)
+    assert first.status_code == 200
+    resp, statements = _queries(lambda: client.get("/roles/", headers=headers))
+    assert resp.status_code == 200
+    assert resp.json() == first.json()
+    assert resp.headers["ETag"] == first.headers["ETag"]
+    assert not any("FROM roles" in s for s in statements)
+
+
+def test_write_evicts_cached_list():
+    headers = admin_headers()
+    # Filtered so the new row is on the first page however many rows exist.
+    assert client.get("/habilities/?name=cached", headers=headers).json() == []
+    # id 0 asks for a generated key, so other modules' rows cannot collide.
+    resp = client.post("/habilities/", json={"id": 0, "name": "cached"}, headers=headers)
+    assert resp.status_code == 200
+    new_id = resp.json()["id"]
+    assert new_id != 0
+    resp, statements = _queries(lambda: client.get("/habilities/?name=cached", headers=headers))
+    assert resp.json() == [{"id": new_id, "name": "cached"}]
+    assert any("FROM habilities" in s for s in statements)
+
+
+def test_pagination_headers_are_cached():
+    headers = admin_headers()
+    first = client.get("/roles/?limit=2", headers=headers)
+    second = client.get("/roles/?limit=2", headers=headers)
+    assert second.headers["X-Next-After"] == first.headers["X-Next-After"]
+    assert second.json() == first.json()
+
+
+def test_stats_report_hits_per_route():
+    headers = admin_headers()
+    responsecache.clear()
+    client.get("/elementtypes/", headers=headers)
+    client.get("/elementtypes/", headers=headers)
+    resp = client.get("/admin/cache/stats", headers=headers)
+    assert resp.status_code == 200
+    route = resp.json()["routes"]["/elementtypes/"]
+    assert route["hits"] >= 1 and route["misses"] >= 1
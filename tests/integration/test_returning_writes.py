@@ -0,0 +1,95 @@
+import os
+import tempfile
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+
+def admin_headers():
+    resp = client.post("/token", data={"username": "admin", "password": "admin"})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def _statements(fn):
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        resp = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    return resp, [s for s in statements if "field_types" in s]
+
+
+def test_create_and_update_use_one_statement():
+    headers = admin_headers()
+    payload = {"id": 100, "name": "ret", "format": None, "description": "a", "status": True}
+    resp, statements = _statements(lambda: client.post("/fieldtypes/", json=payload, headers=headers))
+    assert resp.status_code == 200
+    assert resp.json()["name"] == "ret"
+    assert len(statements) == 1 and "RETURNING" in statements[0]
+
+    payload["description"] = "b"
+    resp, statements = _statements(lambda: client.put("/fieldtypes/100", json=payload, headers=headers))
+    assert resp.status_code == 200
+    assert resp.json()["description"] == "b"
+    assert len(statements) == 1 and statements[0].startswith("UPDATE")
+
+
+def test_patch_writes_only_sent_fields():
+    headers = admin_headers()
+    client.post(
+        "/fieldtypes/",
+        json={"id": 200, "name": "patchme", "format": "x", "description": "keep", "status": True},
+        headers=headers,
+    )
+    resp = client.patch("/fieldtypes/200", json={"format": "y"}, headers=headers)
+    assert resp.status_code == 200
+    assert resp.json() == {"id": 200, "name": "patchme", "format": "y", "description": "keep", "status": True}
+
+
+def test_patch_missing_row_returns_404():
+    headers = admin_headers()
+    resp = client.patch("/fieldtypes/9999", json={"format": "y"}, headers=headers)
+    assert resp.status_code == 404
+
+
+def test_register_and_role_assignment_return_the_written_row():
+    resp = client.post(
+        "/register", json={"username": "ret_user", "password": "Secret1!", "user_type": "analyst"}
+    )
+    assert resp.status_code == 200
+    user = resp.json()
+    assert user["username"] == "ret_user" and user["id"]
+
+    headers = admin_headers()
+    roles = {r["name"]: r["id"] for r in client.get("/roles/", headers=headers).json()}
+    role_id = roles["Arquitecto de Automatización"]
+    resp = client.post(f"/users/{user['id']}/role/{role_id}", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["role_id"] == role_id
+    assert client.post(f"/users/999999/role/{role_id}", headers=headers).status_code == 404
+
+
+def test_duplicate_interaction_code_is_a_conflict():
+    headers = admin_headers()
+    user_id = client.get("/users/me/", headers=headers).json()["id"]
+    item = {"id": 0, "userId": user_id, "name": "n", "requireReview": False, "description": None}
+    first = client.post("/interactions/", json={**item, "code": "DUP1"}, headers=headers)
+    assert first.status_code == 200
+    assert client.post("/interactions/", json={**item, "code": "DUP1"}, headers=headers).status_code == 409
+
+    other = client.post("/interactions/", json={**item, "code": "DUP2"}, headers=headers).json()
+    resp = client.patch(f"/interactions/{other['id']}", json={"code": "DUP1"}, headers=headers)
+    assert resp.status_code == 409
@@ -0,0 +1,94 @@
+import gc
+import os
+import tempfile
+from fastapi import APIRouter, Depends
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, field_validator
+from sqlalchemy import event
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine
+from backend.app import deps, models
+
+Base.metadata.create_all(bind=engine)
+
+checked_out_while_serializing = []
+
+
+class RoleOut(BaseModel):
+    name: str
+
+    @field_validator("name")
+    @classmethod
+    def _record(cls, value):
+        checked_out_while_serializing.append(engine.pool.checkedout())
+        return value
+
+    class Config:
+        from_attributes = True
+
+
+probe = APIRouter(route_class=deps.SessionRoute)
+
+
+@probe.get("/_probe/roles", response_model=list[RoleOut])
+def probe_roles(db=Depends(deps.get_db)):
+    return db.query(models.Role).all()
+
+
+app.include_router(probe)
+client = TestClient(app)
+
+
+def _checkouts(fn):
+    seen = []
+
+    def _record(*args):
+        seen.append(1)
+
+    event.listen(engine, "checkout", _record)
+    try:
+        resp = fn()
+    finally:
+        event.remove(engine, "checkout", _record)
+    return resp, len(seen)
+
+
+def test_connection_is_returned_before_serialization():
+    # Sessions leaked by failing tests of other modules hold pool
+    # connections until they are garbage collected.
+    gc.collect()
+    checked_out_while_serializing.clear()
+    resp = client.get("/_probe/roles")
+    assert resp.status_code == 200 and resp.json()
+    assert checked_out_while_serializing and set(checked_out_while_serializing) == {0}
+
+
+def test_rejected_token_never_checks_out_a_connection():
+    resp, checkouts = _checkouts(
+        lambda: client.get("/habilities/", headers={"Authorization": "Bearer invalid"})
+    )
+    assert resp.status_code == 401
+    assert checkouts == 0
+
+
+def test_dependencies_share_one_session():
+    token = client.post("/token", data={"username": "admin", "password": "admin"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/habilities/", headers=headers)
+    resp, checkouts = _checkouts(lambda: client.get("/habilities/?limit=1", headers=headers))
+    assert resp.status_code == 200
+    assert checkouts == 1
+
+
+def test_release_keeps_uncommitted_writes_for_rollback():
+    db = next(deps.get_db())
+    db.add(models.Hability(name="unsaved"))
+    deps.release_session(db)
+    assert db.in_transaction()
+    db.close()
+    check = next(deps.get_db())
+    assert check.query(models.Hability).filter_by(name="unsaved").first() is None
+    check.close()
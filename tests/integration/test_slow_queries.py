@@ -0,0 +1,60 @@
+import os
+import tempfile
+import time
+from fastapi.testclient import TestClient
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine
+from backend.app import slowqueries
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+
+def admin_headers():
+    resp = client.post("/token", data={"username": "admin", "password": "admin"})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def _wait_for_plan(entry_id, headers):
+    for _ in range(50):
+        entry = client.get(f"/admin/slow-queries/{entry_id}", headers=headers).json()
+        if entry["plan"] or entry.get("plan_error"):
+            return entry
+        time.sleep(0.05)
+    return entry
+
+
+def test_slow_statements_are_logged_with_route_and_plan(monkeypatch):
+    headers = admin_headers()
+    slowqueries.clear()
+    monkeypatch.setattr(slowqueries, "SLOW_QUERY_MS", 0.0001)
+    try:
+        client.get("/habilities/?name=web", headers=headers)
+    finally:
+        monkeypatch.setattr(slowqueries, "SLOW_QUERY_MS", 250.0)
+
+    listed = client.get("/admin/slow-queries?route=/habilities/", headers=headers).json()
+    listing = next(e for e in listed if "FROM habilities" in e["statement"])
+    assert listing["route"] == "GET /habilities/"
+    assert all(t == "str" for t in listing["parameters"][:1])
+    assert "web" not in str(listing)
+
+    entry = _wait_for_plan(listing["id"], headers)
+    assert entry["plan"], entry
+    assert "habilities" in entry["plan"]
+
+
+def test_parameter_shape_hides_values():
+    assert slowqueries.parameter_shape({"a": 1, "b": "x"}, False) == {"a": "int", "b": "str"}
+    assert slowqueries.parameter_shape([(1, "x"), (2, "y")], True) == {"rows": 2, "row": ["int", "str"]}
+
+
+def test_clear_and_missing_entry():
+    headers = admin_headers()
+    assert client.delete("/admin/slow-queries", headers=headers).json() == {"ok": True}
+    assert client.get("/admin/slow-queries", headers=headers).json() == []
+    assert client.get("/admin/slow-queries/999999", headers=headers).status_code == 404
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import pytest
+from fastapi import APIRouter, Depends
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import DBAPIError
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine
+from backend.app import deps, models, sqlstats
+
+Base.metadata.create_all(bind=engine)
+
+probe = APIRouter(route_class=deps.SessionRoute)
+
+
+@probe.get("/_probe/loop")
+def probe_loop(db=Depends(deps.get_db)):
+    ids = [r.id for r in db.query(models.Hability.id)]
+    return [db.query(models.Hability).filter_by(id=i).first().name for i in ids * 5]
+
+
+app.include_router(probe)
+client = TestClient(app)
+
+
+def admin_headers():
+    resp = client.post("/token", data={"username": "admin", "password": "admin"})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_normalize_collapses_parameters_and_in_lists():
+    a = sqlstats.normalize("SELECT x FROM t WHERE id IN (?, ?, ?) LIMIT 10")
+    b = sqlstats.normalize("SELECT x FROM t WHERE id IN (%(p_1)s, %(p_2)s)\n LIMIT 20")
+    assert a == b == "SELECT x FROM t WHERE id IN (?) LIMIT ?"
+
+
+def test_server_timing_header_counts_queries():
+    resp = client.get("/habilities/", headers=admin_headers())
+    timing = resp.headers["Server-Timing"]
+    assert timing.startswith("db;dur=") and "queries" in timing
+    assert "X-Repeated-Statements" not in resp.headers
+
+
+def test_repeated_statements_are_flagged_per_route():
+    sqlstats.reset()
+    resp = client.get("/_probe/loop")
+    assert resp.status_code == 200
+    assert int(resp.headers["X-Repeated-Statements"]) > sqlstats.REPEAT_THRESHOLD
+    resp = client.get("/admin/sql/stats", headers=admin_headers())
+    entry = resp.json()["/_probe/loop"]
+    assert entry["requests"] == 1 and entry["flagged"] == 1
+    assert "habilities" in entry["last_repeated"]["statement"]
+
+
+def test_failed_statement_leaves_no_timing_state():
+    stats = sqlstats.RequestStats()
+    token = sqlstats._current.set(stats)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(DBAPIError):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+            conn.exec_driver_sql("SELECT 1")
+            assert not [key for key in conn.info if key.startswith("sqlstats")]
+    finally:
+        sqlstats._current.reset(token)
+    assert stats.count == 1
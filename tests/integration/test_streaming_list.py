@@ -0,0 +1,94 @@
+import os
+import tempfile
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app
+from backend.app.database import Base, engine, SessionLocal
+from backend.app import models, schemas, streaming
+
+Base.metadata.create_all(bind=engine)
+client = TestClient(app)
+
+
+def admin_headers():
+    resp = client.post("/token", data={"username": "admin", "password": "admin"})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_streamed_rows_match_schema_serialization(monkeypatch):
+    monkeypatch.setattr(streaming, "STREAM_CHUNK_ROWS", 2)
+    db = SessionLocal()
+    db.query(models.User).filter_by(username="admin").update(
+        {"last_login": datetime(2024, 5, 1, 12, 30, 15, 123456)}
+    )
+    db.commit()
+    expected = [
+        schemas.User.model_validate(u, from_attributes=True).model_dump(mode="json")
+        for u in db.query(models.User).order_by(models.User.id)
+    ]
+    db.close()
+
+    resp = client.get("/users/", headers=admin_headers())
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.json() == expected
+
+
+def test_streamed_pages_carry_cursor_headers():
+    headers = admin_headers()
+    resp = client.get("/users/", params={"limit": 2, "count": "true"}, headers=headers)
+    body = resp.json()
+    assert len(body) == 2
+    assert resp.headers["X-Next-After"] == str(body[-1]["id"])
+    total = int(resp.headers["X-Total-Count"])
+
+    seen = [u["id"] for u in body]
+    while "X-Next-After" in resp.headers:
+        resp = client.get(
+            "/users/",
+            params={"limit": 2, "after": resp.headers["X-Next-After"]},
+            headers=headers,
+        )
+        seen += [u["id"] for u in resp.json()]
+    assert len(seen) == len(set(seen)) == total
+
+
+def test_schemas_with_relationships_keep_the_orm_path():
+    assert streaming.direct_columns(models.Client, schemas.Client) is None
+    assert streaming.direct_columns(models.User, schemas.User) is not None
+
+
+def test_listing_streams_on_the_request_connection():
+    headers = admin_headers()
+    connections, checked_out, peak = [], [0], [0]
+
+    def _record(conn, cursor, statement, *args):
+        if "FROM users" in statement or "table_generations" in statement:
+            connections.append(conn)
+
+    def _checkout(*args):
+        checked_out[0] += 1
+        peak[0] = max(peak[0], checked_out[0])
+
+    def _checkin(*args):
+        checked_out[0] -= 1
+
+    event.listen(engine, "before_cursor_execute", _record)
+    event.listen(engine.pool, "checkout", _checkout)
+    event.listen(engine.pool, "checkin", _checkin)
+    try:
+        resp = client.get("/users/", params={"limit": 2, "count": "true"}, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+        event.remove(engine.pool, "checkout", _checkout)
+        event.remove(engine.pool, "checkin", _checkin)
+    assert resp.status_code == 200 and "ETag" in resp.headers
+    listing = connections[-4:]  # generation, count, cursor probe, body
+    assert len({id(conn) for conn in listing}) == 1
+    # No second connection is checked out while the request holds one.
+    assert peak[0] == 1 and checked_out[0] == 0
@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+
+def test_importing_main_performs_no_database_io():
+    db_path = tempfile.mktemp(suffix=".db")
+    env = dict(os.environ, DATABASE_URL="sqlite:///" + db_path)
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from backend.app.main import create_app; "
+            "assert create_app().openapi()['paths']",
+        ],
+        env=env,
+        check=True,
+    )
+    assert not os.path.exists(db_path)
@@ -0,0 +1,47 @@
+import os
+import tempfile
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + tempfile.mktemp(suffix=".db"))
+
+from backend.app import crypto, schemas
+
+
+def raw(value):
+    return SimpleNamespace(
+        id=1,
+        fieldTypeId=1,
+        fieldName="f",
+        fieldValue=value,
+        autoGenerated=False,
+        scenarioDataId=1,
+        length=None,
+        status=True,
+    )
+
+
+def test_decrypt_many_matches_single_decrypt():
+    tokens = [crypto.encrypt(f"v{i}") for i in range(20)]
+    values = tokens + [None, tokens[0], "not-a-token"]
+    expected = [f"v{i}" for i in range(20)] + [None, "v0", "not-a-token"]
+    assert crypto.decrypt_many(values) == expected
+    # Second pass is served from the cache.
+    hits = crypto.stats()["hits"]
+    assert crypto.decrypt_many(values) == expected
+    assert crypto.stats()["hits"] - hits == 22
+
+
+def test_large_batches_use_the_thread_pool(monkeypatch):
+    monkeypatch.setattr(crypto, "DECRYPT_PARALLEL_THRESHOLD", 4)
+    monkeypatch.setattr(crypto, "DECRYPT_WORKERS", 3)
+    tokens = [crypto.encrypt(f"p{i}") for i in range(50)]
+    assert crypto.decrypt_many(tokens) == [f"p{i}" for i in range(50)]
+    assert crypto._executor is not None
+
+
+def test_decrypt_into_leaves_source_untouched():
+    token = crypto.encrypt("secret")
+    obj = raw(token)
+    [item] = crypto.decrypt_into([obj], schemas.RawData)
+    assert item.fieldValue == "secret"
+    assert obj.fieldValue == token
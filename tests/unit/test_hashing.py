@@ -0,0 +1,47 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + tempfile.mktemp(suffix=".db"))
+
+from backend.app import hashing
+
+
+def test_pool_hashes_and_verifies():
+    hashed = hashing.hash_password("S3cret!")
+    assert hashing.verify_password("S3cret!", hashed)
+    assert not hashing.verify_password("wrong", hashed)
+    stats = hashing.stats()
+    assert stats["max_pending"] == hashing.HASH_MAX_PENDING
+    assert stats["rejected"] == 0
+
+
+def test_admission_control_rejects_when_full(monkeypatch):
+    monkeypatch.setattr(hashing, "HASH_WORKERS", 1)
+    monkeypatch.setattr(hashing, "HASH_MAX_PENDING", 0)
+    rejected = hashing.stats()["rejected"]
+    with pytest.raises(hashing.HashingOverloaded):
+        hashing.hash_password("S3cret!")
+    assert hashing.stats()["rejected"] == rejected + 1
+
+
+def test_overload_is_answered_with_503(monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend.app import main
+
+    main.init_database()
+    monkeypatch.setattr(hashing, "HASH_WORKERS", 1)
+    monkeypatch.setattr(hashing, "HASH_MAX_PENDING", 0)
+    resp = TestClient(main.app).post("/token", data={"username": "admin", "password": "admin"})
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "1"
+
+
+def test_batch_is_hashed_in_windows(monkeypatch):
+    monkeypatch.setattr(hashing, "HASH_MAX_PENDING", 2)
+    rejected = hashing.stats()["rejected"]
+    hashes = asyncio.run(hashing.hash_passwords_async([f"S3cret!{i}" for i in range(5)]))
+    assert [hashing.verify_password(f"S3cret!{i}", h) for i, h in enumerate(hashes)] == [True] * 5
+    assert hashing.stats()["rejected"] == rejected
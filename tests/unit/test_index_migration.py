@@ -0,0 +1,46 @@
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from sqlalchemy import inspect, text
+
+from backend.app import migrations, models
+from backend.app.database import Base, engine
+
+Base.metadata.create_all(bind=engine)
+
+
+def _index_names(table):
+    return {ix["name"] for ix in inspect(engine).get_indexes(table)}
+
+
+def test_missing_indexes_are_built_on_existing_tables():
+    with engine.begin() as conn:
+        conn.execute(text('DROP INDEX "ix_project_employees_userId"'))
+        conn.execute(text("DROP INDEX ix_api_permissions_route_method"))
+    assert {ix.name for ix in migrations.missing_indexes()} == {
+        "ix_project_employees_userId", "ix_api_permissions_route_method",
+    }
+
+    created = migrations.apply_indexes()
+
+    assert sorted(created) == ["ix_api_permissions_route_method", "ix_project_employees_userId"]
+    assert "ix_project_employees_userId" in _index_names("project_employees")
+    assert migrations.missing_indexes() == []
+    assert migrations.apply_indexes() == []
+
+
+def test_unique_index_waits_for_duplicates_to_be_cleaned():
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_interactions_code"))
+        conn.execute(models.Interaction.__table__.insert(), [
+            {"userId": 1, "code": "DUP", "name": "a"},
+            {"userId": 1, "code": "DUP", "name": "b"},
+        ])
+
+    assert "ix_interactions_code" not in migrations.apply_indexes()
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM interactions WHERE name = 'b'"))
+    assert migrations.apply_indexes() == ["ix_interactions_code"]
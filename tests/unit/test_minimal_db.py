@@ -8,7 +8,8 @@ def setup_temp_db():
     backend.app.routes.routers = []
     from backend.app.database import Base, engine
     Base.metadata.create_all(bind=engine)
-    from backend.app.main import app  # noqa: F401
+    from backend.app.main import init_database
+    init_database()
     from backend.app.database import SessionLocal
     from backend.app import models
     return SessionLocal, models
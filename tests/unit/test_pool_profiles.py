@@ -0,0 +1,69 @@
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import NullPool, QueuePool
+
+from backend.app import database, poolstats
+
+
+def test_profiles_build_pool_options(monkeypatch):
+    options = database.pool_options("postgresql://u:p@db/app", poolstats.PoolStats(), "multi")
+    assert options["pool_size"] == 5 and options["pool_pre_ping"] is True
+    assert issubclass(options["poolclass"], QueuePool)
+
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    options = database.pool_options("postgresql://u:p@db/app", poolstats.PoolStats(), "multi")
+    assert options["pool_size"] == 7
+
+    options = database.pool_options("postgresql://u:p@db/app", poolstats.PoolStats(), "pgbouncer")
+    assert issubclass(options["poolclass"], NullPool)
+    assert "pool_size" not in options
+
+    with pytest.raises(ValueError):
+        database.pool_options("postgresql://u:p@db/app", poolstats.PoolStats(), "huge")
+
+
+def test_instrumented_pool_reports_usage_and_timeouts():
+    stats = poolstats.PoolStats()
+    url = "sqlite:///" + tempfile.mktemp(suffix=".db")
+    options = database.pool_options(url, stats, "default")
+    engine = create_engine(url, pool_size=1, max_overflow=0, pool_timeout=0.05, poolclass=options["poolclass"])
+    poolstats.instrument(engine, stats)
+
+    conn = engine.connect()
+    conn.execute(text("SELECT 1"))
+    report = stats.snapshot(engine.pool)
+    assert report["checkedout"] == 1 and report["size"] == 1
+    with pytest.raises(PoolTimeout):
+        engine.connect()
+    conn.close()
+    engine.dispose()
+
+    report = stats.snapshot(engine.pool)
+    assert report["timeouts"] == 1
+    assert report["checkouts"] == 1 and report["connects"] == 1
+    assert report["checkout_wait_ms"]["count"] == 2
+    assert report["checkout_wait_ms"]["max"] >= 50
+    assert report["held_ms"]["count"] == 1
+    assert report["lifetime_s"]["count"] == 1
+    assert report["checkout_wait_ms"]["buckets"][-1] == ("+Inf", 2)
+
+
+def test_admin_pool_endpoint():
+    from fastapi.testclient import TestClient
+    from backend.app.main import app
+
+    database.Base.metadata.create_all(bind=database.engine)
+    with TestClient(app) as client:
+        token = client.post("/token", data={"username": "admin", "password": "admin"}).json()["access_token"]
+        resp = client.get("/admin/database/pool", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["profile"] == database.POOL_PROFILE
+    assert body["sync"]["pool"] == "QueuePool"
+    assert body["sync"]["checkouts"] >= 1
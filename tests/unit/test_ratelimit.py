@@ -0,0 +1,76 @@
+import os
+import tempfile
+import time
+
+import pytest
+from fastapi import HTTPException
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + tempfile.mktemp(suffix=".db"))
+
+from backend.app import ratelimit
+from backend.app.ratelimit import MemoryBackend, RateLimiter
+
+
+@pytest.fixture(autouse=True)
+def memory_backend():
+    previous = ratelimit.backend
+    ratelimit.configure(MemoryBackend(max_keys=100))
+    yield ratelimit.backend
+    ratelimit.configure(previous)
+
+
+def test_allows_limit_then_rejects():
+    limiter = RateLimiter("t", 3, 60)
+    assert [limiter.hit("ip") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.hit("ip") > 0
+    assert limiter.hit("other") == 0.0
+    with pytest.raises(HTTPException) as exc:
+        limiter.check("ip")
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) >= 1
+    assert limiter.rejected == 1
+
+
+def test_peek_does_not_consume():
+    limiter = RateLimiter("t", 1, 60)
+    for _ in range(5):
+        limiter.ensure_available("ip")
+    limiter.check("ip")
+    with pytest.raises(HTTPException):
+        limiter.ensure_available("ip")
+
+
+def test_idle_keys_expire(memory_backend):
+    limiter = RateLimiter("t", 2, 0.2)
+    limiter.hit("a")
+    limiter.hit("a")
+    assert limiter.hit("a") > 0
+    time.sleep(0.25)
+    assert limiter.hit("a") == 0.0
+    # The stored state is a single float with a TTL, not a growing list.
+    assert len(memory_backend) == 1
+
+
+def test_zero_limit_disables():
+    limiter = ratelimit.from_env("unset_for_test", "0/60")
+    assert not limiter.enabled
+    for _ in range(10):
+        limiter.check("ip")
+
+
+def test_login_username_churn_is_capped_per_ip(memory_backend, monkeypatch):
+    from backend.app import security
+
+    monkeypatch.setattr(security, "login_ip_limiter", RateLimiter("login_ip", 3, 60))
+    monkeypatch.setattr(security, "login_limiter", RateLimiter("login", 5, 60))
+    for n in range(3):
+        security.ensure_login_allowed("1.2.3.4", f"user{n}")
+        security.record_failed_login("1.2.3.4", f"user{n}")
+    with pytest.raises(HTTPException) as exc:
+        security.ensure_login_allowed("1.2.3.4", "fresh")
+    assert exc.value.status_code == 429
+    # Further failures from the blocked IP add no username keys.
+    for n in range(50):
+        security.record_failed_login("1.2.3.4", f"spray{n}")
+    assert len(memory_backend) == 4
+    security.ensure_login_allowed("5.6.7.8", "user0")
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+
+import pytest
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + tempfile.mktemp(suffix=".db"))
+
+from backend.app import revocation
+from backend.app.revocation import RevocationStore
+
+
+@pytest.fixture
+def sync_state(monkeypatch):
+    """Fresh module-level sync state, restored after the test."""
+    monkeypatch.setattr(revocation, "_store", RevocationStore())
+    monkeypatch.setattr(revocation, "_gaps", {})
+    monkeypatch.setattr(revocation, "_last_id", 0)
+    monkeypatch.setattr(revocation, "_last_sync", 0.0)
+    monkeypatch.setattr(revocation, "_last_purge", time.monotonic())
+
+
+def test_revoked_ids_are_found_until_expiry():
+    store = RevocationStore(bucket_seconds=1)
+    now = time.time()
+    store.add("live", now + 3600)
+    store.add("stale", now - 1)
+    assert store.contains("live")
+    assert not store.contains("stale")
+    assert not store.contains("unknown")
+
+
+def test_purge_drops_expired_buckets():
+    store = RevocationStore(bucket_seconds=1)
+    now = time.time()
+    store.add("short", now + 1)
+    store.add("long", now + 3600)
+    assert len(store) == 2
+    assert store.purge(now + 10) == 1
+    assert len(store) == 1
+    assert store.contains("long")
+
+
+def test_sync_picks_up_revocations_committed_out_of_id_order(sync_state):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from backend.app import models
+
+    # Own database: in a full run the shared engine may point elsewhere.
+    engine = create_engine("sqlite:///" + tempfile.mktemp(suffix=".db"))
+    models.Base.metadata.create_all(bind=engine)
+    db = Session(engine)
+    start = 100
+    expires = int(time.time()) + 3600
+    # The transaction holding id start+1 commits after start+2 was synced.
+    db.add(models.RevokedToken(id=start + 2, jti="early", expires_at=expires))
+    db.commit()
+    revocation.sync(db)
+    assert revocation._store.contains("early")
+    assert start + 1 in revocation._gaps
+
+    db.add(models.RevokedToken(id=start + 1, jti="late", expires_at=expires))
+    db.commit()
+    revocation.sync(db)
+    assert revocation._store.contains("late")
+    assert start + 1 not in revocation._gaps
+    db.close()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+from sqlalchemy import event
+
+os.environ["DATABASE_URL"] = "sqlite:///" + tempfile.mktemp(suffix=".db")
+
+from backend.app.main import app  # noqa: F401
+from backend.app.database import Base, engine, SessionLocal
+from backend.app import models, seed
+
+
+def _schema():
+    Base.metadata.create_all(bind=engine)
+
+
+def test_warm_start_skips_seeding_with_single_query():
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    db = SessionLocal()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        assert seed.ensure_seeded(db, _schema) is False
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+        db.close()
+    assert len(statements) == 1
+
+
+def test_forced_reseed_is_idempotent(monkeypatch):
+    monkeypatch.setenv("SEED_FORCE", "1")
+    db = SessionLocal()
+    try:
+        roles = db.query(models.Role).count()
+        users = db.query(models.User).count()
+        pages = db.query(models.PagePermission).count()
+        assert seed.ensure_seeded(db, _schema) is True
+        assert db.query(models.Role).count() == roles
+        assert db.query(models.User).count() == users
+        assert db.query(models.PagePermission).count() == pages
+    finally:
+        db.close()